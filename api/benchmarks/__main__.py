@@ -0,0 +1,77 @@
+"""
+Hot-path benchmark suite on fixed synthetic datasets.
+
+    python -m benchmarks                       # run, compare with benchmarks/baseline.json
+    python -m benchmarks --sizes 1000,10000 --out results.json
+    python -m benchmarks --update-baseline     # record a new baseline
+
+Exits non-zero if any case is slower than baseline by more than --tolerance.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import logging
+import os
+import re
+import sys
+
+from benchmarks.cases import BenchDB, build_cases
+from benchmarks.harness import compare, dump_json, environment, format_table, load_json, time_case
+
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+async def run_suite(sizes: list[int], repeats: int, pattern: str | None) -> dict:
+    results: dict[str, dict] = {}
+    for size in sizes:
+        db = BenchDB()
+        await db.start()
+        try:
+            for case in await build_cases(db, size):
+                if pattern and not re.search(pattern, case.key):
+                    continue
+                results[case.key] = await time_case(case, repeats=repeats)
+                print(f"  {case.key}: {results[case.key]['median_s'] * 1e3:.2f} ms", file=sys.stderr)
+        finally:
+            await db.close()
+    return {"environment": environment(), "results": results}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="500,2500", help="comma-separated bar counts")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("-k", dest="pattern", default=None, help="regex filter on case keys")
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    # The app's engine logs every statement at INFO; keep benchmark output readable.
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    current = asyncio.run(run_suite(sizes, args.repeats, args.pattern))
+    baseline = load_json(args.baseline)
+
+    print(format_table(current, baseline))
+    if args.out:
+        dump_json(args.out, current)
+    if args.update_baseline:
+        dump_json(args.baseline, current)
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if baseline is None:
+        print("no baseline found; run with --update-baseline to record one")
+        return 0
+
+    regressions = compare(current, baseline, tolerance=args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Wide StockSignal table vs packed stock_indicator_series: on-disk size and read latency.
+
+    python -m benchmarks.bench_indicator_store --tickers 50 --bars 2500
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from db import Base
+from models import Stock, StockIndicatorSeries, StockPriceCache, StockSignal
+from services.ta.signals import list_signal_rows
+from services.ta.store import read_indicator_arrays, write_indicator_arrays
+
+
+COLUMNS = ("rsi", "macd", "macd_signal", "ema_20", "ema_50", "bb_upper", "bb_lower")
+SPEC_IDS = ("rsi_14", "macd_12_26_9", "macd_signal_12_26_9", "ema_20", "ema_50", "bb_upper_20_2.0", "bb_lower_20_2.0")
+
+
+async def _open(path: str, tables):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=tables)
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+
+def _timeit(samples: list[float]) -> dict:
+    return {
+        "median_ms": round(statistics.median(samples) * 1e3, 3),
+        "min_ms": round(min(samples) * 1e3, 3),
+    }
+
+
+async def run(tickers: int, bars: int, repeats: int) -> dict:
+    rng = np.random.default_rng(0)
+    dates = [date(2000, 1, 3) + timedelta(days=i) for i in range(bars)]
+    data = rng.normal(50, 10, (tickers, len(COLUMNS), bars))
+    data[:, :, :50] = np.nan
+
+    tmp = tempfile.mkdtemp(prefix="chronos-bench-")
+    wide_path, long_path = os.path.join(tmp, "wide.db"), os.path.join(tmp, "long.db")
+    wide_engine, Wide = await _open(wide_path, [Stock.__table__, StockPriceCache.__table__, StockSignal.__table__])
+    long_engine, Long = await _open(long_path, [Stock.__table__, StockIndicatorSeries.__table__])
+
+    async with Wide() as session:
+        session.add_all(Stock(id=i + 1, ticker=f"T{i}") for i in range(tickers))
+        for t in range(tickers):
+            block = data[t].T.tolist()
+            session.add_all(
+                StockSignal(
+                    stock_id=t + 1, as_of=d, provider="bench", interval="1d",
+                    **{c: (None if v != v else v) for c, v in zip(COLUMNS, vals)},
+                )
+                for d, vals in zip(dates, block)
+            )
+        await session.commit()
+
+    async with Long() as session:
+        session.add_all(Stock(id=i + 1, ticker=f"T{i}") for i in range(tickers))
+        for t in range(tickers):
+            await write_indicator_arrays(
+                session, stock_id=t + 1, provider="bench", interval="1d",
+                dates=dates, values=dict(zip(SPEC_IDS, data[t])),
+            )
+        await session.commit()
+
+    await wide_engine.dispose()
+    await long_engine.dispose()
+    wide_engine, Wide = await _open(wide_path, [])
+    long_engine, Long = await _open(long_path, [])
+
+    wide_samples, long_all_samples, long_two_samples = [], [], []
+    for _ in range(repeats):
+        sid = int(rng.integers(1, tickers + 1))
+        async with Wide() as session:
+            t0 = time.perf_counter()
+            await list_signal_rows(session, stock_id=sid, provider="bench", interval="1d")
+            wide_samples.append(time.perf_counter() - t0)
+        async with Long() as session:
+            t0 = time.perf_counter()
+            await read_indicator_arrays(session, stock_id=sid, provider="bench", interval="1d", spec_ids=SPEC_IDS)
+            long_all_samples.append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            await read_indicator_arrays(session, stock_id=sid, provider="bench", interval="1d", spec_ids=SPEC_IDS[:2])
+            long_two_samples.append(time.perf_counter() - t0)
+
+    await wide_engine.dispose()
+    await long_engine.dispose()
+    return {
+        "tickers": tickers,
+        "bars": bars,
+        "size_bytes": {"wide": os.path.getsize(wide_path), "long": os.path.getsize(long_path)},
+        "read_one_series": {
+            "wide_all_columns": _timeit(wide_samples),
+            "long_all_columns": _timeit(long_all_samples),
+            "long_two_columns": _timeit(long_two_samples),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", type=int, default=20)
+    parser.add_argument("--bars", type=int, default=2500)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.tickers, args.bars, args.repeats)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+from __future__ import annotations
+import os
+import tempfile
+
+import pandas as pd
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from benchmarks.harness import Case
+from db import Base, get_session
+from models import Stock, StockOHLCV, StockSignal
+from ohlcv import OHLCVRow, list_ohlcv_rows, load_bar_series, upsert_ohlcv
+from series import BarSeries
+from services.providers.synthetic_adapter import SyntheticProvider
+from services.providers.yahooquery_adapter import normalize_history
+from services.ta.providers.pandas_ta_provider import PandasTAProvider
+from services.ta.signals import SignalRow, upsert_signals
+from services.validation import validate_bars
+
+
+TICKER = "BENCH"
+PROVIDER = "bench"
+INTERVAL = "1d"
+
+
+def synthetic_rows(size: int) -> list[OHLCVRow]:
+    """
+    Fixed dataset per size: same seed, no gaps, so every run times identical input.
+    """
+    gen = SyntheticProvider(seed=42, bars=size, gap_rate=0.0, split_rate=0.0, missing_volume_rate=0.01)
+    dates, o, h, l, c, v = gen.generate(TICKER, INTERVAL)
+    vols = [None if x != x else x for x in v.tolist()]
+    return list(zip(dates.astype(object).tolist(), o.tolist(), h.tolist(), l.tolist(), c.tolist(), vols))
+
+
+def yahooquery_frame(rows: list[OHLCVRow]) -> pd.DataFrame:
+    """
+    Shape of Ticker.history(): (symbol, date) MultiIndex, lowercase columns.
+    """
+    index = pd.MultiIndex.from_arrays([[TICKER] * len(rows), [r[0] for r in rows]], names=["symbol", "date"])
+    return pd.DataFrame(
+        {
+            "open": [r[1] for r in rows],
+            "high": [r[2] for r in rows],
+            "low": [r[3] for r in rows],
+            "close": [r[4] for r in rows],
+            "volume": [r[5] for r in rows],
+            "adjclose": [r[4] for r in rows],
+        },
+        index=index,
+    )
+
+
+class BenchDB:
+    """
+    Throwaway file-backed SQLite database with the full schema.
+    """
+
+    def __init__(self) -> None:
+        self.dir = tempfile.mkdtemp(prefix="chronos-bench-")
+        self.engine: AsyncEngine = create_async_engine(
+            f"sqlite+aiosqlite:///{os.path.join(self.dir, 'bench.db')}"
+        )
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False, autoflush=False)
+        self.stock_id = 0
+        self._seeded: list[OHLCVRow] | None = None
+
+    async def start(self) -> None:
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with self.sessions() as session:
+            stock = Stock(ticker=TICKER)
+            session.add(stock)
+            await session.commit()
+            self.stock_id = stock.id
+
+    async def clear(self, model) -> None:
+        if model is StockOHLCV:
+            self._seeded = None
+        async with self.sessions() as session:
+            await session.execute(delete(model))
+            await session.commit()
+
+    async def seed_ohlcv(self, rows: list[OHLCVRow]) -> None:
+        """
+        Bulk-load bars (not through upsert_ohlcv); skipped if already loaded.
+        """
+        if self._seeded is rows:
+            return
+        await self.clear(StockOHLCV)
+        async with self.sessions() as session:
+            session.add_all(
+                StockOHLCV(stock_id=self.stock_id, as_of=d, provider=PROVIDER, interval=INTERVAL,
+                           open=o, high=h, low=l, close=c, volume=v)
+                for d, o, h, l, c, v in rows
+            )
+            await session.commit()
+        self._seeded = rows
+
+    async def close(self) -> None:
+        await self.engine.dispose()
+
+
+async def build_cases(db: BenchDB, size: int) -> list[Case]:
+    rows = synthetic_rows(size)
+    bars = BarSeries.from_rows(rows)
+    signals: list[SignalRow] = PandasTAProvider().compute_signals(rows)
+    frame = yahooquery_frame(rows)
+
+    async def write_ohlcv() -> None:
+        async with db.sessions() as session:
+            await upsert_ohlcv(session, stock_id=db.stock_id, provider=PROVIDER, interval=INTERVAL, rows=rows)
+            await session.commit()
+        db._seeded = None
+
+    async def write_signals() -> None:
+        async with db.sessions() as session:
+            await upsert_signals(session, stock_id=db.stock_id, provider=PROVIDER, interval=INTERVAL, rows=signals)
+            await session.commit()
+
+    async def read_ohlcv() -> None:
+        async with db.sessions() as session:
+            await list_ohlcv_rows(session, stock_id=db.stock_id, provider=PROVIDER, interval=INTERVAL)
+
+    async def read_series() -> None:
+        async with db.sessions() as session:
+            await load_bar_series(session, stock_id=db.stock_id, provider=PROVIDER, interval=INTERVAL)
+
+    async def compute() -> None:
+        PandasTAProvider().compute_signals(rows)
+
+    async def compute_series() -> None:
+        PandasTAProvider().compute_signal_series(bars)
+
+    async def validate() -> None:
+        validate_bars(bars, INTERVAL)
+
+    async def normalize() -> None:
+        normalize_history(frame, TICKER)
+
+    async def clear_ohlcv() -> None:
+        await db.clear(StockOHLCV)
+
+    async def clear_signals() -> None:
+        await db.clear(StockSignal)
+
+    async def seeded() -> None:
+        await db.seed_ohlcv(rows)
+
+    from main import app
+
+    async def override_session():
+        async with db.sessions() as session:
+            yield session
+
+    async def endpoint() -> None:
+        app.dependency_overrides[get_session] = override_session
+        try:
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+                res = await client.get(f"/stocks/{TICKER}/ohlcv", params={"provider": PROVIDER, "interval": INTERVAL})
+                res.raise_for_status()
+        finally:
+            app.dependency_overrides.pop(get_session, None)
+
+    return [
+        Case("upsert_ohlcv.insert", size, write_ohlcv, setup=clear_ohlcv),
+        Case("upsert_ohlcv.update", size, write_ohlcv, setup=seeded),
+        Case("upsert_signals.insert", size, write_signals, setup=clear_signals),
+        Case("list_ohlcv_rows", size, read_ohlcv, setup=seeded),
+        Case("load_bar_series", size, read_series, setup=seeded),
+        Case("pandas_ta.compute_signals", size, compute),
+        Case("pandas_ta.compute_signal_series", size, compute_series),
+        Case("validate_bars", size, validate),
+        Case("yahooquery.normalize_history", size, normalize),
+        Case("GET /stocks/{ticker}/ohlcv", size, endpoint, setup=seeded),
+    ]
@@ -0,0 +1,101 @@
+from __future__ import annotations
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+
+AsyncFn = Callable[[], Awaitable[None]]
+
+
+@dataclass(frozen=True, slots=True)
+class Case:
+    """
+    One timed operation. `setup` runs before every repeat and is not timed.
+    """
+    name: str
+    size: int
+    run: AsyncFn
+    setup: Optional[AsyncFn] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.size}]"
+
+
+async def time_case(case: Case, *, repeats: int, warmup: int = 1) -> dict:
+    samples: list[float] = []
+    for i in range(warmup + repeats):
+        if case.setup is not None:
+            await case.setup()
+        gc.collect()
+        t0 = time.perf_counter()
+        await case.run()
+        elapsed = time.perf_counter() - t0
+        if i >= warmup:
+            samples.append(elapsed)
+    return {
+        "size": case.size,
+        "repeats": repeats,
+        "median_s": statistics.median(samples),
+        "min_s": min(samples),
+        "max_s": max(samples),
+        "per_item_us": statistics.median(samples) / max(case.size, 1) * 1e6,
+    }
+
+
+def environment() -> dict:
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def compare(current: dict, baseline: dict, *, tolerance: float) -> list[str]:
+    """
+    Return a line per case whose median is more than `tolerance` slower than baseline.
+    Cases missing from the baseline are ignored.
+    """
+    regressions: list[str] = []
+    base = baseline.get("results", {})
+    for key, res in current.get("results", {}).items():
+        ref = base.get(key)
+        if ref is None:
+            continue
+        ratio = res["median_s"] / ref["median_s"] if ref["median_s"] else float("inf")
+        if ratio > 1.0 + tolerance:
+            regressions.append(
+                f"{key}: {res['median_s'] * 1e3:.2f} ms vs baseline {ref['median_s'] * 1e3:.2f} ms (x{ratio:.2f})"
+            )
+    return regressions
+
+
+def format_table(current: dict, baseline: dict | None = None) -> str:
+    base = (baseline or {}).get("results", {})
+    lines = [f"{'case':<40} {'median ms':>12} {'us/item':>10} {'vs base':>9}"]
+    for key, res in current["results"].items():
+        ref = base.get(key)
+        delta = f"x{res['median_s'] / ref['median_s']:.2f}" if ref and ref["median_s"] else "-"
+        lines.append(f"{key:<40} {res['median_s'] * 1e3:>12.2f} {res['per_item_us']:>10.2f} {delta:>9}")
+    return "\n".join(lines)
+
+
+def load_json(path: str) -> dict | None:
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return None
+
+
+def dump_json(path: str, data: dict) -> None:
+    with open(path, "w") as fh:
+        json.dump(data, fh, indent=2, sort_keys=True)
+        fh.write("\n")
@@ -10,10 +10,16 @@ import asyncio
 
 # local import: db.init_db() is async and creates tables (db.py must exist)
 from db import init_db
+from services.provider_registry import close_providers
+from services.scheduler import SCHEDULER_ENABLED, RefreshScheduler
+from services.retention import RETENTION_ENABLED, RetentionWorker
+from services.broadcast import BROADCASTER
 
 from routers.stocks import router as stocks_router
 from routers.templates import router as templates_router
 from routers.candidates import router as candidates_router
+from routers.metrics import MetricsMiddleware, router as metrics_router
+from routers.admin import ProfileRequestMiddleware, router as admin_router
 
 
 logging.basicConfig(level=logging.INFO)
@@ -28,11 +34,24 @@ async def lifespan(app: FastAPI):
     logger.info("LIFESPAN: starting up - database init")
     #If init_db raises, server will not start
     await init_db()
-    
+
+    scheduler = RefreshScheduler() if SCHEDULER_ENABLED else None
+    if scheduler is not None:
+        scheduler.start()
+    retention = RetentionWorker() if RETENTION_ENABLED else None
+    if retention is not None:
+        retention.start()
+
     try:
         yield
     finally:
         logger.info("LIFESPAN: shutting down")
+        if scheduler is not None:
+            await scheduler.stop()
+        if retention is not None:
+            await retention.stop()
+        BROADCASTER.close()
+        await close_providers()
 
 app = FastAPI(
     title="ChronosCore (v0.01)",
@@ -51,6 +70,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfileRequestMiddleware)
 
 
 
@@ -58,6 +79,8 @@ app.add_middleware(
 app.include_router(stocks_router)
 app.include_router(templates_router)
 app.include_router(candidates_router)
+app.include_router(metrics_router)
+app.include_router(admin_router)
 
 @app.get("/", response_class=JSONResponse)
 async def root() -> dict:
@@ -1,20 +1,36 @@
 from typing import Optional
 from datetime import datetime, timezone, date
-from sqlalchemy import Column, Dialect, Integer, String, DateTime, func, ForeignKey, Enum as SAEnum, UniqueConstraint, Float
+from sqlalchemy import Column, Dialect, Integer, String, DateTime, func, ForeignKey, Enum as SAEnum, UniqueConstraint, Float, LargeBinary
 from sqlalchemy.types import TypeDecorator, DateTime as SADateTime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from db import Base
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 import enum, json
 
 
 
 
+class Universe(Base):
+    """
+    Named selection scope for scans and candidates (id-only addressing; name not unique).
+    """
+    __tablename__ = "universes"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    name: Mapped[str] = mapped_column(String(128), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+
 class Stock(Base):
     __tablename__ ="stocks"
     id: Mapped[int] = mapped_column(Integer,primary_key= True, index = True)
     ticker: Mapped[str] = mapped_column(String(32), nullable=False, unique=True, index=True)
     name: Mapped[Optional[str]] = mapped_column(String(256), nullable=True)
+    # Bumped whenever this stock's corporate actions change.
+    actions_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
 
 
@@ -78,22 +94,31 @@ class StockPriceCache(Base):
     )
     detail: Mapped[Optional[str]] = mapped_column(String(512), nullable=True) #last error or note
 
-    #optional backref
-    stock: Mapped["Stock"] = relationship(back_populates="price_cache", lazy="joined")
+    # Bumped whenever a refresh inserts or revises bars; stale_from is the
+    # earliest bar date whose signals have not been recomputed since.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    stale_from: Mapped[Optional[date]] = mapped_column(nullable=True)
 
+    #optional backref (loaded on access only; nothing on the hot paths reads it)
+    stock: Mapped["Stock"] = relationship(back_populates="price_cache", lazy="select")
 
+
+# Loaded on access only: eager selectin loads pulled every signal row on each
+# stock lookup. Deletes rely on the ON DELETE CASCADE foreign keys.
 Stock.price_cache = relationship(
     "StockPriceCache",
     back_populates="stock",
     cascade="all, delete-orphan",
-    lazy = "selectin"
+    lazy = "select",
+    passive_deletes=True,
 )
 
 Stock.signals = relationship(
 "StockSignal",
 back_populates="stock",
 cascade="all, delete-orphan",
-lazy="selectin",
+lazy="select",
+passive_deletes=True,
 )
     
 
@@ -116,6 +141,85 @@ class StockOHLCV(Base):
     volume: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
 
+class StockOHLCVQuarantine(Base):
+    """
+    Bars rejected by ingest validation (services.validation), kept for review
+    instead of being written to stock_ohlcv. `reasons` is a comma list of rules.
+    """
+    __tablename__ = "stock_ohlcv_quarantine"
+    stock_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("stocks.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    as_of: Mapped[date] = mapped_column(primary_key=True)
+    provider: Mapped[str] = mapped_column(String(32), primary_key=True)
+    interval: Mapped[str] = mapped_column(String(8), primary_key=True)
+
+    open: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    low: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    high: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    close: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    volume: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    reasons: Mapped[str] = mapped_column(String(128), nullable=False)
+    quarantined_at: Mapped[Optional[datetime]] = mapped_column(UtcDateTime(), nullable=True)
+
+
+class StockOHLCVArchive(Base):
+    """
+    Aged bars moved out of stock_ohlcv by services.retention: one row per
+    series and calendar year, with delta-packed dates and zlib-compressed
+    float64 columns (open, high, low, close, volume with NaN = missing).
+    """
+    __tablename__ = "stock_ohlcv_archive"
+    stock_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("stocks.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    provider: Mapped[str] = mapped_column(String(32), primary_key=True)
+    interval: Mapped[str] = mapped_column(String(8), primary_key=True)
+    year: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    length: Mapped[int] = mapped_column(Integer, nullable=False)
+    first_as_of: Mapped[date] = mapped_column(nullable=False)
+    last_as_of: Mapped[date] = mapped_column(nullable=False)
+    dates: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    columns: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    archived_at: Mapped[Optional[datetime]] = mapped_column(UtcDateTime(), nullable=True)
+
+
+class ActionKind(str, enum.Enum):
+    split = "split"
+    dividend = "dividend"
+
+
+class CorporateAction(Base):
+    """
+    Split or cash dividend, applied to stored (raw) bars at read time by
+    services.adjustments. `ratio` is new shares per old share (4.0 for a
+    4-for-1 split, 0.1 for a 1-for-10 reverse split); `amount` is the cash
+    dividend per share.
+    """
+    __tablename__ = "corporate_actions"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    stock_id: Mapped[int] = mapped_column(
+        ForeignKey("stocks.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    ex_date: Mapped[date] = mapped_column(nullable=False)
+    kind: Mapped[ActionKind] = mapped_column(SAEnum(ActionKind, name="action_kind"), nullable=False)
+    ratio: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    amount: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        UniqueConstraint("stock_id", "ex_date", "kind", name="uq_action_stock_date_kind"),
+    )
+
 
 class StockSignal(Base):
     __tablename__ ="stock_signals"
@@ -137,7 +241,31 @@ class StockSignal(Base):
     bb_lower: Mapped[Optional[float]]=mapped_column(Float, nullable=True)
     
 
-    stock: Mapped["Stock"] = relationship(back_populates="signals", lazy="joined")
+    stock: Mapped["Stock"] = relationship(back_populates="signals", lazy="select")
+
+
+class StockIndicatorSeries(Base):
+    """
+    Long-format indicator store: one row per (stock, provider, interval, indicator spec).
+    dates holds zlib-compressed int32 epoch-day deltas; values holds raw
+    little-endian float64 (NaN for warm-up bars). See services/ta/store.py.
+    """
+    __tablename__ = "stock_indicator_series"
+    stock_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("stocks.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    provider: Mapped[str] = mapped_column(String(32), primary_key=True)
+    interval: Mapped[str] = mapped_column(String(8), primary_key=True)
+    indicator_spec_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+
+    length: Mapped[int] = mapped_column(Integer, nullable=False)
+    first_as_of: Mapped[Optional[date]] = mapped_column(nullable=True)
+    last_as_of: Mapped[Optional[date]] = mapped_column(nullable=True)
+    dates: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    values: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(UtcDateTime(), nullable=True)
 
 class ScanStatus(str, enum.Enum):
     running ="running"
@@ -272,6 +400,65 @@ class TemplateUpdate(BaseModel):
             raise ValueError("score_field must be a non-empty string when provided")
         return v
 
+MAX_BULK_TICKERS = 5000
+
+class StockBulkCreate(BaseModel):
+    tickers: list[str]
+
+    @field_validator("tickers")
+    @classmethod
+    def validate_tickers(cls, v: list[str]) -> list[str]:
+        if not v:
+            raise ValueError("tickers must not be empty")
+        if len(v) > MAX_BULK_TICKERS:
+            raise ValueError(f"at most {MAX_BULK_TICKERS} tickers per request")
+        too_long = [t for t in v if len(t.strip()) > 32]
+        if too_long:
+            raise ValueError(f"tickers longer than 32 characters: {too_long[:5]}")
+        return v
+
+class StockBulkRefresh(StockBulkCreate):
+    provider: str = "yahooquery"
+    interval: str = "1d"
+
+class MatrixRequest(BaseModel):
+    tickers: list[str] = Field(min_length=1, max_length=MAX_BULK_TICKERS)
+    fields: list[str] = Field(default_factory=lambda: ["close"], min_length=1)
+    provider: str = "yahooquery"
+    interval: str = "1d"
+    start: Optional[date] = None
+    end: Optional[date] = None
+    after: Optional[date] = None  # next_after from the previous page
+    limit: int = Field(500, ge=1, le=5000)  # dates per page
+    format: str = Field("json", pattern="^(json|npz)$")
+
+class CorporateActionCreate(BaseModel):
+    kind: ActionKind
+    ex_date: date
+    ratio: Optional[float] = None
+    amount: Optional[float] = None
+
+    @model_validator(mode="after")
+    def check_kind_fields(self) -> "CorporateActionCreate":
+        if self.kind == ActionKind.split:
+            if self.ratio is None or self.ratio <= 0:
+                raise ValueError("a split needs a positive ratio")
+            self.amount = None
+        else:
+            if self.amount is None or self.amount <= 0:
+                raise ValueError("a dividend needs a positive amount")
+            self.ratio = None
+        return self
+
+class CorporateActionRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    kind: ActionKind
+    ex_date: date
+    ratio: Optional[float] = None
+    amount: Optional[float] = None
+
 class CandidateStatus(str, enum.Enum):
     proposed = "proposed"
     selected = "selected"
@@ -336,4 +523,18 @@ class GenerateCandidateRequest(BaseModel):
 class GenerateCandidateResponse(BaseModel):
     universe_id: int
     template_id: int
-    created_count: int
\ No newline at end of file
+    created_count: int
+
+class BatchEvaluateRequest(GenerateCandidateRequest):
+    tickers: list[str] = Field(min_length=1, max_length=MAX_BULK_TICKERS)
+    end: Optional[date] = None
+    lookback_days: int = Field(400, ge=1, le=20000)
+
+
+class BatchEvaluateResponse(GenerateCandidateResponse):
+    run_id: int
+    as_of: Optional[date] = None
+    evaluated: int
+    errors: int
+    missing: list[str]
+    stale: list[str]
@@ -1,62 +1,112 @@
 from __future__ import annotations
 from datetime import date
-from typing import Iterable, Optional
+from typing import TYPE_CHECKING, Iterable, Optional
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from db import upsert_statement
 from models import StockOHLCV
+from services.metrics import timed
+
+if TYPE_CHECKING:
+    from series import BarSeries
 
 
 OHLCVRow = tuple[date, float, float, float, float, Optional[float]]
 
+_PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+@timed("upsert_ohlcv")
 async def upsert_ohlcv(
         session: AsyncSession,
         *,
         stock_id: int,
         provider: str,
         interval: str,
-        rows: Iterable[OHLCVRow],
+        rows: Iterable[OHLCVRow] | BarSeries,
+        changed: list[OHLCVRow] | None = None,
 ) -> int:
     """
     Insert or update OHLCV rows for one (stock, provider, interval).
-    Returns the number of rows written or updated.
+    Returns the number of rows given; only rows that are new or differ from
+    what is stored are written, and those are appended to `changed` when given,
+    in date order, so changed[0][0] is the earliest revised as_of.
+
+    One SELECT over the incoming date range and one executemany upsert,
+    whatever the number of bars.
     """
+    import numpy as np
 
-    written = 0
+    from series import BarSeries
 
-    for as_of, open_, high, low, close, volume in rows:
-        stmt = select(StockOHLCV).where(
-            StockOHLCV.stock_id == stock_id,
-            StockOHLCV.provider == provider,
-            StockOHLCV.interval == interval,
-            StockOHLCV.as_of == as_of,
+    bars = rows if isinstance(rows, BarSeries) else BarSeries.from_rows(list(rows))
+    if not len(bars):
+        return 0
+
+    stored = await load_bar_series(
+        session,
+        stock_id=stock_id,
+        provider=provider,
+        interval=interval,
+        first_day=int(bars.days[0]),
+        last_day=int(bars.days[-1]),
+        archived=False,
+    )
+    dirty = np.ones(len(bars), dtype=bool)
+    if len(stored):
+        pos = np.minimum(np.searchsorted(stored.days, bars.days), len(stored) - 1)
+        found = stored.days[pos] == bars.days
+        same = (
+            found
+            & (stored.open[pos] == bars.open)
+            & (stored.high[pos] == bars.high)
+            & (stored.low[pos] == bars.low)
+            & (stored.close[pos] == bars.close)
+            & (stored.volume_mask[pos] == bars.volume_mask)
+            & ((stored.volume[pos] == bars.volume) | ~bars.volume_mask)
+        )
+        dirty = ~same
+
+    index = np.flatnonzero(dirty)
+    if index.size:
+        written = bars.take(index).to_rows()
+        await session.execute(
+            upsert_statement(session, StockOHLCV.__table__, update=_PRICE_COLUMNS),
+            [
+                {
+                    "stock_id": stock_id,
+                    "provider": provider,
+                    "interval": interval,
+                    "as_of": as_of,
+                    "open": open_,
+                    "high": high,
+                    "low": low,
+                    "close": close,
+                    "volume": volume,
+                }
+                for as_of, open_, high, low, close, volume in written
+            ],
         )
-        result = await session.execute(stmt)
-        existing = result.scalar_one_or_none()
-
-        if existing is None:
-            rec = StockOHLCV(
-                stock_id =stock_id,
-                as_of = as_of,
-                provider = provider,
-                interval = interval,
-                open = open_,
-                high = high,
-                low = low,
-                close = close,
-                volume = volume,
-
-            )
-            session.add(rec)
-        else:
-            existing.open = open_
-            existing.high = high
-            existing.low = low
-            existing.close = close
-            existing.volume = volume
-        written += 1
-
-    return written
+        if changed is not None:
+            changed.extend(written)
+
+    return len(bars)
+
+
+def _ohlcv_select(stock_id: int, provider: str, interval: str):
+    return select(
+        StockOHLCV.as_of,
+        StockOHLCV.open,
+        StockOHLCV.high,
+        StockOHLCV.low,
+        StockOHLCV.close,
+        StockOHLCV.volume,
+    ).where(
+        StockOHLCV.stock_id == stock_id,
+        StockOHLCV.provider == provider,
+        StockOHLCV.interval == interval,
+    )
 
 
 async def list_ohlcv_rows(
@@ -70,13 +120,10 @@ async def list_ohlcv_rows(
 
 ) -> list[OHLCVRow]:
     """
-    Read OHLCV rows for one (stock, provider, interval).
+    Read OHLCV rows for one (stock, provider, interval), including bars
+    moved to the archive by services.retention.
     """
-    stmt = select(StockOHLCV).where(
-        StockOHLCV.stock_id == stock_id,
-        StockOHLCV.provider == provider,
-        StockOHLCV.interval == interval,
-    )
+    stmt = _ohlcv_select(stock_id, provider, interval)
 
     if order_desc:
         stmt = stmt.order_by(StockOHLCV.as_of.desc())
@@ -87,9 +134,108 @@ async def list_ohlcv_rows(
         stmt = stmt.limit(limit)
 
     result = await session.execute(stmt)
-    rows = []
-    for rec in result.scalars().all():
-        rows.append((rec.as_of, rec.open, rec.high, rec.low, rec.close, rec.volume))
+    rows = [tuple(r) for r in result.all()]
     if order_desc and limit is not None:
         rows.reverse()
+
+    if limit is None or len(rows) < limit:
+        from series import BarSeries
+        from services.archive import load_archived_bars
+
+        older = await load_archived_bars(session, stock_id=stock_id, provider=provider, interval=interval)
+        if len(older):
+            merged = BarSeries.concat([older, BarSeries.from_rows(rows)])
+            if limit is not None:
+                merged = merged.take(slice(-limit, None))
+            rows = merged.to_rows()
+            if order_desc and limit is None:
+                rows.reverse()
     return rows
+
+
+async def bar_day_before(
+    session: AsyncSession,
+    *,
+    stock_id: int,
+    provider: str,
+    interval: str,
+    day: date,
+    bars: int,
+) -> Optional[date]:
+    """
+    The date of the stored bar `bars` bars before `day`, or None when fewer
+    bars than that precede it.
+    """
+    if bars <= 0:
+        return day
+    result = await session.execute(
+        select(StockOHLCV.as_of)
+        .where(
+            StockOHLCV.stock_id == stock_id,
+            StockOHLCV.provider == provider,
+            StockOHLCV.interval == interval,
+            StockOHLCV.as_of < day,
+        )
+        .order_by(StockOHLCV.as_of.desc())
+        .offset(bars - 1)
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def load_bar_series(
+    session: AsyncSession,
+    *,
+    stock_id: int,
+    provider: str,
+    interval: str,
+    first_day: int | None = None,
+    last_day: int | None = None,
+    archived: bool = True,
+) -> BarSeries:
+    """
+    Stored bars for one (stock, provider, interval) as a BarSeries, optionally
+    limited to an inclusive epoch-day range. With `archived` (the default),
+    bars moved to the archive by services.retention are merged in.
+    """
+    import numpy as np
+
+    from series import BarSeries, to_dates, to_epoch_days
+
+    stmt = _ohlcv_select(stock_id, provider, interval)
+    if first_day is not None:
+        stmt = stmt.where(StockOHLCV.as_of >= to_dates(np.array([first_day]))[0])
+    if last_day is not None:
+        stmt = stmt.where(StockOHLCV.as_of <= to_dates(np.array([last_day]))[0])
+
+    result = await session.execute(stmt.order_by(StockOHLCV.as_of))
+    rows = result.all()
+    if rows:
+        dates, o, h, l, c, v = zip(*rows)
+        volume = np.array(v, dtype=np.float64)  # NULL -> NaN
+        mask = ~np.isnan(volume)
+        bars = BarSeries(
+            to_epoch_days(dates),
+            np.array(o, dtype=np.float64),
+            np.array(h, dtype=np.float64),
+            np.array(l, dtype=np.float64),
+            np.array(c, dtype=np.float64),
+            np.where(mask, volume, 0.0),
+            mask,
+        )
+    else:
+        bars = BarSeries.empty()
+    if not archived:
+        return bars
+
+    from services.archive import load_archived_bars
+
+    older = await load_archived_bars(
+        session,
+        stock_id=stock_id,
+        provider=provider,
+        interval=interval,
+        first_day=first_day,
+        last_day=last_day,
+    )
+    return BarSeries.concat([older, bars]) if len(older) else bars
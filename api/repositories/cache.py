@@ -1,10 +1,12 @@
 from __future__ import annotations
-from datetime import datetime, timezone
-from typing import Optional
+from datetime import date, datetime, timezone
+from typing import Iterable, Optional
 
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+
+from db import upsert_statement
 from models import Stock, StockPriceCache, CacheStatus
 
 
@@ -67,3 +69,59 @@ async def upsert_cache_status(
     return row
 
 
+
+
+async def record_revision(
+    session: AsyncSession,
+    *,
+    stock_id: int,
+    provider: str,
+    interval: str,
+    changed_from: Optional[date],
+) -> StockPriceCache:
+    """
+    Note that bars from `changed_from` on were inserted or revised: bump the
+    series version and widen stale_from to cover them. With no change, just
+    returns the (possibly new) cache row. Does not commit, so the caller can
+    commit it together with the bars.
+    """
+    row = await get_cache_status(session, stock_id=stock_id, provider=provider, interval=interval)
+    if row is None:
+        row = StockPriceCache(stock_id=stock_id, provider=provider, interval=interval, version=0)
+        session.add(row)
+    if changed_from is not None:
+        row.version = (row.version or 0) + 1
+        row.stale_from = changed_from if row.stale_from is None else min(row.stale_from, changed_from)
+    return row
+
+
+async def mark_fetching(
+    session: AsyncSession,
+    *,
+    stock_ids: Iterable[int],
+    provider: str,
+    interval: str,
+    detail: str = "refresh scheduled",
+) -> None:
+    """
+    Set many series to `fetching` in one executemany upsert and commit.
+    """
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "stock_id": stock_id,
+            "provider": provider,
+            "interval": interval,
+            "status": CacheStatus.fetching,
+            "last_fetched_at": now,
+            "detail": detail,
+        }
+        for stock_id in stock_ids
+    ]
+    if rows:
+        await session.execute(
+            upsert_statement(session, StockPriceCache.__table__, update=("status", "last_fetched_at", "detail")),
+            rows,
+        )
+        await session.commit()
+
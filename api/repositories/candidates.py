@@ -0,0 +1,37 @@
+from __future__ import annotations
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import CandidateStatus, TradeCandidate
+
+
+async def list_candidates(
+    session: AsyncSession,
+    *,
+    universe_id: Optional[int] = None,
+    template_id: Optional[int] = None,
+    status: Optional[CandidateStatus] = None,
+    limit: int = 50,
+    offset: int = 0,
+) -> list[TradeCandidate]:
+    stmt = select(TradeCandidate)
+    if universe_id is not None:
+        stmt = stmt.where(TradeCandidate.universe_id == universe_id)
+    if template_id is not None:
+        stmt = stmt.where(TradeCandidate.template_id == template_id)
+    if status is not None:
+        stmt = stmt.where(TradeCandidate.status == status)
+
+    stmt = stmt.order_by(TradeCandidate.as_of.desc(), TradeCandidate.score.desc())
+    stmt = stmt.limit(limit).offset(offset)
+    res = await session.execute(stmt)
+    return list(res.scalars().all())
+
+
+async def get_candidate_by_id(
+    session: AsyncSession,
+    candidate_id: int,
+) -> TradeCandidate | None:
+    return await session.get(TradeCandidate, candidate_id)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import CorporateAction, CorporateActionCreate, Stock
+
+
+async def list_corporate_actions(session: AsyncSession, stock_id: int) -> list[CorporateAction]:
+    res = await session.execute(
+        select(CorporateAction)
+        .where(CorporateAction.stock_id == stock_id)
+        .order_by(CorporateAction.ex_date, CorporateAction.id)
+    )
+    return list(res.scalars().all())
+
+
+async def add_corporate_action(
+    session: AsyncSession,
+    *,
+    stock: Stock,
+    data: CorporateActionCreate,
+) -> CorporateAction:
+    """
+    Record one action and bump the stock's actions_version, so adjusted
+    series cached under the old version are no longer served.
+    """
+    row = CorporateAction(
+        stock_id=stock.id,
+        kind=data.kind,
+        ex_date=data.ex_date,
+        ratio=data.ratio,
+        amount=data.amount,
+    )
+    session.add(row)
+    try:
+        await _bump_actions_version(session, stock.id)
+        await session.commit()
+    except IntegrityError as exc:
+        await session.rollback()
+        raise ValueError(f"{data.kind.value} on {data.ex_date} already recorded") from exc
+    await session.refresh(row)
+    return row
+
+
+async def delete_corporate_action(session: AsyncSession, *, stock: Stock, action_id: int) -> bool:
+    row = await session.get(CorporateAction, action_id)
+    if row is None or row.stock_id != stock.id:
+        return False
+    await session.delete(row)
+    await _bump_actions_version(session, stock.id)
+    await session.commit()
+    return True
+
+
+async def _bump_actions_version(session: AsyncSession, stock_id: int) -> None:
+    # In SQL, so concurrent writers never end up sharing one version.
+    await session.execute(
+        update(Stock).where(Stock.id == stock_id).values(actions_version=Stock.actions_version + 1)
+    )
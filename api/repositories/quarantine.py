@@ -0,0 +1,74 @@
+from __future__ import annotations
+import math
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db import upsert_statement
+from models import StockOHLCVQuarantine
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from series import BarSeries
+
+
+_COLUMNS = ("open", "high", "low", "close", "volume", "reasons", "quarantined_at")
+
+
+async def quarantine_bars(
+    session: AsyncSession,
+    *,
+    stock_id: int,
+    provider: str,
+    interval: str,
+    bars: BarSeries,
+    reasons: np.ndarray,
+) -> int:
+    """
+    Record rejected bars (one executemany; a date seen again is overwritten).
+    Does not commit.
+    """
+    from services.validation import reason_names
+
+    if not len(bars):
+        return 0
+    now = datetime.now(timezone.utc)
+    await session.execute(
+        upsert_statement(session, StockOHLCVQuarantine.__table__, update=_COLUMNS),
+        [
+            {
+                "stock_id": stock_id,
+                "provider": provider,
+                "interval": interval,
+                "as_of": as_of,
+                # NaN/inf prices are part of why a bar was rejected; store them as NULL.
+                "open": open_ if math.isfinite(open_) else None,
+                "high": high if math.isfinite(high) else None,
+                "low": low if math.isfinite(low) else None,
+                "close": close if math.isfinite(close) else None,
+                "volume": volume if volume is None or math.isfinite(volume) else None,
+                "reasons": reason_names(int(mask)),
+                "quarantined_at": now,
+            }
+            for (as_of, open_, high, low, close, volume), mask in zip(bars.to_rows(), reasons.tolist())
+        ],
+    )
+    return len(bars)
+
+
+async def list_quarantined(
+    session: AsyncSession, *, stock_id: int, provider: str, interval: str
+) -> list[StockOHLCVQuarantine]:
+    res = await session.execute(
+        select(StockOHLCVQuarantine)
+        .where(
+            StockOHLCVQuarantine.stock_id == stock_id,
+            StockOHLCVQuarantine.provider == provider,
+            StockOHLCVQuarantine.interval == interval,
+        )
+        .order_by(StockOHLCVQuarantine.as_of)
+    )
+    return list(res.scalars().all())
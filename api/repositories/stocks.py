@@ -1,12 +1,27 @@
 from __future__ import annotations
-from typing import Optional, Sequence
+from typing import Dict, Iterable, Iterator, Optional, Sequence, TypeVar
 
 from sqlalchemy import select, delete
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from db import insert_ignore_statement
 from models import Stock
 
+# Keeps IN lists and executemany batches well under driver parameter limits.
+_CHUNK = 900
+
+_T = TypeVar("_T")
+
+
+def chunked(items: Sequence[_T], size: int = _CHUNK) -> Iterator[Sequence[_T]]:
+    """
+    Consecutive slices of at most `size` items, for IN lists and executemany batches.
+    """
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
 #  // normalize the ticker to uppercase
 def _norm_ticker(t: str) -> str:
     return t.strip().upper()
@@ -49,4 +64,36 @@ async def get_or_create_stock(
     return s
 
 
+def normalize_tickers(tickers: Iterable[str]) -> list[str]:
+    """
+    Normalised, de-duplicated tickers in first-seen order; blanks dropped.
+    """
+    return list(dict.fromkeys(t for t in map(_norm_ticker, tickers) if t))
+
+
+async def get_stock_ids(session: AsyncSession, tickers: Iterable[str]) -> Dict[str, int]:
+    """
+    ticker -> id for the tickers that exist, one SELECT per 900 tickers.
+    """
+    wanted = normalize_tickers(tickers)
+    ids: Dict[str, int] = {}
+    for part in chunked(wanted):
+        res = await session.execute(select(Stock.ticker, Stock.id).where(Stock.ticker.in_(part)))
+        ids.update(res.all())
+    return {t: ids[t] for t in wanted if t in ids}
+
 
+async def get_or_create_stocks(session: AsyncSession, tickers: Iterable[str]) -> Dict[str, int]:
+    """
+    Batch get_or_create_stock: inserts the missing tickers with ON CONFLICT
+    DO NOTHING (so concurrent callers cannot fail on the unique ticker),
+    commits, and returns ticker -> id for every normalised ticker in input order.
+    """
+    wanted = normalize_tickers(tickers)
+    if not wanted:
+        return {}
+    stmt = insert_ignore_statement(session, Stock.__table__, conflict=("ticker",))
+    for part in chunked(wanted):
+        await session.execute(stmt, [{"ticker": t} for t in part])
+    await session.commit()
+    return await get_stock_ids(session, wanted)
@@ -0,0 +1,109 @@
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from services.profiling import (
+    ProfilerBusy,
+    output_path,
+    profile_window,
+    profiled,
+    start_tracemalloc,
+    stop_tracemalloc,
+    tracemalloc_report,
+)
+from services.tracing import start_tracing, stop_tracing, tracing_enabled, write_trace
+
+
+def admin_enabled() -> bool:
+    return os.environ.get("CHRONOS_ADMIN", "0") == "1"
+
+
+def require_admin() -> None:
+    # Opt-in surface: invisible unless CHRONOS_ADMIN=1.
+    if not admin_enabled():
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.post("/profile")
+async def profile(
+    seconds: float = Query(5.0, gt=0, le=300),
+    limit: int = Query(30, ge=1, le=500),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|ncalls)$"),
+) -> dict:
+    """cProfile the event loop for a timed window."""
+    try:
+        return await profile_window(seconds, limit=limit, sort=sort)
+    except ProfilerBusy as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+
+@router.post("/tracemalloc/start")
+async def tracemalloc_start(frames: int = Query(10, ge=1, le=100)) -> dict:
+    start_tracemalloc(frames)
+    return {"tracing": True, "frames": frames}
+
+
+@router.get("/tracemalloc")
+async def tracemalloc_snapshot(limit: int = Query(20, ge=1, le=200)) -> dict:
+    """Top allocation sites and growth since /tracemalloc/start; snapshot is saved to disk."""
+    try:
+        return tracemalloc_report(limit=limit)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+
+@router.post("/tracemalloc/stop")
+async def tracemalloc_stop() -> dict:
+    stop_tracemalloc()
+    return {"tracing": False}
+
+
+@router.post("/trace/start")
+async def trace_start() -> dict:
+    start_tracing()
+    return {"tracing": True}
+
+
+@router.post("/trace/stop")
+async def trace_stop() -> dict:
+    """Stop span recording and write Chrome trace-event JSON."""
+    if not tracing_enabled():
+        raise HTTPException(status_code=409, detail="tracing is not running")
+    events = stop_tracing()
+    path = write_trace(output_path("trace", ".json"), events)
+    return {"path": path, "events": len(events)}
+
+
+class ProfileRequestMiddleware:
+    """
+    With admin enabled, a request carrying `X-Chronos-Profile: 1` is run
+    under cProfile; the .prof path comes back in the same response header.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if (
+            scope["type"] != "http"
+            or (b"x-chronos-profile", b"1") not in scope["headers"]
+            or not admin_enabled()
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        path = output_path("request", ".prof")
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-chronos-profile", path.encode())]}
+            await send(message)
+
+        try:
+            with profiled("request", path=path):
+                await self.app(scope, receive, send_wrapper)
+        except ProfilerBusy:
+            await self.app(scope, receive, send)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db import get_session
+from models import BatchEvaluateRequest, BatchEvaluateResponse, CandidateRead, CandidateStatus, Universe
+from repositories.candidates import get_candidate_by_id, list_candidates
+from repositories.templates import get_template_by_id
+
+
+router = APIRouter(prefix="/candidates", tags=["candidates"])
+
+
+@router.get("", response_model=list[CandidateRead])
+async def list_candidates_endpoint(
+    universe_id: Optional[int] = Query(None),
+    template_id: Optional[int] = Query(None),
+    status: Optional[CandidateStatus] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    session: AsyncSession = Depends(get_session),
+) -> list[CandidateRead]:
+    rows = await list_candidates(
+        session,
+        universe_id=universe_id,
+        template_id=template_id,
+        status=status,
+        limit=limit,
+        offset=offset,
+    )
+    return [CandidateRead.model_validate(r) for r in rows]
+
+
+@router.post("/evaluate", response_model=BatchEvaluateResponse)
+async def evaluate_batch_endpoint(
+    payload: BatchEvaluateRequest,
+    session: AsyncSession = Depends(get_session),
+) -> BatchEvaluateResponse:
+    """
+    Evaluate one template against every ticker in the request and store the
+    qualifying ones as proposed candidates.
+    """
+    from services.backtest.batch import evaluate_template_batch
+
+    template = await get_template_by_id(session, payload.template_id)
+    if template is None:
+        raise HTTPException(status_code=404, detail="template not found")
+    if await session.get(Universe, payload.universe_id) is None:
+        raise HTTPException(status_code=404, detail="universe not found")
+    try:
+        res = await evaluate_template_batch(
+            session,
+            template=template,
+            universe_id=payload.universe_id,
+            tickers=payload.tickers,
+            provider=payload.provider,
+            interval=payload.interval,
+            end=payload.end,
+            lookback_days=payload.lookback_days,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return BatchEvaluateResponse(
+        universe_id=payload.universe_id,
+        template_id=template.id,
+        created_count=res.created,
+        run_id=res.run_id,
+        as_of=res.as_of,
+        evaluated=res.evaluated,
+        errors=res.errors,
+        missing=res.missing,
+        stale=res.stale,
+    )
+
+
+@router.get("/{candidate_id}", response_model=CandidateRead)
+async def get_candidate_endpoint(
+    candidate_id: int,
+    session: AsyncSession = Depends(get_session),
+) -> CandidateRead:
+    row = await get_candidate_by_id(session, candidate_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="candidate not found")
+    return CandidateRead.model_validate(row)
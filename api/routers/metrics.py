@@ -0,0 +1,52 @@
+import time
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from services.metrics import HTTP_DB_QUERIES, HTTP_DB_SECONDS, HTTP_LATENCY, HTTP_REQUESTS, REGISTRY
+from services.querylog import report, track_queries
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Prometheus text exposition of the in-process registry."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: latency, status and SQL usage per route template
+    (e.g. /stocks/{ticker}/ohlcv), so label cardinality stays bounded.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        t0 = time.perf_counter()
+        with track_queries() as log:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                elapsed = time.perf_counter() - t0
+                route = getattr(scope.get("route"), "path", "unmatched")
+                method = scope["method"]
+                HTTP_REQUESTS.inc(method=method, route=route, status=status)
+                HTTP_LATENCY.observe(elapsed, method=method, route=route)
+                HTTP_DB_QUERIES.observe(log.count, route=route)
+                HTTP_DB_SECONDS.observe(log.seconds, route=route)
+                report(log, f"{method} {route}")
@@ -1,18 +1,97 @@
-import asyncio
-
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db import get_session
-from repositories.stocks import get_stock_by_ticker
-from repositories.cache import get_cache_status, upsert_cache_status
-from models import CacheStatus
+from repositories.stocks import get_or_create_stocks, get_stock_by_ticker, get_stock_ids, normalize_tickers
+from repositories.cache import get_cache_status, mark_fetching, upsert_cache_status
+from repositories.corporate_actions import add_corporate_action, delete_corporate_action, list_corporate_actions
+from models import (
+    CacheStatus,
+    CorporateActionCreate,
+    CorporateActionRead,
+    MatrixRequest,
+    StockBulkCreate,
+    StockBulkRefresh,
+)
 from ohlcv import list_ohlcv_rows
 from services.ta.signals import list_signal_rows
-from services.refresh_prices import refresh_stock_prices_background
+from services.refresh_prices import schedule_refresh, schedule_refresh_batch
+from services.broadcast import BROADCASTER, encode_event, publish_status
 
 router = APIRouter(prefix="/stocks", tags =["stocks"])
 
+@router.post("/bulk")
+async def register_stocks(
+    payload: StockBulkCreate,
+    session: AsyncSession = Depends(get_session),
+) -> dict:
+    """
+    Register many tickers at once (existing ones are left alone) and
+    resolve them: {"stocks": {TICKER: id}} in input order, normalised.
+    """
+    ids = await get_or_create_stocks(session, payload.tickers)
+    return {"count": len(ids), "stocks": ids}
+
+
+@router.post("/refresh", status_code=status.HTTP_202_ACCEPTED)
+async def refresh_stocks(
+    payload: StockBulkRefresh,
+    session: AsyncSession = Depends(get_session),
+) -> dict:
+    """
+    Register the tickers if needed, mark every series fetching in one
+    statement and refresh them in the background with bounded concurrency.
+    """
+    ids = await get_or_create_stocks(session, payload.tickers)
+    await mark_fetching(session, stock_ids=ids.values(), provider=payload.provider, interval=payload.interval)
+    for stock_id in ids.values():
+        publish_status((stock_id, payload.provider, payload.interval), CacheStatus.fetching.value, "refresh scheduled")
+    schedule_refresh_batch(tickers=list(ids), provider=payload.provider, interval=payload.interval, revalidate=True)
+    return {
+        "provider": payload.provider,
+        "interval": payload.interval,
+        "status": CacheStatus.fetching.value,
+        "scheduled": len(ids),
+        "stocks": ids,
+    }
+
+
+@router.post("/matrix")
+async def read_matrix(
+    payload: MatrixRequest,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Stored bars/signals for many tickers as aligned date x ticker matrices,
+    one page of `limit` dates at a time: pass the returned `next_after` back
+    as `after` for the next page. format=npz returns the same page as a
+    numpy .npz (next cursor in the X-Next-After header).
+    """
+    from services.matrix import load_matrix, matrix_json, matrix_npz
+
+    ids = await get_stock_ids(session, payload.tickers)
+    missing = [t for t in normalize_tickers(payload.tickers) if t not in ids]
+    try:
+        page = await load_matrix(
+            session,
+            stock_ids=ids,
+            fields=payload.fields,
+            provider=payload.provider,
+            interval=payload.interval,
+            start=payload.start,
+            end=payload.end,
+            after=payload.after,
+            limit=payload.limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if payload.format == "npz":
+        headers = {"X-Next-After": page.next_after.isoformat()} if page.next_after else {}
+        return Response(matrix_npz(page, missing), media_type="application/x-npz", headers=headers)
+    return matrix_json(page, missing)
+
+
 @router.get("/{ticker}/status")
 async def get_stock_status(
     ticker: str,
@@ -35,7 +114,8 @@ async def get_stock_status(
         "interval": row.interval,
         "status": row.status.value,
         "last_fetched_at": row.last_fetched_at.isoformat() if row.last_fetched_at else None,
-        "detail": row.detail
+        "detail": row.detail,
+        "version": row.version,
 
     }
 
@@ -45,20 +125,31 @@ async def get_stock_ohlcv(
     provider: str = Query("yahooquery"),
     interval: str = Query("1d"),
     limit: int | None = Query(None, ge=1, le=2000),
+    adjust: str = Query("none", pattern="^(none|split|all)$", description="corporate-action adjustment"),
     session: AsyncSession = Depends(get_session),
 ) -> list[dict]:
     stock = await get_stock_by_ticker(session, ticker)
     if not stock:
         raise HTTPException(status_code=404, detail="stock not found")
 
-    rows = await list_ohlcv_rows(
-        session,
-        stock_id=stock.id,
-        provider=provider,
-        interval=interval,
-        limit=limit,
-        order_desc=limit is not None,
-    )
+    if adjust != "none":
+        from services.adjustments import load_adjusted_bars
+
+        bars = await load_adjusted_bars(
+            session, stock=stock, provider=provider, interval=interval, mode=adjust
+        )
+        if limit is not None:
+            bars = bars.take(slice(-limit, None))
+        rows = bars.to_rows()
+    else:
+        rows = await list_ohlcv_rows(
+            session,
+            stock_id=stock.id,
+            provider=provider,
+            interval=interval,
+            limit=limit,
+            order_desc=limit is not None,
+        )
 
     return [
         {
@@ -73,6 +164,50 @@ async def get_stock_ohlcv(
     ]
 
 
+@router.get("/{ticker}/actions", response_model=list[CorporateActionRead])
+async def list_stock_actions(
+    ticker: str,
+    session: AsyncSession = Depends(get_session),
+) -> list[CorporateActionRead]:
+    stock = await get_stock_by_ticker(session, ticker)
+    if not stock:
+        raise HTTPException(status_code=404, detail="stock not found")
+    rows = await list_corporate_actions(session, stock.id)
+    return [CorporateActionRead.model_validate(r) for r in rows]
+
+
+@router.post("/{ticker}/actions", response_model=CorporateActionRead, status_code=status.HTTP_201_CREATED)
+async def add_stock_action(
+    ticker: str,
+    payload: CorporateActionCreate,
+    session: AsyncSession = Depends(get_session),
+) -> CorporateActionRead:
+    """
+    Record a split or dividend. Stored bars are untouched; ?adjust= reads
+    of /ohlcv pick it up immediately.
+    """
+    stock = await get_stock_by_ticker(session, ticker)
+    if not stock:
+        raise HTTPException(status_code=404, detail="stock not found")
+    try:
+        row = await add_corporate_action(session, stock=stock, data=payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    return CorporateActionRead.model_validate(row)
+
+
+@router.delete("/{ticker}/actions/{action_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_stock_action(
+    ticker: str,
+    action_id: int,
+    session: AsyncSession = Depends(get_session),
+) -> None:
+    stock = await get_stock_by_ticker(session, ticker)
+    if not stock or not await delete_corporate_action(session, stock=stock, action_id=action_id):
+        raise HTTPException(status_code=404, detail="action not found")
+    return None
+
+
 @router.get("/{ticker}/signals")
 async def get_stock_signals(
     ticker: str,
@@ -123,6 +258,7 @@ async def refresh_stock(
     ticker: str,
     provider: str = Query("yahooquery"),
     interval: str = Query("1d"),
+    hedge_ms: int | None = Query(None, ge=1, le=60000, description="start the next fallback provider after this long"),
     session: AsyncSession = Depends(get_session),
 ) -> dict:
     #resolve ticker -> stock:
@@ -130,7 +266,7 @@ async def refresh_stock(
     if not stock:
         raise HTTPException(status_code=404, detail = "stock not found")
     
-    await upsert_cache_status(
+    pending = await upsert_cache_status(
         session,
         stock_id = stock.id,
         provider = provider,
@@ -138,13 +274,14 @@ async def refresh_stock(
         status = CacheStatus.fetching,
         detail = "refresh scheduled"
     )
+    publish_status((stock.id, provider, interval), pending.status.value, pending.detail, pending.last_fetched_at)
 
-    asyncio.create_task(
-        refresh_stock_prices_background(
-            ticker=stock.ticker,
-            provider=provider,
-            interval=interval,
-        )
+    schedule_refresh(
+        ticker=stock.ticker,
+        provider=provider,
+        interval=interval,
+        hedge_after=hedge_ms / 1000 if hedge_ms else None,
+        revalidate=True,
     )
 
     row = await get_cache_status(
@@ -161,3 +298,40 @@ async def refresh_stock(
         "detail": row.detail if row else "refresh scheduled",
     }
     
+
+
+@router.get("/{ticker}/stream")
+async def stream_stock_updates(
+    ticker: str,
+    provider: str = Query("yahooquery"),
+    interval: str = Query("1d"),
+    session: AsyncSession = Depends(get_session),
+) -> StreamingResponse:
+    """
+    Server-sent events for one series: the current status on connect, then
+    `status` transitions and only the new or changed `bars` / `signals` as
+    each refresh commits. A `resync` event means the client fell behind and
+    should reload over GET and reconnect.
+    """
+    stock = await get_stock_by_ticker(session, ticker)
+    if not stock:
+        raise HTTPException(status_code=404, detail="stock not found")
+    row = await get_cache_status(session, stock_id=stock.id, provider=provider, interval=interval)
+    # The session dependency lives as long as the response; hand the
+    # connection back now rather than holding it for the whole stream.
+    await session.close()
+    # Subscribe before replying so no transition is missed after the snapshot.
+    sub = BROADCASTER.subscribe((stock.id, provider, interval))
+    snapshot = encode_event(
+        "status",
+        {
+            "status": row.status.value if row else CacheStatus.unknown.value,
+            "detail": row.detail if row else None,
+            "last_fetched_at": row.last_fetched_at.isoformat() if row and row.last_fetched_at else None,
+        },
+    )
+    return StreamingResponse(
+        BROADCASTER.stream(sub, first=snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
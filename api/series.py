@@ -0,0 +1,178 @@
+"""
+Column-oriented bar and signal series.
+
+Dates are int32 days since 1970-01-01 and prices float64 columns, so a
+series moves between provider, store and TA code as a handful of arrays
+instead of one tuple of boxed objects per bar. Missing volume is carried by
+`volume_mask` (volume itself is 0.0 there). The tuple row types stay the
+public row format; from_rows()/to_rows() are the adapters.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import date
+from typing import TYPE_CHECKING, Iterable, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from ohlcv import OHLCVRow
+    from services.ta.signals import SignalRow
+
+
+EPOCH = np.datetime64("1970-01-01", "D")
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# SignalRow / StockSignal column order after the date.
+SIGNAL_COLUMNS = ("rsi", "macd", "macd_signal", "ema_20", "ema_50", "bb_upper", "bb_lower")
+
+
+def to_epoch_days(dates: Iterable[date] | np.ndarray) -> np.ndarray:
+    """
+    date objects or datetime64 values -> int32 days since 1970-01-01.
+    """
+    if isinstance(dates, np.ndarray) and dates.dtype.kind == "M":
+        return dates.astype("datetime64[D]").astype(np.int64).astype(np.int32)
+    return np.fromiter((d.toordinal() - _EPOCH_ORDINAL for d in dates), dtype=np.int32)
+
+
+def to_dates(days: np.ndarray) -> list[date]:
+    return (EPOCH + days.astype("timedelta64[D]")).astype(object).tolist()
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class BarSeries:
+    days: np.ndarray  # int32, ascending, unique
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    volume_mask: np.ndarray  # bool, True where volume is known
+    # Set by from_columns() when its input was not strictly ascending: the
+    # bars it dropped in favour of a later bar on the same date, and how many
+    # rows arrived earlier-dated than the row before them.
+    superseded: BarSeries | None = None
+    unordered: int = 0
+
+    def __len__(self) -> int:
+        return int(self.days.size)
+
+    @classmethod
+    def empty(cls) -> BarSeries:
+        f = np.empty(0, dtype=np.float64)
+        return cls(np.empty(0, dtype=np.int32), f, f, f, f, f, np.empty(0, dtype=bool))
+
+    @classmethod
+    def from_columns(
+        cls,
+        dates: np.ndarray,
+        open_: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+    ) -> BarSeries:
+        """
+        Build from datetime64 or epoch-day dates and float columns with NaN
+        for missing volume; sorts by date and keeps the last of duplicates,
+        recording what it dropped in `superseded` and `unordered`.
+        """
+        days = to_epoch_days(dates) if dates.dtype.kind == "M" else dates.astype(np.int32, copy=False)
+        volume = np.asarray(volume, dtype=np.float64)
+        cols = [np.asarray(c, dtype=np.float64) for c in (open_, high, low, close)]
+        superseded, unordered = None, 0
+        if days.size > 1 and not np.all(days[1:] > days[:-1]):
+            unordered = int(np.count_nonzero(days[1:] < days[:-1]))
+            order = np.argsort(days, kind="stable")
+            days, volume = days[order], volume[order]
+            cols = [c[order] for c in cols]
+            last = np.r_[days[1:] != days[:-1], True]
+            if not last.all():
+                gone = ~np.isnan(volume[~last])
+                superseded = cls(
+                    days[~last], *(c[~last] for c in cols), np.where(gone, volume[~last], 0.0), gone
+                )
+            days, volume = days[last], volume[last]
+            cols = [c[last] for c in cols]
+        mask = ~np.isnan(volume)
+        return cls(days, *cols, np.where(mask, volume, 0.0), mask, superseded, unordered)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[OHLCVRow]) -> BarSeries:
+        if not rows:
+            return cls.empty()
+        dates, o, h, l, c, v = zip(*rows)
+        vol = np.array([np.nan if x is None else x for x in v], dtype=np.float64)
+        return cls.from_columns(to_epoch_days(dates), np.array(o), np.array(h), np.array(l), np.array(c), vol)
+
+    @classmethod
+    def concat(cls, parts: Sequence[BarSeries]) -> BarSeries:
+        """
+        Join series; on a repeated date the later part's bar wins.
+        """
+        return cls.from_columns(
+            np.concatenate([p.days for p in parts]),
+            np.concatenate([p.open for p in parts]),
+            np.concatenate([p.high for p in parts]),
+            np.concatenate([p.low for p in parts]),
+            np.concatenate([p.close for p in parts]),
+            np.concatenate([p.volume_or_nan() for p in parts]),
+        )
+
+    def volume_or_nan(self) -> np.ndarray:
+        return np.where(self.volume_mask, self.volume, np.nan)
+
+    def dates(self) -> np.ndarray:
+        return EPOCH + self.days.astype("timedelta64[D]")
+
+    def take(self, index: np.ndarray) -> BarSeries:
+        return BarSeries(
+            self.days[index],
+            self.open[index],
+            self.high[index],
+            self.low[index],
+            self.close[index],
+            self.volume[index],
+            self.volume_mask[index],
+        )
+
+    def to_rows(self) -> list[OHLCVRow]:
+        vols = [v if m else None for v, m in zip(self.volume.tolist(), self.volume_mask.tolist())]
+        return list(
+            zip(to_dates(self.days), self.open.tolist(), self.high.tolist(), self.low.tolist(), self.close.tolist(), vols)
+        )
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class SignalSeries:
+    days: np.ndarray  # int32, ascending
+    values: np.ndarray  # float64 (n, len(SIGNAL_COLUMNS)); NaN = missing
+
+    def __len__(self) -> int:
+        return int(self.days.size)
+
+    @classmethod
+    def empty(cls) -> SignalSeries:
+        return cls(np.empty(0, dtype=np.int32), np.empty((0, len(SIGNAL_COLUMNS))))
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[SignalRow]) -> SignalSeries:
+        if not rows:
+            return cls.empty()
+        days = to_epoch_days(r[0] for r in rows)
+        values = np.array([r[1:] for r in rows], dtype=np.float64)  # None -> NaN
+        order = np.argsort(days, kind="stable")
+        return cls(days[order], values[order])
+
+    def column(self, name: str) -> np.ndarray:
+        return self.values[:, SIGNAL_COLUMNS.index(name)]
+
+    def take(self, index: np.ndarray) -> SignalSeries:
+        return SignalSeries(self.days[index], self.values[index])
+
+    def to_rows(self) -> list[SignalRow]:
+        dates = to_dates(self.days)
+        return [
+            (d, *(None if x != x else x for x in row))
+            for d, row in zip(dates, self.values.tolist())
+        ]
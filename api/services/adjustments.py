@@ -0,0 +1,156 @@
+"""
+Read-time split and dividend adjustment of stored bars.
+
+stock_ohlcv keeps bars as the provider reported them, unadjusted. A
+corporate action is one corporate_actions row, and adjusted series are
+derived on read by multiplying each bar by the cumulative factor of every
+action after it. Results are cached per (series version, actions version),
+so a split costs one row insert instead of a history rewrite.
+
+Modes: "none" (stored bars), "split" (splits only), "all" (splits and cash
+dividends, using the close before the ex-date as in the usual
+back-adjustment).
+"""
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Sequence
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import ActionKind, CorporateAction, Stock
+from ohlcv import load_bar_series
+from repositories.cache import get_cache_status
+from repositories.corporate_actions import list_corporate_actions
+from series import BarSeries, to_epoch_days
+
+
+ADJUST_MODES = ("none", "split", "all")
+
+
+def cumulative_factors(
+    days: np.ndarray,
+    close: np.ndarray,
+    actions: Sequence[CorporateAction],
+    *,
+    dividends: bool = True,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (price factor, volume factor) per bar: the product over every action
+    whose ex-date is after the bar.
+    """
+    used = [a for a in actions if a.kind == ActionKind.split or dividends]
+    n = days.size
+    if not used or n == 0:
+        return np.ones(n), np.ones(n)
+
+    used.sort(key=lambda a: a.ex_date)
+    ex_days = to_epoch_days(a.ex_date for a in used)
+    is_split = np.array([a.kind == ActionKind.split for a in used])
+    ratio = np.array([a.ratio if a.ratio else 1.0 for a in used])
+    amount = np.array([a.amount if a.amount else 0.0 for a in used])
+
+    # Raw close of the last bar before each ex-date; none before the series
+    # start means the action touches no bar.
+    prev = np.searchsorted(days, ex_days, side="left") - 1
+    prev_close = np.where(prev >= 0, close[np.maximum(prev, 0)], np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        div_factor = 1.0 - amount / prev_close
+    div_factor = np.where(np.isfinite(div_factor) & (div_factor > 0), div_factor, 1.0)
+
+    price = np.where(is_split, 1.0 / ratio, div_factor)
+    volume = np.where(is_split, ratio, 1.0)
+
+    # suffix[k] = product of factors k.., so a bar preceded by k actions
+    # (ex-date on or before it) takes suffix[k].
+    after = np.searchsorted(ex_days, days, side="right")
+    price_suffix = np.r_[np.cumprod(price[::-1])[::-1], 1.0]
+    volume_suffix = np.r_[np.cumprod(volume[::-1])[::-1], 1.0]
+    return price_suffix[after], volume_suffix[after]
+
+
+def adjust_bars(bars: BarSeries, actions: Sequence[CorporateAction], mode: str) -> BarSeries:
+    if mode not in ADJUST_MODES:
+        raise ValueError(f"unknown adjust mode {mode!r}; expected one of {ADJUST_MODES}")
+    if mode == "none" or not actions or not len(bars):
+        return bars
+    price, volume = cumulative_factors(bars.days, bars.close, actions, dividends=mode == "all")
+    return BarSeries(
+        bars.days,
+        bars.open * price,
+        bars.high * price,
+        bars.low * price,
+        bars.close * price,
+        bars.volume * volume,
+        bars.volume_mask,
+    )
+
+
+class AdjustedCache:
+    """
+    LRU of adjusted BarSeries keyed by (series, mode, series version, actions version).
+    Thread-safe, like IndicatorCache.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, BarSeries] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[BarSeries]:
+        with self._lock:
+            bars = self._data.get(key)
+            if bars is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return bars
+
+    def put(self, key: Hashable, bars: BarSeries) -> None:
+        for col in (bars.days, bars.open, bars.high, bars.low, bars.close, bars.volume, bars.volume_mask):
+            col.flags.writeable = False
+        with self._lock:
+            self._data[key] = bars
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+ADJUSTED_CACHE = AdjustedCache()
+
+
+async def load_adjusted_bars(
+    session: AsyncSession,
+    *,
+    stock: Stock,
+    provider: str,
+    interval: str,
+    mode: str,
+    cache: Optional[AdjustedCache] = ADJUSTED_CACHE,
+) -> BarSeries:
+    """
+    Stored bars for one series, adjusted for the stock's corporate actions.
+    Series that have never been refreshed have no version and are not cached.
+    """
+    row = await get_cache_status(session, stock_id=stock.id, provider=provider, interval=interval)
+    key = None
+    if cache is not None and row is not None:
+        key = (stock.id, provider, interval, mode, row.version, stock.actions_version)
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+
+    bars = await load_bar_series(session, stock_id=stock.id, provider=provider, interval=interval)
+    actions = await list_corporate_actions(session, stock.id) if mode != "none" else []
+    adjusted = adjust_bars(bars, actions, mode)
+    if key is not None:
+        cache.put(key, adjusted)
+    return adjusted
@@ -0,0 +1,225 @@
+"""
+Compressed columnar archive of aged bars (stock_ohlcv_archive).
+
+One row per series and calendar year: dates delta-packed as in the
+indicator store, and the price/volume columns byte-shuffled and
+zlib-compressed. services.retention decides what moves here;
+load_bar_series and list_ohlcv_rows read it back transparently.
+"""
+from __future__ import annotations
+import zlib
+from datetime import date, datetime, timezone
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db import upsert_statement
+from models import StockOHLCV, StockOHLCVArchive
+from ohlcv import load_bar_series
+from repositories.stocks import chunked
+from series import BarSeries, to_dates, to_epoch_days
+from services.ta.store import pack_dates, unpack_dates
+
+
+_ARCHIVE_COLUMNS = ("length", "first_as_of", "last_as_of", "dates", "columns", "archived_at")
+
+
+def encode_columns(bars: BarSeries) -> bytes:
+    cols = np.stack([bars.open, bars.high, bars.low, bars.close, bars.volume_or_nan()]).astype("<f8")
+    # Byte-shuffle: the exponent/high-mantissa bytes of neighbouring prices
+    # repeat, and zlib finds far more of that when they sit together.
+    shuffled = cols.reshape(-1).view(np.uint8).reshape(-1, 8).T
+    return zlib.compress(np.ascontiguousarray(shuffled).tobytes(), 6)
+
+
+def decode_chunk(dates: bytes, columns: bytes) -> BarSeries:
+    days = unpack_dates(dates)
+    raw = np.frombuffer(zlib.decompress(columns), dtype=np.uint8).reshape(8, -1).T
+    o, h, l, c, v = np.ascontiguousarray(raw).view("<f8").reshape(5, days.size).astype(np.float64)
+    return BarSeries.from_columns(days, o, h, l, c, v)
+
+
+async def load_archived_bars(
+    session: AsyncSession,
+    *,
+    stock_id: int,
+    provider: str,
+    interval: str,
+    first_day: Optional[int] = None,
+    last_day: Optional[int] = None,
+) -> BarSeries:
+    """
+    Archived bars for one series, optionally limited to an inclusive
+    epoch-day range. Only the year chunks overlapping the range are read.
+    """
+    found = await load_archived_many(
+        session, stock_ids=[stock_id], provider=provider, interval=interval, first_day=first_day, last_day=last_day
+    )
+    return found.get(stock_id, BarSeries.empty())
+
+
+def _in_range(stmt, first_day: Optional[int], last_day: Optional[int]):
+    if first_day is not None:
+        stmt = stmt.where(StockOHLCVArchive.last_as_of >= to_dates(np.array([first_day]))[0])
+    if last_day is not None:
+        stmt = stmt.where(StockOHLCVArchive.first_as_of <= to_dates(np.array([last_day]))[0])
+    return stmt.order_by(StockOHLCVArchive.stock_id, StockOHLCVArchive.year)
+
+
+async def load_archived_many(
+    session: AsyncSession,
+    *,
+    stock_ids: Sequence[int],
+    provider: str,
+    interval: str,
+    first_day: Optional[int] = None,
+    last_day: Optional[int] = None,
+    max_dates: Optional[int] = None,
+) -> Dict[int, BarSeries]:
+    """
+    load_archived_bars for many stocks, one query per 900 stocks; stocks
+    with nothing archived in the range are left out. With `max_dates`, the
+    range also ends where the chunk metadata shows some stock holding that
+    many archived bars from `first_day` on, so a caller after the first
+    `max_dates` dates never fetches or decodes the chunks beyond them.
+    """
+    ids = list(stock_ids)
+    if max_dates is not None:
+        lengths = await _chunk_lengths(session, ids, provider, interval, first_day, last_day)
+        if not lengths:
+            return {}
+        horizon = _horizon(lengths, first_day, max_dates)
+        if horizon is not None and (last_day is None or horizon < last_day):
+            last_day = horizon
+
+    chunks: Dict[int, list[BarSeries]] = {}
+    for part in chunked(ids):
+        stmt = select(StockOHLCVArchive.stock_id, StockOHLCVArchive.dates, StockOHLCVArchive.columns).where(
+            StockOHLCVArchive.stock_id.in_(part),
+            StockOHLCVArchive.provider == provider,
+            StockOHLCVArchive.interval == interval,
+        )
+        res = await session.execute(_in_range(stmt, first_day, last_day))
+        for stock_id, d, c in res.all():
+            chunks.setdefault(stock_id, []).append(decode_chunk(d, c))
+    out: Dict[int, BarSeries] = {}
+    for stock_id, parts in chunks.items():
+        bars = BarSeries.concat(parts)
+        lo = 0 if first_day is None else np.searchsorted(bars.days, first_day, side="left")
+        hi = len(bars) if last_day is None else np.searchsorted(bars.days, last_day, side="right")
+        if hi > lo:
+            out[stock_id] = bars.take(slice(lo, hi))
+    return out
+
+
+async def _chunk_lengths(
+    session: AsyncSession,
+    ids: list[int],
+    provider: str,
+    interval: str,
+    first_day: Optional[int],
+    last_day: Optional[int],
+) -> list[tuple]:
+    """
+    (stock_id, first_as_of, last_as_of, length) of the chunks in range, in
+    stock and year order, without their blobs.
+    """
+    out: list[tuple] = []
+    for part in chunked(ids):
+        stmt = select(
+            StockOHLCVArchive.stock_id,
+            StockOHLCVArchive.first_as_of,
+            StockOHLCVArchive.last_as_of,
+            StockOHLCVArchive.length,
+        ).where(
+            StockOHLCVArchive.stock_id.in_(part),
+            StockOHLCVArchive.provider == provider,
+            StockOHLCVArchive.interval == interval,
+        )
+        out.extend((await session.execute(_in_range(stmt, first_day, last_day))).all())
+    return out
+
+
+def _horizon(lengths: Sequence[tuple], first_day: Optional[int], count: int) -> Optional[int]:
+    """
+    Earliest epoch day by which one stock's chunks alone hold `count` bars
+    on or after `first_day`; None when no stock holds that many.
+    """
+    first = to_dates(np.array([first_day]))[0] if first_day is not None else None
+    held: Dict[int, int] = {}
+    horizon: Optional[int] = None
+    for stock_id, first_as_of, last_as_of, length in lengths:
+        if first is not None and first_as_of < first:
+            continue  # straddles first_day, so how many of its bars count is unknown
+        before = held.get(stock_id, 0)
+        held[stock_id] = before + length
+        if before < count <= held[stock_id]:
+            day = int(to_epoch_days([last_as_of])[0])
+            horizon = day if horizon is None else min(horizon, day)
+    return horizon
+
+
+async def archive_series(
+    session: AsyncSession,
+    *,
+    stock_id: int,
+    provider: str,
+    interval: str,
+    before: date,
+) -> int:
+    """
+    Move the series' bars dated before `before` into its year chunks,
+    merging with what is already archived. Returns the bars moved. Does not
+    commit, so the delete and the archive write land together.
+    """
+    cutoff = int(to_epoch_days([before])[0])
+    bars = await load_bar_series(
+        session, stock_id=stock_id, provider=provider, interval=interval, last_day=cutoff - 1, archived=False
+    )
+    if not len(bars):
+        return 0
+
+    years = bars.dates().astype("datetime64[Y]").astype(np.int64) + 1970
+    res = await session.execute(
+        select(StockOHLCVArchive.year, StockOHLCVArchive.dates, StockOHLCVArchive.columns).where(
+            StockOHLCVArchive.stock_id == stock_id,
+            StockOHLCVArchive.provider == provider,
+            StockOHLCVArchive.interval == interval,
+            StockOHLCVArchive.year.in_(np.unique(years).tolist()),
+        )
+    )
+    existing = {year: decode_chunk(d, c) for year, d, c in res.all()}
+
+    now = datetime.now(timezone.utc)
+    chunks = []
+    for year in np.unique(years).tolist():
+        part = bars.take(years == year)
+        if year in existing:
+            part = BarSeries.concat([existing[year], part])  # stored bars win on overlap
+        first, last = to_dates(part.days[[0, -1]])
+        chunks.append(
+            {
+                "stock_id": stock_id,
+                "provider": provider,
+                "interval": interval,
+                "year": year,
+                "length": len(part),
+                "first_as_of": first,
+                "last_as_of": last,
+                "dates": pack_dates(part.days),
+                "columns": encode_columns(part),
+                "archived_at": now,
+            }
+        )
+    await session.execute(upsert_statement(session, StockOHLCVArchive.__table__, update=_ARCHIVE_COLUMNS), chunks)
+    await session.execute(
+        delete(StockOHLCV).where(
+            StockOHLCV.stock_id == stock_id,
+            StockOHLCV.provider == provider,
+            StockOHLCV.interval == interval,
+            StockOHLCV.as_of < before,
+        )
+    )
+    return len(bars)
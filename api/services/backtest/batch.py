@@ -0,0 +1,220 @@
+"""
+Evaluate one StrategyTemplate against many underlyings in a single pass.
+
+Stages:
+- snapshot: one load_panel() for every ticker over the lookback window,
+  widened by the indicators' warm-up so they match a full-history run
+- features: the template's "indicators" block, computed per underlying in
+  worker threads, at most `concurrency` at a time
+- qualification: entry_rules evaluated once over (ticker,) vectors taken on
+  the panel's last date; tickers without a bar on that date are reported
+  as stale instead of evaluated
+- write: one ScanRun row plus one executemany insert of the qualifying
+  TradeCandidate rows
+
+An underlying whose feature stage fails is counted in the run's error_count
+and cannot qualify; the rest of the batch is unaffected.
+"""
+from __future__ import annotations
+import asyncio
+import json
+import math
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Mapping, Sequence
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import CandidateStatus, ScanRun, ScanStatus, StrategyTemplate, TradeCandidate
+from repositories.stocks import _norm_ticker
+from services.backtest.engine import _PERIODS_PER_YEAR
+from services.backtest.panel import Panel, fill_price_gaps, load_panel, with_indicators
+from services.backtest.rules import evaluate_rules, load_config, parse_rules, rule_fields
+from services.metrics import stage
+from services.ta.graph import parse_indicator_requests, warmup_bars
+
+
+@dataclass(slots=True)
+class BatchEvaluation:
+    run_id: int
+    as_of: date | None
+    evaluated: int
+    created: int
+    missing: list[str] = field(default_factory=list)
+    stale: list[str] = field(default_factory=list)
+    errors: int = 0
+
+
+def warmup_days(bars: int, interval: str) -> int:
+    """
+    Calendar days that hold at least `bars` bars of `interval`, with slack
+    for holidays and missing sessions.
+    """
+    if bars <= 0:
+        return 0
+    per_year = _PERIODS_PER_YEAR.get(interval, 252)
+    return math.ceil(bars * 365.25 / per_year * 1.25) + 10
+
+
+def _row(panel: Panel, i: int) -> Panel:
+    return Panel(
+        tickers=panel.tickers[i:i + 1],
+        dates=panel.dates,
+        fields={name: arr[i:i + 1] for name, arr in panel.fields.items()},
+    )
+
+
+async def compute_features(
+    panel: Panel,
+    indicators: Mapping[str, Mapping[str, Any]],
+    *,
+    concurrency: int = 8,
+) -> tuple[Panel, dict[str, str]]:
+    """
+    with_indicators() per underlying in worker threads, at most `concurrency`
+    at once. Returns the widened panel and {ticker: error} for underlyings
+    whose computation failed; their new fields stay NaN.
+    """
+    names = list(parse_indicator_requests(dict(indicators or {})))  # config errors raise here, not per ticker
+    if not names or not panel.tickers:
+        return panel, {}
+
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> Panel:
+        async with sem:
+            return await asyncio.to_thread(with_indicators, _row(panel, i), indicators)
+
+    results = await asyncio.gather(*(one(i) for i in range(len(panel.tickers))), return_exceptions=True)
+    out = {name: np.full(panel.shape, np.nan) for name in names}
+    errors: dict[str, str] = {}
+    for i, res in enumerate(results):
+        if isinstance(res, BaseException):
+            errors[panel.tickers[i]] = f"{type(res).__name__}: {res}"
+            continue
+        for name in names:
+            out[name][i] = res.fields[name][0]
+    return Panel(tickers=panel.tickers, dates=panel.dates, fields={**panel.fields, **out}), errors
+
+
+def qualify(panel: Panel, config: dict) -> tuple[np.ndarray, np.ndarray, dict[str, np.ndarray]]:
+    """
+    Entry rules on the panel's last date, across all tickers at once.
+    Returns (qualified mask, scores, {field: last values}) over panel.tickers;
+    a ticker without a finite score never qualifies.
+    """
+    rules = parse_rules(config.get("entry_rules"), key="entry_rules")
+    score_field = config.get("score_field")
+    last = {name: arr[:, -1] for name, arr in panel.fields.items()}
+    passed = evaluate_rules(rules, last)
+    if score_field is None:
+        scores = np.zeros(len(panel.tickers))
+    elif score_field in last:
+        scores = last[score_field]
+    else:
+        raise ValueError(f"unknown score_field: {score_field!r}. Available: {sorted(last)}")
+    wanted = rule_fields(rules) | ({score_field} if score_field else set())
+    return passed & np.isfinite(scores), scores, {name: last[name] for name in sorted(wanted)}
+
+
+async def evaluate_template_batch(
+    session: AsyncSession,
+    *,
+    template: StrategyTemplate,
+    universe_id: int,
+    tickers: Sequence[str],
+    provider: str,
+    interval: str,
+    end: date | None = None,
+    lookback_days: int = 400,
+    concurrency: int = 8,
+) -> BatchEvaluation:
+    """
+    Run `template` over `tickers` from stored bars and signals and persist the
+    qualifying underlyings as proposed candidates under one ScanRun.
+    Tickers without stored bars in the window are reported in `missing`, and
+    those whose last bar predates the panel's last date in `stale`; neither
+    counts as evaluated. Raises ValueError for a config that cannot be
+    evaluated.
+    """
+    config = load_config(template.config_json)
+    warmup = warmup_bars(parse_indicator_requests(config.get("indicators")).values())
+    wanted = list(dict.fromkeys(_norm_ticker(t) for t in tickers))
+    start = (end or datetime.now(timezone.utc).date()) - timedelta(
+        days=lookback_days + warmup_days(warmup, interval)
+    )
+
+    with stage("batch_snapshot"):
+        panel = await load_panel(
+            session, tickers=wanted, provider=provider, interval=interval, start=start, end=end, fill_prices=False
+        )
+        current = ~np.isnan(panel.fields["close"][:, -1]) if panel.dates.size else np.zeros(0, dtype=bool)
+        stale = [t for t, ok in zip(panel.tickers, current.tolist()) if not ok]
+        panel = Panel(
+            tickers=tuple(t for t, ok in zip(panel.tickers, current.tolist()) if ok),
+            dates=panel.dates,
+            fields={name: arr[current] for name, arr in fill_price_gaps(panel.fields).items()},
+        )
+    with stage("batch_features"):
+        panel, errors = await compute_features(panel, config.get("indicators") or {}, concurrency=concurrency)
+    with stage("batch_qualify"):
+        if panel.tickers:
+            qualified, scores, values = qualify(panel, config)
+        else:
+            qualified, scores, values = np.zeros(0, dtype=bool), np.zeros(0), {}
+        if errors:
+            qualified &= ~np.isin(np.asarray(panel.tickers, dtype=object), list(errors))
+
+    found = {*panel.tickers, *stale}
+    as_of = panel.dates[-1].astype(object) if panel.dates.size else None
+    run = ScanRun(
+        universe_id=universe_id,
+        template_id=template.id,
+        status=ScanStatus.completed,
+        ended_at=datetime.now(timezone.utc),
+        tickers_processed=len(panel.tickers),
+        candidates_created=int(qualified.sum()),
+        error_count=len(errors),
+        error_text="; ".join(f"{t}: {e}" for t, e in errors.items())[:2048] or None,
+    )
+    with stage("batch_write"):
+        session.add(run)
+        await session.flush()
+        index = np.flatnonzero(qualified)
+        if index.size:
+            await session.execute(
+                insert(TradeCandidate.__table__),
+                [
+                    {
+                        "universe_id": universe_id,
+                        "template_id": template.id,
+                        "ticker": panel.tickers[i],
+                        "score": float(scores[i]),
+                        "status": CandidateStatus.proposed,
+                        "reason_code": "entry_rules_passed",
+                        "payload_json": json.dumps(
+                            {
+                                "run_id": run.id,
+                                "as_of": as_of.isoformat(),
+                                "provider": provider,
+                                "interval": interval,
+                                "values": {name: float(arr[i]) for name, arr in values.items()},
+                            }
+                        ),
+                    }
+                    for i in index.tolist()
+                ],
+            )
+        await session.commit()
+
+    return BatchEvaluation(
+        run_id=run.id,
+        as_of=as_of,
+        evaluated=len(panel.tickers),
+        created=int(index.size),
+        missing=[t for t in wanted if t not in found],
+        stale=stale,
+        errors=len(errors),
+    )
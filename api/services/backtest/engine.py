@@ -0,0 +1,201 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+
+from services.backtest.panel import Panel, with_indicators
+from services.backtest.rules import Rule, evaluate_rules, parse_rules
+
+
+# (ticker, entry_date, exit_date, entry_price, exit_price, net_return, is_open)
+TradeRow = tuple[str, date, date, float, float, float, bool]
+
+_PERIODS_PER_YEAR = {"1d": 252, "5d": 52, "1wk": 52, "1mo": 12, "3mo": 4}
+
+
+@dataclass(frozen=True, slots=True)
+class BacktestResult:
+    """
+    Output of one backtest run.
+
+    `positions` and `equity` have the panel's (tickers, dates) shape;
+    `portfolio_equity` is the equal-weight combination across tickers.
+    """
+    tickers: tuple[str, ...]
+    dates: np.ndarray
+    positions: np.ndarray
+    equity: np.ndarray
+    portfolio_equity: np.ndarray
+    trades: list[TradeRow]
+    metrics: dict[str, float]
+    bar_evaluations: int
+
+
+def target_positions(
+    fields: dict[str, np.ndarray],
+    entry_rules: list[Rule],
+    exit_rules: list[Rule],
+) -> np.ndarray:
+    """
+    Desired long/flat state after each bar's close.
+
+    Without exit rules the position simply tracks the entry condition.
+    With exit rules, entries latch until an exit fires; exit wins ties.
+    """
+    entry = evaluate_rules(entry_rules, fields)
+    if not exit_rules:
+        return entry.astype(np.float64)
+
+    exit_ = evaluate_rules(exit_rules, fields)
+    events = np.where(exit_, 0.0, np.where(entry, 1.0, np.nan))
+    n = events.shape[-1]
+    has_event = ~np.isnan(events)
+    idx = np.where(has_event, np.arange(n), -1)
+    np.maximum.accumulate(idx, axis=-1, out=idx)
+    latched = np.take_along_axis(events, np.maximum(idx, 0), axis=-1)
+    return np.where(idx >= 0, latched, 0.0)
+
+
+def simulate(
+    open_: np.ndarray,
+    close: np.ndarray,
+    target: np.ndarray,
+    *,
+    cost_per_side: float = 0.0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorised long/flat simulation.
+
+    A signal computed on bar t is filled at the open of bar t+1. Bar t's
+    growth is split into the overnight gap (earned by the position held into
+    the open) and the open-to-close move (earned by the position after the
+    fill). Costs are charged on every change of position at the fill price.
+
+    Returns (held, growth) where held[t] is the position during bar t and
+    growth[t] is the strategy's gross multiplier for bar t.
+    """
+    held = np.zeros_like(target)
+    held[..., 1:] = target[..., :-1]
+    before_open = np.zeros_like(target)
+    before_open[..., 1:] = held[..., :-1]
+
+    prev_close = np.empty_like(close)
+    prev_close[..., 0] = np.nan
+    prev_close[..., 1:] = close[..., :-1]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        overnight = np.nan_to_num(open_ / prev_close - 1.0)
+        intraday = np.nan_to_num(close / open_ - 1.0)
+
+    turnover = np.abs(held - before_open)
+    growth = (1.0 + before_open * overnight) * (1.0 + held * intraday) * (1.0 - turnover * cost_per_side)
+    return held, growth
+
+
+def _extract_trades(
+    tickers: tuple[str, ...],
+    dates: np.ndarray,
+    open_: np.ndarray,
+    close: np.ndarray,
+    held: np.ndarray,
+    cost_per_side: float,
+) -> list[TradeRow]:
+    n = held.shape[1]
+    padded = np.zeros((held.shape[0], n + 2))
+    padded[:, 1:-1] = held
+    change = np.diff(padded, axis=1)
+    entries = np.argwhere(change[:, :-1] > 0)
+    exits = np.argwhere(change[:, 1:] < 0)
+    # change[:, 1:][r, c] < 0 means held[r, c] == 1 and held[r, c + 1] == 0
+
+    rows, start = entries[:, 0], entries[:, 1]
+    last = exits[:, 1]
+    is_open = last == n - 1
+    exit_at = np.where(is_open, last, last + 1)
+    entry_px = open_[rows, start]
+    exit_px = np.where(is_open, close[rows, last], open_[rows, np.minimum(last + 1, n - 1)])
+    sides = np.where(is_open, 1, 2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        net = exit_px / entry_px * (1.0 - cost_per_side) ** sides - 1.0
+
+    day_list = dates.astype(object)
+    names = np.asarray(tickers, dtype=object)[rows]
+    trades: list[TradeRow] = list(
+        zip(
+            names.tolist(),
+            day_list[start].tolist(),
+            day_list[exit_at].tolist(),
+            entry_px.tolist(),
+            exit_px.tolist(),
+            net.tolist(),
+            is_open.tolist(),
+        )
+    )
+    return trades
+
+
+def _max_drawdown(equity: np.ndarray) -> float:
+    if equity.size == 0:
+        return 0.0
+    peak = np.maximum.accumulate(equity)
+    return float(np.max(1.0 - equity / peak))
+
+
+def run_backtest(
+    panel: Panel,
+    config: dict,
+    *,
+    interval: str = "1d",
+    commission_bps: float = 0.0,
+    slippage_bps: float = 0.0,
+) -> BacktestResult:
+    """
+    Apply a template config's entry_rules (and optional exit_rules) to a panel.
+    Fields named in the config's "indicators" block are computed first.
+
+    Costs are expressed in basis points per side and applied at each fill.
+    Runs entirely on in-memory arrays; no provider or session is touched.
+    """
+    entry_rules = parse_rules(config.get("entry_rules"), key="entry_rules")
+    exit_rules = parse_rules(config.get("exit_rules"), key="exit_rules")
+    cost = (commission_bps + slippage_bps) / 10_000.0
+    if config.get("indicators"):
+        panel = with_indicators(panel, config["indicators"])
+
+    open_ = np.asarray(panel.fields["open"], dtype=np.float64)
+    close = np.asarray(panel.fields["close"], dtype=np.float64)
+
+    target = target_positions(panel.fields, entry_rules, exit_rules)
+    held, growth = simulate(open_, close, target, cost_per_side=cost)
+    equity = np.cumprod(growth, axis=-1)
+
+    active = ~np.isnan(close)
+    counts = np.maximum(active.sum(axis=0), 1)
+    port_ret = np.where(active, growth - 1.0, 0.0).sum(axis=0) / counts
+    portfolio_equity = np.cumprod(1.0 + port_ret)
+
+    trades = _extract_trades(panel.tickers, panel.dates, open_, close, held, cost)
+    closed = [t for t in trades if not t[6]]
+    periods = _PERIODS_PER_YEAR.get(interval, 252)
+    std = float(np.std(port_ret)) if port_ret.size else 0.0
+
+    metrics = {
+        "total_return": float(portfolio_equity[-1] - 1.0) if portfolio_equity.size else 0.0,
+        "max_drawdown": _max_drawdown(portfolio_equity),
+        "sharpe": float(np.mean(port_ret) / std * np.sqrt(periods)) if std > 0 else 0.0,
+        "trades": float(len(trades)),
+        "win_rate": float(np.mean([t[5] > 0 for t in closed])) if closed else 0.0,
+        "exposure": float(held.mean()) if held.size else 0.0,
+    }
+
+    return BacktestResult(
+        tickers=panel.tickers,
+        dates=panel.dates,
+        positions=held,
+        equity=equity,
+        portfolio_equity=portfolio_equity,
+        trades=trades,
+        metrics=metrics,
+        bar_evaluations=int(close.size * max(len(entry_rules) + len(exit_rules), 1)),
+    )
@@ -0,0 +1,262 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Mapping, Sequence
+
+import numpy as np
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import StockOHLCV, StockSignal
+from repositories.stocks import chunked, get_stock_ids
+from series import BarSeries, to_dates, to_epoch_days
+from services.ta.graph import compute_indicators, parse_indicator_requests
+
+
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+SIGNAL_FIELDS = ("rsi", "macd", "macd_signal", "ema_20", "ema_50", "bb_upper", "bb_lower")
+
+_KEY_STRIDE = 1 << 32  # (row, epoch day) -> one int64 key
+
+
+@dataclass(frozen=True, slots=True)
+class Panel:
+    """
+    Aligned columnar history for one or many tickers.
+
+    Every array in `fields` has shape (len(tickers), len(dates)); missing
+    observations are NaN. `dates` is a sorted datetime64[D] array.
+    """
+    tickers: tuple[str, ...]
+    dates: np.ndarray
+    fields: dict[str, np.ndarray]
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return (len(self.tickers), len(self.dates))
+
+
+def fill_price_gaps(fields: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """
+    Fill price gaps after each ticker's first bar with flat bars at the
+    previous close (zero volume) so returns stay defined; other fields are
+    left alone.
+    """
+    if "close" not in fields:
+        return fields
+    close = fields["close"]
+    missing = np.isnan(close)
+    if not missing.any():
+        return fields
+    out = dict(fields)
+    idx = np.where(missing, 0, np.arange(close.shape[1]))
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    filled = np.take_along_axis(close, idx, axis=1)
+    out["close"] = filled
+    for name in ("open", "high", "low"):
+        if name in out:
+            out[name] = np.where(missing, filled, out[name])
+    if "volume" in out:
+        out["volume"] = np.where(missing & ~np.isnan(filled), 0.0, out["volume"])
+    return out
+
+
+def build_panel(
+    tickers: Sequence[str],
+    ticker_idx: np.ndarray,
+    ordinals: np.ndarray,
+    columns: dict[str, np.ndarray],
+    *,
+    fill_prices: bool = True,
+) -> Panel:
+    """
+    Scatter long-format (ticker_idx, date ordinal, value...) columns into a panel.
+
+    With fill_prices, price gaps are filled by fill_price_gaps(); signals are
+    never filled.
+    """
+    uniq = np.unique(ordinals)
+    col = np.searchsorted(uniq, ordinals)
+    shape = (len(tickers), len(uniq))
+
+    fields: dict[str, np.ndarray] = {}
+    for name, values in columns.items():
+        out = np.full(shape, np.nan)
+        out[ticker_idx, col] = values
+        fields[name] = out
+
+    if fill_prices:
+        fields = fill_price_gaps(fields)
+
+    epoch = date(1970, 1, 1).toordinal()
+    dates = (uniq - epoch).astype("datetime64[D]")
+    return Panel(tickers=tuple(tickers), dates=dates, fields=fields)
+
+
+async def load_panel(
+    session: AsyncSession,
+    *,
+    tickers: Sequence[str],
+    provider: str,
+    interval: str,
+    start: date | None = None,
+    end: date | None = None,
+    fill_prices: bool = True,
+) -> Panel:
+    """
+    Load stored OHLCV joined with stored signals for many tickers: one ticker
+    lookup, one joined bar query and, when anything is archived, one archive
+    read plus one signal query for the archived dates (each split every 900
+    tickers). Bars moved to the archive by services.retention are merged in
+    (stored bars win on overlap) and joined to their signals, which are
+    never archived. Tickers with no bars are dropped from the panel.
+    """
+    from services.archive import load_archived_many
+
+    ids = await get_stock_ids(session, tickers)
+    wanted = list(ids)
+    row_of = {stock_id: i for i, stock_id in enumerate(ids.values())}
+    names = PRICE_FIELDS + SIGNAL_FIELDS
+
+    rows: list = []
+    archived: dict = {}
+    if ids:
+        base = (
+            select(
+                StockOHLCV.stock_id,
+                StockOHLCV.as_of,
+                *(getattr(StockOHLCV, f) for f in PRICE_FIELDS),
+                *(getattr(StockSignal, f) for f in SIGNAL_FIELDS),
+            )
+            .outerjoin(
+                StockSignal,
+                and_(
+                    StockSignal.stock_id == StockOHLCV.stock_id,
+                    StockSignal.as_of == StockOHLCV.as_of,
+                    StockSignal.provider == StockOHLCV.provider,
+                    StockSignal.interval == StockOHLCV.interval,
+                ),
+            )
+            .where(StockOHLCV.provider == provider, StockOHLCV.interval == interval)
+        )
+        if start is not None:
+            base = base.where(StockOHLCV.as_of >= start)
+        if end is not None:
+            base = base.where(StockOHLCV.as_of <= end)
+        for part in chunked(list(ids.values())):
+            rows.extend((await session.execute(base.where(StockOHLCV.stock_id.in_(part)))).all())
+        archived = await load_archived_many(
+            session,
+            stock_ids=list(ids.values()),
+            provider=provider,
+            interval=interval,
+            first_day=int(to_epoch_days([start])[0]) if start is not None else None,
+            last_day=int(to_epoch_days([end])[0]) if end is not None else None,
+        )
+
+    epoch = date(1970, 1, 1).toordinal()
+    if rows:
+        cols = list(zip(*rows))
+        ticker_idx = np.fromiter((row_of[i] for i in cols[0]), dtype=np.intp, count=len(rows))
+        ordinals = np.fromiter((d.toordinal() for d in cols[1]), dtype=np.int64, count=len(rows))
+        columns = {name: np.array(values, dtype=np.float64) for name, values in zip(names, cols[2:])}
+    else:
+        ticker_idx = np.empty(0, dtype=np.intp)
+        ordinals = np.empty(0, dtype=np.int64)
+        columns = {name: np.empty(0) for name in names}
+
+    if archived:
+        old = await _archived_rows(session, archived, row_of, provider=provider, interval=interval)
+        # Stored bars win where a date is both stored and archived.
+        hot = ticker_idx.astype(np.int64) * _KEY_STRIDE + ordinals
+        keep = ~np.isin(old[0].astype(np.int64) * _KEY_STRIDE + old[1] + epoch, hot)
+        ticker_idx = np.concatenate([ticker_idx, old[0][keep]])
+        ordinals = np.concatenate([ordinals, old[1][keep] + epoch])
+        columns = {name: np.concatenate([columns[name], old[2][name][keep]]) for name in names}
+
+    if ticker_idx.size == 0:
+        return Panel(
+            tickers=(),
+            dates=np.empty(0, dtype="datetime64[D]"),
+            fields={n: np.empty((0, 0)) for n in names},
+        )
+
+    seen = np.zeros(len(wanted), dtype=bool)
+    seen[ticker_idx] = True
+    present = [t for t, ok in zip(wanted, seen) if ok]
+    remap = np.cumsum(seen) - 1
+    return build_panel(present, remap[ticker_idx], ordinals, columns, fill_prices=fill_prices)
+
+
+async def _archived_rows(
+    session: AsyncSession,
+    archived: Mapping[int, BarSeries],
+    row_of: Mapping[int, int],
+    *,
+    provider: str,
+    interval: str,
+) -> tuple[np.ndarray, np.ndarray, dict[str, np.ndarray]]:
+    """
+    Archived bars as long-format (row, epoch day, columns) with the stored
+    signals for those dates filled in.
+    """
+    parts = list(archived.items())
+    row = np.concatenate([np.full(len(bars), row_of[stock_id], dtype=np.intp) for stock_id, bars in parts])
+    days = np.concatenate([bars.days for _, bars in parts]).astype(np.int64)
+    columns = {
+        "open": np.concatenate([bars.open for _, bars in parts]),
+        "high": np.concatenate([bars.high for _, bars in parts]),
+        "low": np.concatenate([bars.low for _, bars in parts]),
+        "close": np.concatenate([bars.close for _, bars in parts]),
+        "volume": np.concatenate([bars.volume_or_nan() for _, bars in parts]),
+    }
+    for name in SIGNAL_FIELDS:
+        columns[name] = np.full(days.size, np.nan)
+
+    first, last = to_dates(np.array([days.min(), days.max()]))
+    signals: list = []
+    for part in chunked(list(archived)):
+        res = await session.execute(
+            select(StockSignal.stock_id, StockSignal.as_of, *(getattr(StockSignal, f) for f in SIGNAL_FIELDS)).where(
+                StockSignal.stock_id.in_(part),
+                StockSignal.provider == provider,
+                StockSignal.interval == interval,
+                StockSignal.as_of >= first,
+                StockSignal.as_of <= last,
+            )
+        )
+        signals.extend(res.all())
+    if signals:
+        cols = list(zip(*signals))
+        key = row.astype(np.int64) * _KEY_STRIDE + days
+        sig_key = np.fromiter((row_of[i] for i in cols[0]), dtype=np.int64) * _KEY_STRIDE + to_epoch_days(cols[1])
+        order = np.argsort(key)
+        pos = np.searchsorted(key, sig_key, sorter=order)
+        pos = np.minimum(pos, key.size - 1)
+        hit = key[order[pos]] == sig_key
+        target = order[pos[hit]]
+        for name, values in zip(SIGNAL_FIELDS, cols[2:]):
+            columns[name][target] = np.array(values, dtype=np.float64)[hit]
+    return row, days, columns
+
+
+def with_indicators(panel: Panel, indicators: Mapping[str, Mapping[str, Any]]) -> Panel:
+    """
+    Return a panel with template-requested indicator fields added or replaced.
+
+    `indicators` is a template's {field: {"name": <indicator>, **params}}
+    block; the name defaults to the field name, so {"rsi": {"length": 10}}
+    swaps the stored RSI-14 for an RSI-10. Rows go through the indicator
+    graph cache, so repeated requests for the same series are not recomputed.
+    """
+    requests = parse_indicator_requests(dict(indicators))
+    specs = list(dict.fromkeys(requests.values()))
+    out = {name: np.full(panel.shape, np.nan) for name in requests}
+
+    base = [name for name in PRICE_FIELDS if name in panel.fields]
+    for i in range(len(panel.tickers)):
+        values = compute_indicators({name: panel.fields[name][i] for name in base}, specs)
+        for name, spec in requests.items():
+            out[name][i] = values[spec]
+
+    return Panel(tickers=panel.tickers, dates=panel.dates, fields={**panel.fields, **out})
@@ -0,0 +1,47 @@
+from __future__ import annotations
+from datetime import date
+from typing import Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from repositories.templates import get_template_by_id
+from services.backtest.engine import BacktestResult, run_backtest
+from services.backtest.panel import load_panel
+from services.backtest.rules import load_config
+
+
+async def backtest_template(
+    session: AsyncSession,
+    *,
+    template_id: int,
+    tickers: Sequence[str],
+    provider: str = "yahooquery",
+    interval: str = "1d",
+    start: date | None = None,
+    end: date | None = None,
+    commission_bps: float = 0.0,
+    slippage_bps: float = 0.0,
+) -> BacktestResult:
+    """
+    Replay a stored StrategyTemplate over stored bars and signals.
+    Reads only from the database; no price provider is called.
+    """
+    template = await get_template_by_id(session, template_id)
+    if template is None:
+        raise ValueError(f"template not found: {template_id}")
+
+    panel = await load_panel(
+        session,
+        tickers=tickers,
+        provider=provider,
+        interval=interval,
+        start=start,
+        end=end,
+    )
+    return run_backtest(
+        panel,
+        load_config(template.config_json),
+        interval=interval,
+        commission_bps=commission_bps,
+        slippage_bps=slippage_bps,
+    )
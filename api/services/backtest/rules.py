@@ -0,0 +1,84 @@
+from __future__ import annotations
+import json
+from typing import Callable, Mapping
+
+import numpy as np
+
+
+Rule = tuple[str, str, float]
+
+_OPS: dict[str, Callable[[np.ndarray, float], np.ndarray]] = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+
+def parse_rules(raw: object, *, key: str = "entry_rules") -> list[Rule]:
+    """
+    Turn a template rule list into (field, op, value) tuples.
+    Mirrors the validation in TemplateCreate so stored configs stay loadable.
+    """
+    if raw is None:
+        return []
+    if not isinstance(raw, list):
+        raise ValueError(f"{key} must be a list")
+
+    rules: list[Rule] = []
+    for i, rule in enumerate(raw):
+        if not isinstance(rule, dict):
+            raise ValueError(f"{key}[{i}] must be an object")
+        field = rule.get("field")
+        op = rule.get("op")
+        value = rule.get("value")
+        if not isinstance(field, str) or not field:
+            raise ValueError(f"{key}[{i}].field must be a non-empty string")
+        if op not in _OPS:
+            raise ValueError(f"{key}[{i}].op must be one of {sorted(_OPS)}")
+        if not isinstance(value, (int, float)):
+            raise ValueError(f"{key}[{i}].value must be numeric")
+        rules.append((field, op, float(value)))
+    return rules
+
+
+def load_config(config_json: str) -> dict:
+    """
+    Decode a StrategyTemplate.config_json payload into a dict.
+    """
+    parsed = json.loads(config_json)
+    if not isinstance(parsed, dict):
+        raise ValueError("config_json must decode to a JSON object")
+    return parsed
+
+
+def rule_fields(rules: list[Rule]) -> set[str]:
+    return {field for field, _, _ in rules}
+
+
+def evaluate_rules(
+    rules: list[Rule],
+    fields: Mapping[str, np.ndarray],
+) -> np.ndarray:
+    """
+    AND together every rule over aligned field arrays.
+
+    NaN inputs never satisfy a rule (including "!="), so warm-up bars and
+    missing signals cannot trigger an entry. An empty rule list matches nothing.
+    """
+    if not rules:
+        shape = next(iter(fields.values())).shape if fields else (0,)
+        return np.zeros(shape, dtype=bool)
+
+    mask: np.ndarray | None = None
+    for field, op, value in rules:
+        try:
+            arr = fields[field]
+        except KeyError:
+            raise ValueError(f"unknown rule field: {field!r}. Available: {sorted(fields)}")
+        hit = _OPS[op](arr, value) & ~np.isnan(arr)
+        mask = hit if mask is None else (mask & hit)
+    assert mask is not None
+    return mask
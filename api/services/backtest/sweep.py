@@ -0,0 +1,247 @@
+from __future__ import annotations
+import copy
+import itertools
+import json
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Any, Callable, Iterator, Mapping, Sequence
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import StrategyTemplate, TemplateCreate
+from repositories.templates import create_template, get_latest_template_by_name
+from services.backtest.engine import run_backtest
+from services.backtest.panel import Panel
+
+
+Params = dict[str, Any]
+
+# field arrays shared with workers: name -> (shm name, shape, dtype str)
+_SharedSpec = tuple[tuple[str, ...], np.ndarray, dict[str, tuple[str, tuple[int, ...], str]]]
+
+_WORKER_PANEL: Panel | None = None
+_WORKER_SHM: list[shared_memory.SharedMemory] = []
+
+
+@dataclass(frozen=True, slots=True)
+class SweepResult:
+    index: int
+    params: Params
+    metrics: dict[str, float]
+
+
+@dataclass(slots=True)
+class SweepReport:
+    metric: str
+    results: list[SweepResult] = field(default_factory=list)
+    total: int = 0
+    stopped_early: bool = False
+
+    @property
+    def best(self) -> SweepResult | None:
+        return self.results[0] if self.results else None
+
+
+def expand_grid(grid: Mapping[str, Sequence[Any]]) -> list[Params]:
+    """
+    Cartesian product of a {path: [values]} grid, in deterministic order.
+    """
+    keys = list(grid)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))]
+
+
+def apply_params(config: dict, params: Mapping[str, Any]) -> dict:
+    """
+    Return a copy of a template config with dotted-path overrides applied,
+    e.g. {"entry_rules.0.value": 25, "indicators.rsi.length": 10}.
+    """
+    out = copy.deepcopy(config)
+    for path, value in params.items():
+        parts = path.split(".")
+        node: Any = out
+        for part in parts[:-1]:
+            node = node[int(part)] if isinstance(node, list) else node.setdefault(part, {})
+        last = parts[-1]
+        if isinstance(node, list):
+            node[int(last)] = value
+        else:
+            node[last] = value
+    return out
+
+
+def _evaluate(panel: Panel, config: dict, params: Params, run_kwargs: dict) -> dict[str, float]:
+    return run_backtest(panel, apply_params(config, params), **run_kwargs).metrics
+
+
+def _init_worker(spec: _SharedSpec) -> None:
+    global _WORKER_PANEL
+    tickers, dates, arrays = spec
+    fields: dict[str, np.ndarray] = {}
+    for name, (shm_name, shape, dtype) in arrays.items():
+        # track=False: the parent owns and unlinks the block; a worker's
+        # resource tracker would otherwise unlink it when the worker exits.
+        shm = shared_memory.SharedMemory(name=shm_name, track=False)
+        _WORKER_SHM.append(shm)
+        arr = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        arr.flags.writeable = False
+        fields[name] = arr
+    _WORKER_PANEL = Panel(tickers=tickers, dates=dates, fields=fields)
+
+
+def _run_one(index: int, config: dict, params: Params, run_kwargs: dict) -> tuple[int, dict[str, float]]:
+    assert _WORKER_PANEL is not None, "worker not initialised"
+    return index, _evaluate(_WORKER_PANEL, config, params, run_kwargs)
+
+
+class _SharedPanel:
+    """
+    Copies panel field arrays into shared memory once so every worker maps
+    the same read-only pages instead of receiving a pickled copy per task.
+    """
+
+    def __init__(self, panel: Panel) -> None:
+        self._blocks: list[shared_memory.SharedMemory] = []
+        arrays: dict[str, tuple[str, tuple[int, ...], str]] = {}
+        for name, arr in panel.fields.items():
+            arr = np.ascontiguousarray(arr, dtype=np.float64)
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            self._blocks.append(shm)
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+            arrays[name] = (shm.name, arr.shape, arr.dtype.str)
+        self.spec: _SharedSpec = (panel.tickers, panel.dates, arrays)
+
+    def close(self) -> None:
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks.clear()
+
+
+def run_sweep(
+    panel: Panel,
+    base_config: dict,
+    grid: Mapping[str, Sequence[Any]],
+    *,
+    interval: str = "1d",
+    commission_bps: float = 0.0,
+    slippage_bps: float = 0.0,
+    metric: str = "sharpe",
+    max_workers: int | None = None,
+    patience: int | None = None,
+    target: float | None = None,
+) -> SweepReport:
+    """
+    Backtest every combination of `grid` applied to `base_config`.
+
+    Work is fanned out over a process pool that shares the panel through
+    shared memory. Early stopping: once `patience` consecutive results fail
+    to beat the best `metric`, or any result reaches `target`, no further
+    combinations are submitted and queued ones are cancelled.
+    max_workers=0 runs everything in-process.
+
+    Nothing is persisted; see promote_sweep_result().
+    """
+    combos = expand_grid(grid)
+    run_kwargs = {"interval": interval, "commission_bps": commission_bps, "slippage_bps": slippage_bps}
+    report = SweepReport(metric=metric, total=len(combos))
+
+    best = -np.inf
+    since_best = 0
+
+    def record(index: int, metrics: dict[str, float]) -> bool:
+        nonlocal best, since_best
+        report.results.append(SweepResult(index=index, params=combos[index], metrics=metrics))
+        score = metrics.get(metric, -np.inf)
+        if score > best:
+            best, since_best = score, 0
+        else:
+            since_best += 1
+        if target is not None and score >= target:
+            return True
+        return patience is not None and since_best >= patience
+
+    if max_workers == 0:
+        for i, params in enumerate(combos):
+            if record(i, _evaluate(panel, base_config, params, run_kwargs)):
+                report.stopped_early = True
+                break
+    else:
+        _run_pool(panel, base_config, combos, run_kwargs, max_workers, record, report)
+
+    report.results.sort(key=lambda r: (-r.metrics.get(metric, -np.inf), r.index))
+    return report
+
+
+def _run_pool(
+    panel: Panel,
+    config: dict,
+    combos: list[Params],
+    run_kwargs: dict,
+    max_workers: int | None,
+    record: Callable[[int, dict[str, float]], bool],
+    report: SweepReport,
+) -> None:
+    workers = max_workers or os.cpu_count() or 1
+    window = 2 * workers
+    shared = _SharedPanel(panel)
+    pending: dict[Future, int] = {}
+    todo: Iterator[tuple[int, Params]] = iter(enumerate(combos))
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(shared.spec,),
+        ) as pool:
+            def fill() -> None:
+                while len(pending) < window:
+                    nxt = next(todo, None)
+                    if nxt is None:
+                        return
+                    i, params = nxt
+                    pending[pool.submit(_run_one, i, config, params, run_kwargs)] = i
+
+            fill()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                stop = False
+                for fut in done:
+                    pending.pop(fut)
+                    i, metrics = fut.result()
+                    stop = record(i, metrics) or stop
+                if stop:
+                    report.stopped_early = True
+                    for fut in pending:
+                        fut.cancel()
+                    break
+                fill()
+    finally:
+        shared.close()
+
+
+async def promote_sweep_result(
+    session: AsyncSession,
+    *,
+    template: StrategyTemplate,
+    result: SweepResult,
+) -> StrategyTemplate:
+    """
+    Persist a sweep winner as the next version of the template's name.
+    This is the only path by which sweep output is written anywhere.
+    """
+    config = apply_params(json.loads(template.config_json), result.params)
+    latest = await get_latest_template_by_name(session, name=template.name)
+    version = (latest.version if latest else template.version) + 1
+    return await create_template(
+        session,
+        TemplateCreate(
+            name=template.name,
+            version=version,
+            description=f"promoted from sweep of v{template.version}: {json.dumps(result.params, sort_keys=True)}"[:1024],
+            config_json=json.dumps(config),
+        ),
+    )
@@ -0,0 +1,171 @@
+"""
+In-process fan-out of series updates to server-sent-event subscribers.
+
+Topics are (stock_id, provider, interval). publish() encodes the event
+once into an SSE frame and hands the same bytes to every subscriber's
+queue, so a refresh costs one JSON encode no matter how many clients are
+listening, and subscribers never touch the database after connecting.
+
+A subscriber that falls `max_pending` frames behind is cut off with a
+`resync` event instead of buffering without bound; the client reloads the
+series over plain GETs and reconnects.
+"""
+from __future__ import annotations
+import asyncio
+import itertools
+import json
+from typing import AsyncIterator, Dict, Optional
+
+from services.metrics import Counter, Gauge
+
+
+SSE_SUBSCRIBERS = Gauge("chronos_sse_subscribers", "Open server-sent-event streams.")
+SSE_EVENTS = Counter("chronos_sse_events_total", "Events published to SSE topics.", ("event",))
+SSE_DROPPED = Counter("chronos_sse_lagged_total", "Subscribers cut off for falling behind.")
+
+Topic = tuple[int, str, str]
+
+KEEPALIVE_SECONDS = 15.0
+_KEEPALIVE = b": keepalive\n\n"
+_RESYNC = b"event: resync\ndata: {}\n\n"
+_CLOSED = b""
+
+
+def encode_event(event: str, data: object, event_id: Optional[int] = None) -> bytes:
+    head = f"event: {event}\n" + (f"id: {event_id}\n" if event_id is not None else "")
+    return (head + "data: " + json.dumps(data, separators=(",", ":")) + "\n\n").encode()
+
+
+class Subscription:
+    __slots__ = ("topic", "queue")
+
+    def __init__(self, topic: Topic, max_pending: int) -> None:
+        self.topic = topic
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(max_pending)
+
+    def offer(self, frame: bytes) -> bool:
+        """
+        Queue a frame; False (after queueing a resync) if the subscriber lagged.
+        """
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_RESYNC)
+            return False
+
+
+class Broadcaster:
+    def __init__(self, *, max_pending: int = 256) -> None:
+        self.max_pending = max_pending
+        self._topics: Dict[Topic, set[Subscription]] = {}
+        self._ids = itertools.count(1)
+
+    def subscribe(self, topic: Topic) -> Subscription:
+        sub = Subscription(topic, self.max_pending)
+        self._topics.setdefault(topic, set()).add(sub)
+        SSE_SUBSCRIBERS.inc()
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._topics.get(sub.topic)
+        if subs is None or sub not in subs:
+            return
+        subs.discard(sub)
+        if not subs:
+            del self._topics[sub.topic]
+        SSE_SUBSCRIBERS.dec()
+
+    def subscribers(self, topic: Topic) -> int:
+        return len(self._topics.get(topic, ()))
+
+    def publish(self, topic: Topic, event: str, data: object) -> int:
+        """
+        Send one event to every subscriber of `topic`; returns how many got it.
+        Encodes nothing when nobody is listening.
+        """
+        subs = self._topics.get(topic)
+        if not subs:
+            return 0
+        SSE_EVENTS.inc(event=event)
+        frame = encode_event(event, data, next(self._ids))
+        delivered = 0
+        for sub in list(subs):
+            if sub.offer(frame):
+                delivered += 1
+            else:
+                SSE_DROPPED.inc()
+                self.unsubscribe(sub)
+        return delivered
+
+    async def stream(self, sub: Subscription, first: Optional[bytes] = None) -> AsyncIterator[bytes]:
+        """
+        SSE body for one subscriber: `first`, then published frames, with
+        keep-alive comments while idle. Unsubscribes when the client goes away.
+        """
+        try:
+            if first is not None:
+                yield first
+            while True:
+                try:
+                    frame = await asyncio.wait_for(sub.queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield _KEEPALIVE
+                    continue
+                if frame is _CLOSED:
+                    return
+                yield frame
+                if frame is _RESYNC:
+                    return
+        finally:
+            self.unsubscribe(sub)
+
+    def close(self) -> None:
+        """
+        End every open stream (app shutdown).
+        """
+        for subs in list(self._topics.values()):
+            for sub in list(subs):
+                while not sub.queue.empty():
+                    sub.queue.get_nowait()
+                sub.queue.put_nowait(_CLOSED)
+
+
+BROADCASTER = Broadcaster()
+
+
+def bar_payload(rows) -> list[dict]:
+    return [
+        {"date": as_of.isoformat(), "open": open_, "high": high, "low": low, "close": close, "volume": volume}
+        for as_of, open_, high, low, close, volume in rows
+    ]
+
+
+def signal_payload(rows) -> list[dict]:
+    return [
+        {
+            "date": as_of.isoformat(),
+            "rsi": rsi,
+            "macd": macd,
+            "macd_signal": macd_signal,
+            "ema_20": ema_20,
+            "ema_50": ema_50,
+            "bb_upper": bb_upper,
+            "bb_lower": bb_lower,
+        }
+        for as_of, rsi, macd, macd_signal, ema_20, ema_50, bb_upper, bb_lower in rows
+    ]
+
+
+def publish_status(topic: Topic, status: str, detail: Optional[str] = None, last_fetched_at=None) -> int:
+    return BROADCASTER.publish(
+        topic,
+        "status",
+        {
+            "status": status,
+            "detail": detail,
+            "last_fetched_at": last_fetched_at.isoformat() if last_fetched_at else None,
+        },
+    )
@@ -0,0 +1,100 @@
+"""
+NYSE trading calendar from the exchange's published rules: regular
+sessions 09:30-16:00 America/New_York, full-day holidays and 13:00 early
+closes. One-off closures (national days of mourning, weather) are not
+modelled; a refresh on such a day just finds nothing new.
+"""
+from __future__ import annotations
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+
+NY = ZoneInfo("America/New_York")
+OPEN = time(9, 30)
+CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    # Anonymous Gregorian computus.
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month = (h + l - 7 * m + 90) // 25
+    return date(year, month, (h + l - 7 * m + 33 * month + 19) % 32)
+
+
+def _observed(d: date) -> date:
+    if d.weekday() == 5:
+        return d - timedelta(days=1)
+    if d.weekday() == 6:
+        return d + timedelta(days=1)
+    return d
+
+
+@lru_cache(maxsize=32)
+def holidays(year: int) -> frozenset[date]:
+    days = {
+        _nth_weekday(year, 1, 0, 3),  # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),  # Washington's Birthday
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _last_weekday(year, 5, 0),  # Memorial Day
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),  # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        _observed(date(year, 12, 25)),
+    }
+    # A Saturday New Year's Day is not observed on the Friday before.
+    if date(year, 1, 1).weekday() != 5:
+        days.add(_observed(date(year, 1, 1)))
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))  # Juneteenth
+    return frozenset(days)
+
+
+@lru_cache(maxsize=32)
+def early_closes(year: int) -> frozenset[date]:
+    days = {_nth_weekday(year, 11, 3, 4) + timedelta(days=1)}  # day after Thanksgiving
+    july3, dec24 = date(year, 7, 3), date(year, 12, 24)
+    if july3.weekday() < 4:  # Independence Day falls Tuesday-Friday
+        days.add(july3)
+    if dec24.weekday() < 5:
+        days.add(dec24)
+    return frozenset(d for d in days if d.weekday() < 5 and d not in holidays(year))
+
+
+def is_trading_day(d: date) -> bool:
+    return d.weekday() < 5 and d not in holidays(d.year)
+
+
+def session_bounds(d: date) -> Optional[tuple[datetime, datetime]]:
+    """
+    (open, close) as aware New York datetimes, or None if the market is shut.
+    """
+    if not is_trading_day(d):
+        return None
+    close = EARLY_CLOSE if d in early_closes(d.year) else CLOSE
+    return datetime.combine(d, OPEN, NY), datetime.combine(d, close, NY)
+
+
+def previous_trading_day(d: date) -> date:
+    d -= timedelta(days=1)
+    while not is_trading_day(d):
+        d -= timedelta(days=1)
+    return d
@@ -0,0 +1,198 @@
+"""
+Cross-sectional reads: stored bars and signals for many tickers as one
+date x ticker matrix per field.
+
+A page is the first `limit` bar dates after the `after` cursor (keyset on
+as_of). The page's dates come from one DISTINCT query over stock_ohlcv plus
+the archived chunks that can reach into the page; its prices and signals
+are then read with one IN query each. IN lists are split every 900
+tickers, so the number of statements grows with the number of 900-ticker
+chunks, not with the number of tickers or archived years.
+"""
+from __future__ import annotations
+import io
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import StockOHLCV, StockSignal
+from repositories.stocks import chunked
+from series import EPOCH, to_dates, to_epoch_days
+from services.archive import load_archived_many
+from services.backtest.panel import PRICE_FIELDS, SIGNAL_FIELDS, Panel
+
+
+MATRIX_FIELDS = PRICE_FIELDS + SIGNAL_FIELDS
+
+
+@dataclass(frozen=True, slots=True)
+class MatrixPage:
+    panel: Panel  # fields shaped (tickers, dates), NaN where nothing is stored
+    next_after: Optional[date]  # cursor for the next page; None on the last one
+
+
+def _scatter(out: np.ndarray, rows: np.ndarray, days: np.ndarray, axis: np.ndarray, values: np.ndarray) -> None:
+    col = np.searchsorted(axis, days)
+    ok = col < axis.size
+    ok[ok] = axis[col[ok]] == days[ok]
+    out[rows[ok], col[ok]] = values[ok]
+
+
+async def load_matrix(
+    session: AsyncSession,
+    *,
+    stock_ids: Mapping[str, int],
+    fields: Sequence[str],
+    provider: str,
+    interval: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    after: Optional[date] = None,
+    limit: int = 500,
+) -> MatrixPage:
+    """
+    One page of the matrix for the resolved `stock_ids` (ticker -> id, in
+    output order). Tickers without data in the page get all-NaN rows.
+    """
+    unknown = [f for f in fields if f not in MATRIX_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown fields {unknown}; expected some of {list(MATRIX_FIELDS)}")
+    tickers = tuple(stock_ids)
+    ids = list(stock_ids.values())
+    row_of = {stock_id: i for i, stock_id in enumerate(ids)}
+
+    first = after + timedelta(days=1) if after is not None else None
+    if start is not None and (first is None or start > first):
+        first = start
+
+    def empty() -> MatrixPage:
+        axis = np.empty(0, dtype="datetime64[D]")
+        return MatrixPage(Panel(tickers, axis, {f: np.empty((len(tickers), 0)) for f in fields}), None)
+
+    if not ids or (first is not None and end is not None and first > end):
+        return empty()
+
+    def in_range(model, part: Sequence[int], upper: Optional[date]):
+        conds = [model.stock_id.in_(part), model.provider == provider, model.interval == interval]
+        if first is not None:
+            conds.append(model.as_of >= first)
+        if upper is not None:
+            conds.append(model.as_of <= upper)
+        return conds
+
+    stored: list[date] = []
+    for part in chunked(ids):
+        res = await session.execute(
+            select(StockOHLCV.as_of)
+            .where(*in_range(StockOHLCV, part, end))
+            .distinct()
+            .order_by(StockOHLCV.as_of)
+            .limit(limit + 1)
+        )
+        stored.extend(res.scalars().all())
+    axis = np.unique(to_epoch_days(stored))[: limit + 1]
+
+    # Archived dates past the (limit + 1)th stored one cannot make the page,
+    # and load_archived_many stops at the chunks holding limit + 1 dates.
+    first_day = int(to_epoch_days([first])[0]) if first is not None else None
+    last_day = int(to_epoch_days([end])[0]) if end is not None else None
+    if axis.size > limit:
+        last_day = int(axis[-1]) if last_day is None else min(last_day, int(axis[-1]))
+    archived = await load_archived_many(
+        session,
+        stock_ids=ids,
+        provider=provider,
+        interval=interval,
+        first_day=first_day,
+        last_day=last_day,
+        max_dates=limit + 1,
+    )
+    if archived:
+        axis = np.union1d(axis, np.concatenate([bars.days for bars in archived.values()]))[: limit + 1]
+    if axis.size == 0:
+        return empty()
+    has_more = axis.size > limit
+    axis = axis[:limit]
+    upper = to_dates(axis[-1:])[0]
+
+    out = {f: np.full((len(tickers), axis.size), np.nan) for f in fields}
+
+    prices = [f for f in fields if f in PRICE_FIELDS]
+    if prices:
+        for stock_id, bars in archived.items():
+            cols = {"open": bars.open, "high": bars.high, "low": bars.low, "close": bars.close, "volume": bars.volume_or_nan()}
+            rows = np.full(len(bars), row_of[stock_id])
+            for f in prices:
+                _scatter(out[f], rows, bars.days, axis, cols[f])
+        for part in chunked(ids):
+            res = await session.execute(
+                select(StockOHLCV.stock_id, StockOHLCV.as_of, *(getattr(StockOHLCV, f) for f in prices)).where(
+                    *in_range(StockOHLCV, part, upper)
+                )
+            )
+            _scatter_rows(out, prices, res.all(), row_of, axis)  # stored bars win over archived
+
+    signals = [f for f in fields if f in SIGNAL_FIELDS]
+    if signals:
+        for part in chunked(ids):
+            res = await session.execute(
+                select(StockSignal.stock_id, StockSignal.as_of, *(getattr(StockSignal, f) for f in signals)).where(
+                    *in_range(StockSignal, part, upper)
+                )
+            )
+            _scatter_rows(out, signals, res.all(), row_of, axis)
+
+    return MatrixPage(Panel(tickers, EPOCH + axis.astype("timedelta64[D]"), out), upper if has_more else None)
+
+
+def _scatter_rows(
+    out: dict[str, np.ndarray],
+    names: Sequence[str],
+    rows: Sequence[tuple],
+    row_of: Mapping[int, int],
+    axis: np.ndarray,
+) -> None:
+    if not rows:
+        return
+    cols = list(zip(*rows))
+    idx = np.fromiter((row_of[s] for s in cols[0]), dtype=np.intp, count=len(rows))
+    days = to_epoch_days(cols[1])
+    for name, values in zip(names, cols[2:]):
+        _scatter(out[name], idx, days, axis, np.array(values, dtype=np.float64))  # NULL -> NaN
+
+
+def matrix_json(page: MatrixPage, missing: Sequence[str] = ()) -> dict:
+    """
+    {"tickers", "dates", "fields": {name: [[value per ticker] per date]},
+    "next_after", "missing"}; NaN becomes null.
+    """
+    return {
+        "tickers": list(page.panel.tickers),
+        "dates": [d.isoformat() for d in page.panel.dates.astype(object).tolist()],
+        "fields": {
+            name: [[None if x != x else x for x in row] for row in arr.T.tolist()]
+            for name, arr in page.panel.fields.items()
+        },
+        "next_after": page.next_after.isoformat() if page.next_after else None,
+        "missing": list(missing),
+    }
+
+
+def matrix_npz(page: MatrixPage, missing: Sequence[str] = ()) -> bytes:
+    """
+    The page as an uncompressed .npz: `tickers`, `dates` (datetime64[D]),
+    `missing`, and one float64 (dates, tickers) array per field.
+    """
+    buf = io.BytesIO()
+    np.savez(
+        buf,
+        tickers=np.array(page.panel.tickers, dtype=str),
+        dates=page.panel.dates,
+        missing=np.array(list(missing), dtype=str),
+        **{name: np.ascontiguousarray(arr.T) for name, arr in page.panel.fields.items()},
+    )
+    return buf.getvalue()
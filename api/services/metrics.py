@@ -0,0 +1,227 @@
+"""
+In-process metrics with Prometheus text exposition (GET /metrics).
+
+Counters, gauges and histograms are plain dicts keyed by label values behind
+one lock each; nothing is exported until /metrics renders the registry.
+"""
+from __future__ import annotations
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Iterator, Sequence
+
+from services.tracing import span
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            state[0][i] += 1
+            state[1][0] += value
+
+    def count(self, **labels: str) -> int:
+        state = self._values.get(self._key(labels))
+        return sum(state[0]) if state else 0
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = sorted((k, (list(c), s[0])) for k, (c, s) in self._values.items())
+        out: list[str] = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, n in zip((*self.buckets, float("inf")), counts):
+                cumulative += n
+                le = f'le="{_num(bound)}"'
+                out.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_num(total)}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return out
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+HTTP_REQUESTS = Counter(
+    "chronos_http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status")
+)
+HTTP_LATENCY = Histogram(
+    "chronos_http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route")
+)
+HTTP_DB_QUERIES = Histogram(
+    "chronos_http_request_db_queries", "SQL statements executed per HTTP request.", ("route",), COUNT_BUCKETS
+)
+HTTP_DB_SECONDS = Histogram(
+    "chronos_http_request_db_seconds", "Time spent in SQL statements per HTTP request.", ("route",)
+)
+DB_QUERIES = Counter("chronos_db_queries_total", "SQL statements executed.")
+DB_QUERY_SECONDS = Histogram("chronos_db_query_duration_seconds", "Latency of single SQL statements.")
+DB_SLOW_QUERIES = Counter("chronos_db_slow_queries_total", "SQL statements slower than the slow-query threshold.")
+DB_REPEATED = Counter(
+    "chronos_db_repeated_statements_total",
+    "Requests or jobs that ran one statement shape at least the repeat threshold times (likely N+1).",
+    ("scope",),
+)
+JOB_DB_QUERIES = Histogram(
+    "chronos_job_db_queries", "SQL statements executed per background job.", ("job",), COUNT_BUCKETS
+)
+PROVIDER_CALLS = Counter(
+    "chronos_provider_requests_total", "Price provider fetches by outcome.", ("provider", "outcome")
+)
+PROVIDER_SECONDS = Histogram(
+    "chronos_provider_fetch_duration_seconds", "Price provider fetch latency.", ("provider",)
+)
+STAGE_SECONDS = Histogram(
+    "chronos_stage_duration_seconds",
+    "Pipeline stage latency (normalize, upsert_ohlcv, compute_signals, upsert_signals, refresh).",
+    ("stage",),
+)
+REFRESH_JOBS = Counter("chronos_refresh_jobs_total", "Background refresh jobs by outcome.", ("outcome",))
+REFRESH_BACKLOG = Gauge("chronos_refresh_jobs_inflight", "Background refresh jobs scheduled and not yet finished.")
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a block into chronos_stage_duration_seconds{stage=name}; also a
+    tracing span of the same name when tracing is on.
+    """
+    t0 = time.perf_counter()
+    try:
+        with span(name):
+            yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - t0, stage=name)
+
+
+def timed(name: str) -> Callable:
+    """
+    Decorator form of stage() for sync and async functions.
+    """
+    def wrap(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def run_async(*args, **kwargs):
+                with stage(name):
+                    return await fn(*args, **kwargs)
+            return run_async
+
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return run
+    return wrap
@@ -0,0 +1,111 @@
+"""
+On-demand profiling: cProfile windows (timed or one request) and tracemalloc
+snapshots. Output files go to CHRONOS_PROFILE_DIR.
+
+cProfile follows the thread it was enabled on, i.e. the event loop; a window
+therefore captures every task that ran on the loop meanwhile, not just one
+request. Only one profiler can be active per process.
+"""
+from __future__ import annotations
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Iterator
+
+
+PROFILE_DIR = os.environ.get("CHRONOS_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "chronos-profiles"))
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+_active = False
+_tracemalloc_baseline: tracemalloc.Snapshot | None = None
+
+
+def output_path(prefix: str, suffix: str) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    return os.path.join(PROFILE_DIR, f"{prefix}-{stamp}-{time.perf_counter_ns() % 1_000_000:06d}{suffix}")
+
+
+@contextmanager
+def profiled(prefix: str = "profile", path: str | None = None) -> Iterator[dict]:
+    """
+    cProfile the block; on exit the yielded dict holds the .prof path
+    (loadable with pstats or snakeviz) and the profile itself.
+    """
+    global _active
+    if _active:
+        raise ProfilerBusy("a profiling window is already running")
+    _active = True
+    prof = cProfile.Profile()
+    result: dict = {}
+    try:
+        try:
+            prof.enable()
+        except ValueError as exc:  # another tool holds the profiler hook
+            raise ProfilerBusy(str(exc)) from exc
+        try:
+            yield result
+        finally:
+            prof.disable()
+        path = path or output_path(prefix, ".prof")
+        prof.dump_stats(path)
+        result.update(path=path, profile=prof)
+    finally:
+        _active = False
+
+
+def top_functions(prof: cProfile.Profile, *, limit: int = 30, sort: str = "cumulative") -> str:
+    buf = io.StringIO()
+    pstats.Stats(prof, stream=buf).strip_dirs().sort_stats(sort).print_stats(limit)
+    return buf.getvalue()
+
+
+async def profile_window(seconds: float, *, limit: int = 30, sort: str = "cumulative") -> dict:
+    """
+    Profile the event loop for `seconds` while normal traffic runs.
+    """
+    with profiled("window") as result:
+        await asyncio.sleep(seconds)
+    return {"path": result["path"], "seconds": seconds, "stats": top_functions(result["profile"], limit=limit, sort=sort)}
+
+
+def start_tracemalloc(frames: int = 10) -> None:
+    global _tracemalloc_baseline
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+    _tracemalloc_baseline = tracemalloc.take_snapshot()
+
+
+def stop_tracemalloc() -> None:
+    global _tracemalloc_baseline
+    _tracemalloc_baseline = None
+    tracemalloc.stop()
+
+
+def tracemalloc_report(*, limit: int = 20, key: str = "lineno") -> dict:
+    """
+    Top allocation sites now, and growth since start_tracemalloc().
+    """
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not running")
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__)]
+    )
+    current, peak = tracemalloc.get_traced_memory()
+    top = [str(stat) for stat in snapshot.statistics(key)[:limit]]
+    growth = []
+    if _tracemalloc_baseline is not None:
+        growth = [str(stat) for stat in snapshot.compare_to(_tracemalloc_baseline, key)[:limit]]
+    path = output_path("heap", ".tracemalloc")
+    snapshot.dump(path)
+    return {"path": path, "current_bytes": current, "peak_bytes": peak, "top": top, "growth": growth}
@@ -1,10 +1,28 @@
 from __future__ import annotations
-from typing import Protocol, runtime_checkable, Dict, List, Optional
+import asyncio
+import importlib
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, Protocol, runtime_checkable, Dict, List, Optional
 from datetime import date
 from ohlcv import OHLCVRow
+from services.metrics import PROVIDER_CALLS, PROVIDER_SECONDS
+from services.tracing import span
+
+if TYPE_CHECKING:
+    from series import BarSeries
 
 _BUILTINS_LOADED = False
 
+# Built-in provider name -> module that registers it. Imported on first use of
+# that name, so serving reads never pays for yahooquery/pandas.
+_BUILTIN_MODULES: Dict[str, str] = {
+    "yahooquery": "services.providers.yahooquery_adapter",
+    "yahoo": "services.providers.yahoo_http_adapter",
+    "resample": "services.providers.resample_adapter",
+    "synthetic": "services.providers.synthetic_adapter",
+}
+
 @runtime_checkable
 class PriceProvider(Protocol):
     """
@@ -29,7 +47,37 @@ class PriceProvider(Protocol):
         (date, open, high, low, close, volume_or_None)
         """
         ...
-        
+
+
+@runtime_checkable
+class AsyncPriceProvider(Protocol):
+    """
+    Optional extension for providers that fetch without blocking a thread
+    (native async I/O or local reads). Refresh prefers this when present.
+    """
+    name: str
+    async def fetch_ohlcv_rows_async(
+            self,
+            ticker: str,
+            interval: str,
+    ) -> list[OHLCVRow]:
+        ...
+
+
+@runtime_checkable
+class ColumnarPriceProvider(Protocol):
+    """
+    Optional extension for providers that produce columns natively: the
+    refresh path takes their BarSeries as-is instead of building row tuples.
+    """
+    name: str
+    async def fetch_bars_async(
+            self,
+            ticker: str,
+            interval: str,
+    ) -> BarSeries:
+        ...
+
 
 _REGISTRY: Dict[str, PriceProvider] = {}
 
@@ -42,14 +90,65 @@ def _ensure_builtins_loaded() -> None:
         return
 
     # Import default providers for their side-effects (register_provider calls)
-    from services.providers import yahooquery_adapter  # noqa: F401
+    for module in _BUILTIN_MODULES.values():
+        importlib.import_module(module)
 
     _BUILTINS_LOADED = True
 
 def get_provider(name: str) -> PriceProvider:
-    _ensure_builtins_loaded()
+    if name not in _REGISTRY and name in _BUILTIN_MODULES:
+        importlib.import_module(_BUILTIN_MODULES[name])
     try:
         return _REGISTRY[name]
     
     except KeyError:
+        _ensure_builtins_loaded()
         raise ValueError(f"unknown provider: {name!r}. Registered: {list(_REGISTRY)}")
+
+
+async def fetch_rows(provider: PriceProvider, ticker: str, interval: str) -> list[OHLCVRow]:
+    """
+    Fetch rows from any provider without blocking the event loop:
+    async providers are awaited, sync ones run in a worker thread.
+    """
+    with _observed(provider, ticker, interval):
+        if isinstance(provider, AsyncPriceProvider):
+            return await provider.fetch_ohlcv_rows_async(ticker, interval)
+        return await asyncio.to_thread(provider.fetch_ohlcv_rows, ticker, interval)
+
+
+async def fetch_series(provider: PriceProvider, ticker: str, interval: str) -> BarSeries:
+    """
+    fetch_rows() as a BarSeries: columnar providers hand theirs over
+    directly, row providers are converted once.
+    """
+    from series import BarSeries
+
+    if isinstance(provider, ColumnarPriceProvider):
+        with _observed(provider, ticker, interval):
+            return await provider.fetch_bars_async(ticker, interval)
+    return BarSeries.from_rows(await fetch_rows(provider, ticker, interval))
+
+
+@contextmanager
+def _observed(provider: PriceProvider, ticker: str, interval: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        with span("fetch", provider=provider.name, ticker=ticker, interval=interval):
+            yield
+    except Exception:
+        PROVIDER_CALLS.inc(provider=provider.name, outcome="error")
+        raise
+    finally:
+        PROVIDER_SECONDS.observe(time.perf_counter() - t0, provider=provider.name)
+    PROVIDER_CALLS.inc(provider=provider.name, outcome="ok")
+
+
+async def close_providers() -> None:
+    """
+    Release pooled connections held by registered providers (app shutdown).
+    """
+    for provider in list(_REGISTRY.values()):
+        aclose = getattr(provider, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -0,0 +1,85 @@
+from __future__ import annotations
+import asyncio
+from typing import List
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ohlcv import OHLCVRow, list_ohlcv_rows, load_bar_series
+from repositories.stocks import get_stock_by_ticker
+from series import BarSeries
+from services.provider_registry import register_provider
+from services.resample import DERIVED_INTERVALS, resample_arrays, resample_rows
+
+
+class ResampleProvider:
+    """
+    Pseudo-provider that derives coarser bars from base bars already stored
+    for `source` (1wk/1mo/3mo from 1d). Reads only from the database.
+
+    Intraday targets (e.g. 2h/4h from 1h) are not offered: stock_ohlcv.as_of
+    is a date, so stored 1h bars already collapse to one row per day.
+    """
+
+    def __init__(
+        self,
+        source: str = "yahooquery",
+        name: str = "resample",
+        session_factory: async_sessionmaker[AsyncSession] | None = None,
+    ) -> None:
+        self.name = name
+        self.source = source
+        self._session_factory = session_factory
+
+    def _sessions(self) -> async_sessionmaker[AsyncSession]:
+        if self._session_factory is None:
+            from db import AsyncSessionLocal
+            return AsyncSessionLocal
+        return self._session_factory
+
+    async def fetch_ohlcv_rows_async(self, ticker: str, interval: str) -> List[OHLCVRow]:
+        if interval not in DERIVED_INTERVALS:
+            raise ValueError(
+                f"{self.name} cannot derive interval {interval!r}; supported: {sorted(DERIVED_INTERVALS)}"
+            )
+        base_interval, _ = DERIVED_INTERVALS[interval]
+
+        async with self._sessions()() as session:
+            stock = await get_stock_by_ticker(session, ticker)
+            if stock is None:
+                return []
+            base = await list_ohlcv_rows(
+                session, stock_id=stock.id, provider=self.source, interval=base_interval
+            )
+        return resample_rows(base, interval)
+
+    async def fetch_bars_async(self, ticker: str, interval: str) -> BarSeries:
+        if interval not in DERIVED_INTERVALS:
+            raise ValueError(
+                f"{self.name} cannot derive interval {interval!r}; supported: {sorted(DERIVED_INTERVALS)}"
+            )
+        base_interval, rule = DERIVED_INTERVALS[interval]
+
+        async with self._sessions()() as session:
+            stock = await get_stock_by_ticker(session, ticker)
+            if stock is None:
+                return BarSeries.empty()
+            base = await load_bar_series(
+                session, stock_id=stock.id, provider=self.source, interval=base_interval
+            )
+        if not len(base):
+            return base
+        return BarSeries.from_columns(
+            *resample_arrays(base.dates(), base.open, base.high, base.low, base.close, base.volume_or_nan(), rule)
+        )
+
+    def fetch_ohlcv_rows(self, ticker: str, interval: str) -> List[OHLCVRow]:
+        """
+        Sync entry point for callers outside an event loop (scripts, threads).
+        """
+        return asyncio.run(self.fetch_ohlcv_rows_async(ticker, interval))
+
+    def fetch_ohlcv(self, ticker: str, interval: str) -> int:
+        return len(self.fetch_ohlcv_rows(ticker, interval))
+
+
+register_provider(ResampleProvider())
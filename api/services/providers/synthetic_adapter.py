@@ -0,0 +1,168 @@
+from __future__ import annotations
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from datetime import date
+from typing import List
+
+import numpy as np
+
+from ohlcv import OHLCVRow
+from series import BarSeries
+from services.provider_registry import register_provider
+
+
+# interval -> (bars per year, numpy calendar step)
+_INTERVALS: dict[str, tuple[int, str]] = {
+    "1d": (252, "B"),
+    "5d": (52, "W"),
+    "1wk": (52, "W"),
+    "1mo": (12, "M"),
+    "3mo": (4, "Q"),
+}
+
+SyntheticSeries = tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+class SyntheticFetchError(RuntimeError):
+    pass
+
+
+class SyntheticProvider:
+    """
+    Deterministic synthetic-market PriceProvider for offline load and benchmark runs.
+
+    Every (seed, ticker, interval) maps to the same geometric Brownian motion
+    path ending at `end`, with dropped bars (gaps), occasional unadjusted
+    splits and bars without volume. `latency_s` and `failure_rate` inject
+    per-call delay and errors; `fail_tickers` always fail.
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str = "synthetic",
+        seed: int = 0,
+        bars: int = 63,
+        end: date = date(2025, 12, 31),
+        gap_rate: float = 0.01,
+        split_rate: float = 0.002,
+        missing_volume_rate: float = 0.01,
+        latency_s: float = 0.0,
+        failure_rate: float = 0.0,
+        fail_tickers: frozenset[str] = frozenset(),
+    ) -> None:
+        self.name = name
+        self.seed = seed
+        self.bars = bars
+        self.end = end
+        self.gap_rate = gap_rate
+        self.split_rate = split_rate
+        self.missing_volume_rate = missing_volume_rate
+        self.latency_s = latency_s
+        self.failure_rate = failure_rate
+        self.fail_tickers = frozenset(t.upper() for t in fail_tickers)
+        self._failures = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _rng(self, ticker: str, interval: str) -> np.random.Generator:
+        digest = hashlib.blake2b(f"{self.seed}:{ticker.upper()}:{interval}".encode(), digest_size=8).digest()
+        return np.random.default_rng(int.from_bytes(digest, "little"))
+
+    def _calendar(self, interval: str, n: int) -> np.ndarray:
+        _, step = _INTERVALS[interval]
+        end = np.datetime64(self.end, "D")
+        if step == "B":
+            last = np.busday_offset(end, 0, roll="backward")
+            return np.busday_offset(last, np.arange(-n + 1, 1), roll="backward")
+        if step == "W":
+            monday = end - ((end.astype(np.int64) + 3) % 7)
+            return monday + 7 * np.arange(-n + 1, 1)
+        months = end.astype("datetime64[M]")
+        if step == "Q":
+            months = months - months.astype(np.int64) % 3
+            return (months + 3 * np.arange(-n + 1, 1)).astype("datetime64[D]")
+        return (months + np.arange(-n + 1, 1)).astype("datetime64[D]")
+
+    def generate(self, ticker: str, interval: str, bars: int | None = None) -> SyntheticSeries:
+        """
+        Columnar series: (datetime64[D] dates, open, high, low, close, volume-with-NaN).
+        """
+        if interval not in _INTERVALS:
+            raise ValueError(
+                f"synthetic provider has no {interval!r} bars; supported: {sorted(_INTERVALS)}"
+            )
+        n = self.bars if bars is None else bars
+        per_year, _ = _INTERVALS[interval]
+        rng = self._rng(ticker, interval)
+        dt = 1.0 / per_year
+
+        sigma = rng.uniform(0.15, 0.6)
+        mu = rng.uniform(-0.05, 0.15)
+        start = rng.uniform(5.0, 500.0)
+
+        log_ret = rng.normal((mu - 0.5 * sigma**2) * dt, sigma * np.sqrt(dt), n)
+        close = start * np.exp(np.cumsum(log_ret))
+        prev = np.r_[start, close[:-1]]
+        open_ = prev * np.exp(rng.normal(0.0, 0.25 * sigma * np.sqrt(dt), n))
+        wick = np.abs(rng.normal(0.0, 0.5 * sigma * np.sqrt(dt), (2, n)))
+        high = np.maximum(open_, close) * np.exp(wick[0])
+        low = np.minimum(open_, close) * np.exp(-wick[1])
+        volume = np.round(rng.lognormal(13.0, 0.6, n))
+
+        # Unadjusted splits: prices from the split bar onward are divided by the ratio.
+        split_at = np.flatnonzero(rng.random(n) < self.split_rate)
+        if split_at.size:
+            factor = np.ones(n)
+            for i in split_at:
+                ratio = rng.choice([2.0, 3.0, 4.0, 0.1])
+                factor[i:] /= ratio
+            open_, high, low, close = (x * factor for x in (open_, high, low, close))
+            volume = np.round(volume / factor)
+
+        volume[rng.random(n) < self.missing_volume_rate] = np.nan
+        keep = rng.random(n) >= self.gap_rate
+        keep[-1] = True
+
+        dates = self._calendar(interval, n)
+        return dates[keep], open_[keep], high[keep], low[keep], close[keep], volume[keep]
+
+    def _maybe_fail(self, ticker: str) -> None:
+        if ticker.upper() in self.fail_tickers:
+            raise SyntheticFetchError(f"injected failure for {ticker}")
+        if self.failure_rate:
+            with self._lock:
+                roll = self._failures.random()
+            if roll < self.failure_rate:
+                raise SyntheticFetchError(f"injected random failure for {ticker}")
+
+    def _rows(self, ticker: str, interval: str) -> List[OHLCVRow]:
+        dates, o, h, l, c, v = self.generate(ticker, interval)
+        vols = [None if x != x else x for x in v.tolist()]
+        return list(zip(dates.astype(object).tolist(), o.tolist(), h.tolist(), l.tolist(), c.tolist(), vols))
+
+    def fetch_ohlcv_rows(self, ticker: str, interval: str) -> List[OHLCVRow]:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        self._maybe_fail(ticker)
+        return self._rows(ticker, interval)
+
+    async def fetch_ohlcv_rows_async(self, ticker: str, interval: str) -> List[OHLCVRow]:
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        self._maybe_fail(ticker)
+        return self._rows(ticker, interval)
+
+    async def fetch_bars_async(self, ticker: str, interval: str) -> BarSeries:
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        self._maybe_fail(ticker)
+        return BarSeries.from_columns(*self.generate(ticker, interval))
+
+    def fetch_ohlcv(self, ticker: str, interval: str) -> int:
+        return len(self.fetch_ohlcv_rows(ticker, interval))
+
+
+register_provider(SyntheticProvider())
@@ -0,0 +1,207 @@
+from __future__ import annotations
+import asyncio
+import importlib.util
+import json
+import logging
+from typing import List
+
+import httpx
+import numpy as np
+
+from ohlcv import OHLCVRow
+from series import BarSeries
+from services.provider_registry import register_provider
+from services.response_cache import ResponseCache, default_cache
+
+
+logger = logging.getLogger("chronos.yahoo")
+
+DEFAULT_BASE_URL = "https://query1.finance.yahoo.com"
+
+# Daily-or-coarser only: stock_ohlcv.as_of is a date, intraday bars would collide.
+SUPPORTED_INTERVALS = ("1d", "5d", "1wk", "1mo", "3mo")
+
+ChartColumns = tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+
+class YahooChartError(RuntimeError):
+    pass
+
+
+def parse_chart(payload: dict, ticker: str) -> ChartColumns:
+    """
+    v8 chart JSON -> (datetime64[D] dates, open, high, low, close, volume-with-NaN).
+
+    Timestamps are shifted by the exchange's gmtoffset before truncating to
+    a date; bars without a close are dropped; duplicate dates keep the last bar.
+    """
+    chart = payload.get("chart") or {}
+    if chart.get("error"):
+        err = chart["error"]
+        raise YahooChartError(f"{ticker}: {err.get('code')}: {err.get('description')}")
+    results = chart.get("result") or []
+    if not results or not results[0].get("timestamp"):
+        empty = np.empty(0)
+        return np.empty(0, dtype="datetime64[D]"), empty, empty, empty, empty, empty
+
+    result = results[0]
+    quote = result["indicators"]["quote"][0]
+    offset = int(result.get("meta", {}).get("gmtoffset") or 0)
+
+    ts = np.asarray(result["timestamp"], dtype=np.int64)
+    # None -> NaN through the float dtype.
+    cols = [
+        np.asarray(quote.get(k) or [None] * ts.size, dtype=np.float64)
+        for k in ("open", "high", "low", "close", "volume")
+    ]
+
+    days = (ts + offset) // 86_400
+    keep = ~np.isnan(cols[3])
+    days = days[keep]
+    cols = [c[keep] for c in cols]
+
+    # Yahoo appends the live bar, which can repeat the last session's date.
+    last = np.r_[days[1:] != days[:-1], True] if days.size else np.empty(0, dtype=bool)
+    dates = _EPOCH + days[last].astype("timedelta64[D]")
+    o, h, l, c, v = (col[last] for col in cols)
+    return dates, o, h, l, c, v
+
+
+def columns_to_rows(cols: ChartColumns) -> List[OHLCVRow]:
+    dates, o, h, l, c, v = cols
+    vols = [None if x != x else x for x in v.tolist()]
+    return list(zip(dates.astype(object).tolist(), o.tolist(), h.tolist(), l.tolist(), c.tolist(), vols))
+
+
+class YahooHTTPProvider:
+    """
+    Async-native Yahoo chart provider on a pooled httpx.AsyncClient.
+
+    One client per event loop keeps connections (and TLS sessions) alive
+    across refreshes; gzip/deflate (and br with brotli installed) are
+    decoded by httpx. HTTP/2 is used when the h2 package is installed (the `http2` extra).
+    `transport` and `base_url` exist so tests can point it at a stub server.
+
+    Raw chart bodies go through `cache` (services.response_cache; the
+    process default unless given, None disables it).
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str = "yahoo",
+        base_url: str = DEFAULT_BASE_URL,
+        range_: str = "3mo",
+        timeout: httpx.Timeout | float = httpx.Timeout(10.0, connect=5.0),
+        max_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        cache: ResponseCache | None | str = "default",
+    ) -> None:
+        self.name = name
+        self.base_url = base_url
+        self.range = range_
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        if http2 is None:
+            http2 = importlib.util.find_spec("h2") is not None
+            if not http2:
+                logger.info("%s: h2 not installed, using HTTP/1.1 (install the http2 extra)", name)
+        self.http2 = http2
+        self.transport = transport
+        self.cache = default_cache() if cache == "default" else cache
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=self.limits,
+            http2=self.http2,
+            transport=self.transport,
+            headers={"User-Agent": "Mozilla/5.0 (chronos-core)", "Accept": "application/json"},
+        )
+
+    def _client_for_loop(self) -> httpx.AsyncClient:
+        # An AsyncClient's pool is bound to the loop it first ran on.
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            old, old_loop = self._client, self._loop
+            self._client = self._new_client()
+            self._loop = loop
+            if old is not None and not old.is_closed:
+                self._retire(old, old_loop)
+        return self._client
+
+    def _retire(self, client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop | None) -> None:
+        """
+        Close a client left behind by a loop change. Its connections can only
+        be closed on their own loop; if that loop is gone they are abandoned.
+        """
+        if loop is not None and loop.is_running() and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        else:
+            logger.warning("%s: abandoned an HTTP client whose event loop has stopped", self.name)
+
+    async def _get_chart(self, ticker: str, interval: str, client: httpx.AsyncClient | None = None) -> dict:
+        if interval not in SUPPORTED_INTERVALS:
+            raise ValueError(f"{self.name} has no {interval!r} bars; supported: {list(SUPPORTED_INTERVALS)}")
+        if self.cache is None:
+            return json.loads(await self._download(ticker, interval, client))
+        key = (self.name, self.base_url, ticker.upper(), interval, self.range)
+        raw = await self.cache.afetch(key, interval, lambda: self._download(ticker, interval, client))
+        return json.loads(raw)
+
+    async def _download(self, ticker: str, interval: str, client: httpx.AsyncClient | None) -> bytes:
+        client = client or self._client_for_loop()
+        try:
+            res = await client.get(
+                f"/v8/finance/chart/{ticker.upper()}",
+                params={"range": self.range, "interval": interval, "includePrePost": "false", "events": "div,split"},
+            )
+        except httpx.HTTPError as exc:
+            raise YahooChartError(f"{ticker}: {type(exc).__name__}: {exc}") from exc
+        if res.status_code != 200:
+            raise YahooChartError(f"{ticker}: HTTP {res.status_code}")
+        body = res.content
+        # Parse once here so error payloads raise instead of being cached.
+        parse_chart(json.loads(body), ticker)
+        return body
+
+    async def fetch_columns(self, ticker: str, interval: str) -> ChartColumns:
+        payload = await self._get_chart(ticker, interval)
+        return parse_chart(payload, ticker)
+
+    async def fetch_bars_async(self, ticker: str, interval: str) -> BarSeries:
+        return BarSeries.from_columns(*await self.fetch_columns(ticker, interval))
+
+    async def fetch_ohlcv_rows_async(self, ticker: str, interval: str) -> List[OHLCVRow]:
+        return columns_to_rows(await self.fetch_columns(ticker, interval))
+
+    def fetch_ohlcv_rows(self, ticker: str, interval: str) -> List[OHLCVRow]:
+        """
+        Sync entry point for callers outside an event loop; uses a one-off client.
+        """
+        async def once() -> List[OHLCVRow]:
+            async with self._new_client() as client:
+                return columns_to_rows(parse_chart(await self._get_chart(ticker, interval, client), ticker))
+        return asyncio.run(once())
+
+    def fetch_ohlcv(self, ticker: str, interval: str) -> int:
+        return len(self.fetch_ohlcv_rows(ticker, interval))
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+register_provider(YahooHTTPProvider())
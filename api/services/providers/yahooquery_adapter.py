@@ -1,11 +1,16 @@
 from __future__ import annotations
-from yahooquery import Ticker
 from services.provider_registry import PriceProvider, register_provider
 from datetime import date, datetime
 from typing import Optional, List, cast
 import pandas as pd
 
 from ohlcv import OHLCVRow
+from services.metrics import timed
+from services.response_cache import decode_rows, default_cache, encode_rows
+
+
+# History window requested from yahooquery; part of the response cache key.
+HISTORY_PERIOD = "3mo"
 
 
 class YahooQueryProvider:
@@ -32,24 +37,75 @@ class YahooQueryProvider:
         Fetch OHLCV data from yahooquery and normalise into 
         (date, open, high, low, close, volume) tuples
         Volume may be None, if not available
+
+        yahooquery keeps the raw HTTP response to itself, so the response
+        cache holds the normalised rows instead.
         """
+        cache = default_cache()
+        if cache is None:
+            return self._download(ticker, interval)
+        key = (self.name, ticker.upper(), interval, HISTORY_PERIOD)
+        payload = cache.fetch(key, interval, lambda: encode_rows(self._download(ticker, interval)))
+        return decode_rows(payload)
+
+    def _download(self, ticker: str, interval: str) -> List[OHLCVRow]:
+        from yahooquery import Ticker  # heavy; only needed when actually fetching
+
         tk = Ticker(ticker, asynchronous=False)
-        data = tk.history(period="3mo", interval=interval)
+        data = tk.history(period=HISTORY_PERIOD, interval=interval)
+
+        return normalize_history(data, ticker)
+
+
+@timed("normalize")
+def normalize_history(data: object, ticker: str) -> List[OHLCVRow]:
+    """
+    Normalise a yahooquery history() payload (DataFrame, MultiIndex DataFrame
+    or {ticker: DataFrame}) into (date, open, high, low, close, volume) tuples.
+    Kept free of network access so it can be benchmarked on its own.
+    """
+    rows: List[OHLCVRow] = []
+
+    if isinstance(data, pd.DataFrame):
+        df = data
+
+        if isinstance(df.index, pd.MultiIndex):
+            try:
+                df = df.xs(ticker, level=0)
+            except KeyError:
+                return []
 
-        rows: List[OHLCVRow] = []
+        df = df.copy()
+        for idx, r in df.iterrows():
+            # idx can be Timestamp, datetime, or date; normalize to date
+            if isinstance(idx, pd.Timestamp):
+                dt = idx.date()
+            elif isinstance(idx, datetime):
+                dt = idx.date()
+            elif isinstance(idx, date):
+                dt = idx
+            else:
+                # last-resort parse; shouldn't usually hit this
+                dt = date.fromisoformat(str(idx))
 
-        if isinstance(data, pd.DataFrame):
-            df = data
 
-            if isinstance(df.index, pd.MultiIndex):
-                try:
-                    df = df.xs(ticker, level=0)
-                except KeyError:
-                    return []
+            o = float(r["open"])
+            h = float(r["high"])
+            l = float(r["low"])
+            c = float(r["close"])
+            v: Optional[float] = None
+            if "volume" in r and pd.notna(r["volume"]):
+                v = float(r["volume"])
+            rows.append((dt, o, h, l, c, v))
+
+        return rows
 
-            df = df.copy()
-            for idx, r in df.iterrows():
-                # idx can be Timestamp, datetime, or date; normalize to date
+    if isinstance(data, dict):
+        inner = data.get(ticker)
+        if isinstance(inner, pd.DataFrame):
+            df = inner.copy()
+
+            for idx, r in df.iterrows(): # type: ignore[reportGeneralTypeIssues]
                 if isinstance(idx, pd.Timestamp):
                     dt = idx.date()
                 elif isinstance(idx, datetime):
@@ -57,10 +113,8 @@ class YahooQueryProvider:
                 elif isinstance(idx, date):
                     dt = idx
                 else:
-                    # last-resort parse; shouldn't usually hit this
                     dt = date.fromisoformat(str(idx))
 
-                   
                 o = float(r["open"])
                 h = float(r["high"])
                 l = float(r["low"])
@@ -69,36 +123,10 @@ class YahooQueryProvider:
                 if "volume" in r and pd.notna(r["volume"]):
                     v = float(r["volume"])
                 rows.append((dt, o, h, l, c, v))
-
+            rows.sort(key=lambda tup: tup[0])
             return rows
-
-        if isinstance(data, dict):
-            inner = data.get(ticker)
-            if isinstance(inner, pd.DataFrame):
-                df = inner.copy()
-
-                for idx, r in df.iterrows(): # type: ignore[reportGeneralTypeIssues]
-                    if isinstance(idx, pd.Timestamp):
-                        dt = idx.date()
-                    elif isinstance(idx, datetime):
-                        dt = idx.date()
-                    elif isinstance(idx, date):
-                        dt = idx
-                    else:
-                        dt = date.fromisoformat(str(idx))
-
-                    o = float(r["open"])
-                    h = float(r["high"])
-                    l = float(r["low"])
-                    c = float(r["close"])
-                    v: Optional[float] = None
-                    if "volume" in r and pd.notna(r["volume"]):
-                        v = float(r["volume"])
-                    rows.append((dt, o, h, l, c, v))
-                rows.sort(key=lambda tup: tup[0])
-                return rows
-        # Fallback: unrecognized shape or empty → no rows
-        return rows
+    # Fallback: unrecognized shape or empty → no rows
+    return rows
 
 
 register_provider(YahooQueryProvider())
@@ -0,0 +1,131 @@
+"""
+SQL statement accounting per HTTP request or background job.
+
+Engine hooks feed the QueryLog that is current in the calling task's context:
+statement count and time, occurrences per statement shape (to spot per-row
+query loops), and the slowest statements with their parameters.
+"""
+from __future__ import annotations
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from services.metrics import DB_QUERIES, DB_QUERY_SECONDS, DB_REPEATED, DB_SLOW_QUERIES, JOB_DB_QUERIES
+
+
+logger = logging.getLogger("chronos.sql")
+
+SLOW_QUERY_SECONDS = float(os.environ.get("CHRONOS_SLOW_QUERY_MS", "100")) / 1e3
+REPEAT_THRESHOLD = int(os.environ.get("CHRONOS_REPEAT_THRESHOLD", "10"))
+MAX_SLOW_KEPT = 20
+
+_WS = re.compile(r"\s+")
+# Expanded IN lists render as (?, ?, ...) or ($1, $2, ...); one shape regardless of length.
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|\$\d+|%s|:\w+)\s*,)+\s*(?:\?|\$\d+|%s|:\w+)\s*\)")
+
+
+def statement_shape(statement: str) -> str:
+    return _IN_LIST.sub("(...)", _WS.sub(" ", statement).strip())
+
+
+@dataclass(slots=True)
+class SlowQuery:
+    statement: str
+    parameters: str
+    seconds: float
+
+
+class QueryLog:
+    __slots__ = ("count", "seconds", "shapes", "slow")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter[str] = Counter()
+        self.slow: list[SlowQuery] = []
+
+    def record(self, statement: str, parameters, elapsed: float) -> None:
+        self.count += 1
+        self.seconds += elapsed
+        self.shapes[statement_shape(statement)] += 1
+        if elapsed >= SLOW_QUERY_SECONDS and len(self.slow) < MAX_SLOW_KEPT:
+            self.slow.append(SlowQuery(statement, repr(parameters)[:512], elapsed))
+
+    def repeated(self, threshold: int = REPEAT_THRESHOLD) -> list[tuple[str, int]]:
+        """
+        Statement shapes executed at least `threshold` times, most frequent first.
+        """
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    def summary(self, limit: int = 5) -> str:
+        lines = [f"{self.count} statements in {self.seconds * 1e3:.1f} ms"]
+        lines += [f"  x{n}: {shape[:200]}" for shape, n in self.shapes.most_common(limit)]
+        return "\n".join(lines)
+
+
+current_query_log: ContextVar[QueryLog | None] = ContextVar("current_query_log", default=None)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Count and time every statement on a (sync) engine: AsyncEngine.sync_engine for the app.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("chronos_query_t0", []).append((context, time.perf_counter()))
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["chronos_query_t0"].pop()[1]
+        DB_QUERIES.inc()
+        DB_QUERY_SECONDS.observe(elapsed)
+        if elapsed >= SLOW_QUERY_SECONDS:
+            DB_SLOW_QUERIES.inc()
+            logger.warning("slow query (%.1f ms): %s params=%.512r", elapsed * 1e3, statement, parameters)
+        log = current_query_log.get()
+        if log is not None:
+            log.record(statement, parameters, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(ctx):
+        # A failed statement never reaches after_cursor_execute; drop its start
+        # time so the connection's stack does not grow and misattribute timings.
+        started = ctx.connection.info.get("chronos_query_t0") if ctx.connection is not None else None
+        if started and started[-1][0] is ctx.execution_context:
+            started.pop()
+
+
+def report(log: QueryLog, scope: str) -> None:
+    """
+    Flag repeated statement shapes for a finished request or job.
+    """
+    for shape, n in log.repeated():
+        DB_REPEATED.inc(scope=scope)
+        logger.warning("%s ran the same statement %d times (N+1?): %s", scope, n, shape[:300])
+
+
+@contextmanager
+def track_queries(job: str | None = None) -> Iterator[QueryLog]:
+    """
+    Collect statements issued in this context (and tasks it creates) into a
+    fresh QueryLog. With `job`, the total is recorded in chronos_job_db_queries
+    and repeated shapes are reported on exit.
+    """
+    log = QueryLog()
+    token = current_query_log.set(log)
+    try:
+        yield log
+    finally:
+        current_query_log.reset(token)
+        if job is not None:
+            JOB_DB_QUERIES.observe(log.count, job=job)
+            report(log, job)
@@ -0,0 +1,246 @@
+from __future__ import annotations
+import asyncio
+import logging
+from contextlib import nullcontext
+from typing import Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db import AsyncSessionLocal
+from models import CacheStatus, Stock
+from ohlcv import upsert_ohlcv
+from repositories.cache import record_revision, upsert_cache_status
+from repositories.quarantine import quarantine_bars
+from repositories.stocks import get_stock_by_ticker
+from services.broadcast import BROADCASTER, bar_payload, publish_status, signal_payload
+from services.metrics import REFRESH_BACKLOG, REFRESH_JOBS, stage
+from services.querylog import track_queries
+from services.resilience import fetch_resilient
+from services.response_cache import revalidate as revalidate_cache
+from services.ta.compute import compute_and_upsert_signals
+
+
+logger = logging.getLogger("chronos.refresh")
+
+# Strong references to scheduled jobs; the event loop only keeps weak ones.
+_background_jobs: set[asyncio.Task] = set()
+
+
+async def refresh_stock_prices(
+    session: AsyncSession,
+    *,
+    stock: Stock,
+    provider: str,
+    interval: str,
+    hedge_after: float | None = None,
+) -> int:
+    """
+    Fetch bars from the provider (or its fallbacks, see services.resilience),
+    upsert them, recompute signals and mark the cache fresh. Returns the
+    number of bars written. Raises on failure; the caller is responsible for
+    recording the error state.
+
+    Bars served by a fallback are stored under the requested provider so the
+    series stays continuous; the cache detail records the source.
+
+    Bars failing validation (services.validation) go to the quarantine table
+    instead of stock_ohlcv; the cache detail carries the validation summary.
+
+    Signals are recomputed only from the earliest new or revised bar (less
+    the TA provider's warm-up), and not at all when no bar changed; the
+    cache row's version counts those revisions.
+
+    New or changed bars and signals are published to stream subscribers
+    (services.broadcast) as each step commits.
+    """
+    bars, source = await fetch_resilient(provider, stock.ticker, interval, hedge_after=hedge_after)
+    topic = (stock.id, provider, interval)
+
+    from services.validation import validate_bars
+
+    with stage("validate"):
+        checked = validate_bars(bars, interval)
+    await quarantine_bars(
+        session,
+        stock_id=stock.id,
+        provider=provider,
+        interval=interval,
+        bars=checked.rejected,
+        reasons=checked.reasons,
+    )
+
+    changed_bars: list = []
+    written = await upsert_ohlcv(
+        session,
+        stock_id=stock.id,
+        provider=provider,
+        interval=interval,
+        rows=checked.clean,
+        changed=changed_bars,
+    )
+    # Committed with the bars, so signals left stale by a failure below are
+    # still recomputed by the next refresh.
+    series = await record_revision(
+        session,
+        stock_id=stock.id,
+        provider=provider,
+        interval=interval,
+        changed_from=changed_bars[0][0] if changed_bars else None,
+    )
+    await session.commit()
+    if changed_bars and BROADCASTER.subscribers(topic):
+        BROADCASTER.publish(topic, "bars", bar_payload(changed_bars))
+
+    if series.stale_from is not None:
+        changed_signals: list = []
+        await compute_and_upsert_signals(
+            session,
+            stock_id=stock.id,
+            provider=provider,
+            interval=interval,
+            since=series.stale_from,
+            changed=changed_signals,
+        )
+        series.stale_from = None
+        await session.commit()
+        if changed_signals and BROADCASTER.subscribers(topic):
+            BROADCASTER.publish(topic, "signals", signal_payload(changed_signals))
+
+    row = await upsert_cache_status(
+        session,
+        stock_id=stock.id,
+        provider=provider,
+        interval=interval,
+        status=CacheStatus.fresh,
+        detail=_detail(written, source, provider, checked.report.summary()),
+    )
+    publish_status(topic, row.status.value, row.detail, row.last_fetched_at)
+    return written
+
+
+def _detail(written: int, source: str, provider: str, validation: str) -> str:
+    detail = f"fetched {written} rows from {source}"
+    if source != provider:
+        detail += f" (fallback for {provider})"
+    if validation:
+        detail += f"; {validation}"
+    return detail[:512]
+
+
+async def refresh_stock_prices_background(
+    *,
+    ticker: str,
+    provider: str,
+    interval: str,
+    hedge_after: float | None = None,
+    revalidate: bool = False,
+) -> None:
+    """
+    Background-task entry point used by POST /stocks/{ticker}/refresh.
+    Opens its own session; cache transitions fetching -> fresh | error.
+    With `revalidate` the provider response cache is bypassed, so an explicit
+    refresh never reports a cached payload as fresh.
+    """
+    # A fresh log, so the job's statements aren't charged to the request that scheduled it.
+    with track_queries("refresh"), stage("refresh"), revalidate_cache() if revalidate else nullcontext():
+        outcome = await _refresh_job(ticker=ticker, provider=provider, interval=interval, hedge_after=hedge_after)
+    REFRESH_JOBS.inc(outcome=outcome)
+
+
+async def _refresh_job(*, ticker: str, provider: str, interval: str, hedge_after: float | None) -> str:
+    async with AsyncSessionLocal() as session:
+        stock = await get_stock_by_ticker(session, ticker)
+        if stock is None:
+            logger.warning("refresh skipped: unknown ticker %s", ticker)
+            return "skipped"
+        stock_id = stock.id
+        try:
+            await refresh_stock_prices(
+                session, stock=stock, provider=provider, interval=interval, hedge_after=hedge_after
+            )
+        except Exception as exc:
+            logger.exception("refresh failed for %s/%s/%s", ticker, provider, interval)
+            await session.rollback()
+            row = await upsert_cache_status(
+                session,
+                stock_id=stock_id,
+                provider=provider,
+                interval=interval,
+                status=CacheStatus.error,
+                detail=str(exc)[:512],
+            )
+            publish_status((stock_id, provider, interval), row.status.value, row.detail, row.last_fetched_at)
+            return "error"
+        return "ok"
+
+
+def schedule_refresh(
+    *,
+    ticker: str,
+    provider: str,
+    interval: str,
+    hedge_after: float | None = None,
+    revalidate: bool = False,
+) -> asyncio.Task:
+    """
+    Start refresh_stock_prices_background as a tracked task (counted in
+    chronos_refresh_jobs_inflight until it finishes).
+    """
+    task = asyncio.create_task(
+        refresh_stock_prices_background(
+            ticker=ticker, provider=provider, interval=interval, hedge_after=hedge_after, revalidate=revalidate
+        )
+    )
+    _background_jobs.add(task)
+    REFRESH_BACKLOG.inc()
+
+    def _done(t: asyncio.Task) -> None:
+        _background_jobs.discard(t)
+        REFRESH_BACKLOG.dec()
+
+    task.add_done_callback(_done)
+    return task
+
+
+def schedule_refresh_batch(
+    *,
+    tickers: Sequence[str],
+    provider: str,
+    interval: str,
+    concurrency: int = 8,
+    revalidate: bool = False,
+) -> asyncio.Task:
+    """
+    Refresh many series from one tracked task, at most `concurrency` at a
+    time, so a large watch list does not start thousands of fetches at once.
+    """
+
+    remaining = len(tickers)
+
+    async def run() -> None:
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(ticker: str) -> None:
+            nonlocal remaining
+            async with sem:
+                try:
+                    await refresh_stock_prices_background(
+                        ticker=ticker, provider=provider, interval=interval, revalidate=revalidate
+                    )
+                finally:
+                    remaining -= 1
+                    REFRESH_BACKLOG.dec()
+
+        await asyncio.gather(*(one(t) for t in tickers))
+
+    task = asyncio.create_task(run())
+    _background_jobs.add(task)
+    REFRESH_BACKLOG.inc(remaining)
+
+    def _done(t: asyncio.Task) -> None:
+        _background_jobs.discard(t)
+        REFRESH_BACKLOG.dec(remaining)  # jobs cancelled before they started
+
+    task.add_done_callback(_done)
+    return task
+
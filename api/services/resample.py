@@ -0,0 +1,97 @@
+from __future__ import annotations
+from datetime import date
+from typing import Sequence
+
+import numpy as np
+
+from ohlcv import OHLCVRow
+
+
+# target interval -> (stored base interval, bucketing rule)
+DERIVED_INTERVALS: dict[str, tuple[str, str]] = {
+    "5d": ("1d", "week"),
+    "1wk": ("1d", "week"),
+    "1mo": ("1d", "month"),
+    "3mo": ("1d", "quarter"),
+}
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+
+def _bucket_starts(days: np.ndarray, rule: str) -> np.ndarray:
+    """
+    Map datetime64[D] bar dates to the datetime64[D] start of their bucket.
+    Weeks start on Monday; months and quarters on the 1st.
+    """
+    if rule == "week":
+        # 1970-01-01 was a Thursday; shift so integer division aligns to Mondays.
+        offset = (days - _EPOCH).astype(np.int64) + 3
+        return _EPOCH + ((offset // 7) * 7 - 3).astype("timedelta64[D]")
+    months = days.astype("datetime64[M]")
+    if rule == "quarter":
+        m = months.astype(np.int64)
+        months = (m - m % 3).astype("datetime64[M]")
+    elif rule != "month":
+        raise ValueError(f"unknown resample rule: {rule!r}")
+    return months.astype("datetime64[D]")
+
+
+def resample_arrays(
+    days: np.ndarray,
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    rule: str,
+) -> tuple[np.ndarray, ...]:
+    """
+    Aggregate sorted base bars into coarser bars with reduceat.
+
+    Returns (bucket_start_days, open, high, low, close, volume); volume is
+    NaN for a bucket only if every base bar in it lacked volume.
+    """
+    if days.size == 0:
+        return (days, open_, high, low, close, volume)
+
+    buckets = _bucket_starts(days, rule)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], days.size] - 1
+
+    has_vol = ~np.isnan(volume)
+    vol = np.add.reduceat(np.where(has_vol, volume, 0.0), starts)
+    vol[np.add.reduceat(has_vol.astype(np.int64), starts) == 0] = np.nan
+
+    return (
+        buckets[starts],
+        open_[starts],
+        np.maximum.reduceat(high, starts),
+        np.minimum.reduceat(low, starts),
+        close[ends],
+        vol,
+    )
+
+
+def resample_rows(rows: Sequence[OHLCVRow], interval: str) -> list[OHLCVRow]:
+    """
+    Build `interval` bars from base rows of DERIVED_INTERVALS[interval][0].
+    """
+    try:
+        _, rule = DERIVED_INTERVALS[interval]
+    except KeyError:
+        raise ValueError(
+            f"cannot derive interval {interval!r}; supported: {sorted(DERIVED_INTERVALS)}"
+        )
+    if not rows:
+        return []
+
+    ordered = sorted(rows, key=lambda r: r[0])
+    cols = list(zip(*ordered))
+    days = np.array(cols[0], dtype="datetime64[D]")
+    o, h, l, c = (np.array(col, dtype=np.float64) for col in cols[1:5])
+    v = np.array(cols[5], dtype=np.float64)
+
+    out_days, o, h, l, c, v = resample_arrays(days, o, h, l, c, v, rule)
+    as_of: list[date] = out_days.astype(object).tolist()
+    vols = [None if x != x else x for x in v.tolist()]
+    return list(zip(as_of, o.tolist(), h.tolist(), l.tolist(), c.tolist(), vols))
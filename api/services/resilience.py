@@ -0,0 +1,288 @@
+"""
+Resilience layer around the provider registry: per-provider token buckets,
+circuit breakers with half-open probing, ordered fallback chains and
+optional hedged requests. All state is exported through services.metrics.
+"""
+from __future__ import annotations
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from services.metrics import Counter, Gauge
+from services.provider_registry import fetch_series, get_provider
+
+if TYPE_CHECKING:
+    from series import BarSeries
+
+
+CIRCUIT_STATE = Gauge(
+    "chronos_provider_circuit_state", "Circuit breaker state per provider (0 closed, 1 half-open, 2 open).", ("provider",)
+)
+CIRCUIT_FAILURES = Gauge(
+    "chronos_provider_consecutive_failures", "Consecutive failed fetches per provider.", ("provider",)
+)
+CIRCUIT_REJECTED = Counter(
+    "chronos_provider_circuit_rejections_total", "Fetches skipped because the circuit was open.", ("provider",)
+)
+THROTTLE_SECONDS = Counter(
+    "chronos_provider_throttle_seconds_total", "Time spent waiting on the provider's token bucket.", ("provider",)
+)
+THROTTLED = Counter("chronos_provider_throttled_total", "Fetches that had to wait for a token.", ("provider",))
+FALLBACKS = Counter(
+    "chronos_provider_fallbacks_total", "Fetches served by another provider in the chain.", ("requested", "served")
+)
+HEDGES = Counter(
+    "chronos_provider_hedges_total", "Hedged requests launched and won.", ("provider", "outcome")
+)
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class ProviderChainError(RuntimeError):
+    """
+    Every provider in the chain failed or was skipped; `errors` maps name -> exception.
+    """
+
+    def __init__(self, requested: str, errors: Dict[str, BaseException]) -> None:
+        self.requested = requested
+        self.errors = errors
+        detail = "; ".join(f"{name}: {type(exc).__name__}: {exc}" for name, exc in errors.items())
+        super().__init__(f"all providers failed for {requested}: {detail}")
+
+
+class TokenBucket:
+    """
+    `rate` tokens per second, up to `burst`. Callers reserve a token and
+    sleep off any debt, so waiters are served in arrival order without a lock.
+    """
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """
+        Take a token; return the seconds to wait before using it.
+        """
+        self._refill()
+        self.tokens -= 1.0
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures; open ->
+    half-open once `reset_timeout` has passed, letting a single probe through.
+    The probe's success closes the circuit, its failure re-opens it.
+    """
+
+    CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._clock = clock
+        self._opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if self._clock() - self._opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._probing = False
+        if self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self._opened_at = self._clock()
+        self._probing = False
+
+    def release(self) -> None:
+        """
+        Attempt abandoned (e.g. a cancelled hedge): free the half-open probe slot.
+        """
+        self._probing = False
+
+
+@dataclass(frozen=True, slots=True)
+class ProviderPolicy:
+    rate: Optional[float] = None  # tokens/second; None = unlimited
+    burst: float = 1.0
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+
+
+DEFAULT_POLICY = ProviderPolicy()
+
+_POLICIES: Dict[str, ProviderPolicy] = {
+    # Yahoo throttles aggressively and both adapters hit the same backend.
+    "yahooquery": ProviderPolicy(rate=2.0, burst=10),
+    "yahoo": ProviderPolicy(rate=2.0, burst=10),
+}
+_CHAINS: Dict[str, tuple[str, ...]] = {
+    "yahooquery": ("yahoo",),
+}
+_BUCKETS: Dict[str, TokenBucket] = {}
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+
+
+def configure_provider(name: str, policy: ProviderPolicy) -> None:
+    """
+    Set the policy for `name`; resets its bucket and breaker.
+    """
+    _POLICIES[name] = policy
+    _BUCKETS.pop(name, None)
+    _BREAKERS.pop(name, None)
+
+
+def set_fallback_chain(name: str, fallbacks: List[str]) -> None:
+    _CHAINS[name] = tuple(fallbacks)
+
+
+def fallback_chain(name: str) -> List[str]:
+    return list(dict.fromkeys([name, *_CHAINS.get(name, ())]))
+
+
+def breaker(name: str) -> CircuitBreaker:
+    b = _BREAKERS.get(name)
+    if b is None:
+        policy = _POLICIES.get(name, DEFAULT_POLICY)
+        b = _BREAKERS[name] = CircuitBreaker(policy.failure_threshold, policy.reset_timeout)
+    return b
+
+
+def bucket(name: str) -> Optional[TokenBucket]:
+    policy = _POLICIES.get(name, DEFAULT_POLICY)
+    if policy.rate is None:
+        return None
+    b = _BUCKETS.get(name)
+    if b is None:
+        b = _BUCKETS[name] = TokenBucket(policy.rate, policy.burst)
+    return b
+
+
+def _export(name: str, b: CircuitBreaker) -> None:
+    CIRCUIT_STATE.set(b.state, provider=name)
+    CIRCUIT_FAILURES.set(b.failures, provider=name)
+
+
+async def _attempt(name: str, ticker: str, interval: str) -> BarSeries:
+    b = breaker(name)
+    if not b.allow():
+        CIRCUIT_REJECTED.inc(provider=name)
+        raise CircuitOpenError(f"circuit open for {name}")
+    _export(name, b)
+    try:
+        tb = bucket(name)
+        if tb is not None:
+            waited = await tb.acquire()
+            if waited:
+                THROTTLED.inc(provider=name)
+                THROTTLE_SECONDS.inc(waited, provider=name)
+        bars = await fetch_series(get_provider(name), ticker, interval)
+    except (asyncio.CancelledError, ValueError):
+        # Cancelled hedges and caller errors (unknown provider or interval)
+        # say nothing about the provider's health.
+        b.release()
+        raise
+    except Exception:
+        b.record_failure()
+        _export(name, b)
+        raise
+    b.record_success()
+    _export(name, b)
+    return bars
+
+
+async def fetch_resilient(
+    provider: str,
+    ticker: str,
+    interval: str,
+    *,
+    hedge_after: Optional[float] = None,
+) -> tuple[BarSeries, str]:
+    """
+    Fetch through `provider`'s fallback chain; returns (bars, provider that served them).
+
+    Providers are tried in order, skipping open circuits. With `hedge_after`
+    (seconds), the next provider is also started if the current attempt has
+    not finished by then; the first success wins and the rest are cancelled.
+    """
+    chain = fallback_chain(provider)
+    errors: Dict[str, BaseException] = {}
+    pending: Dict[asyncio.Task, str] = {}
+    hedged: set[str] = set()
+    next_i = 0
+
+    def launch() -> bool:
+        nonlocal next_i
+        if next_i >= len(chain):
+            return False
+        name = chain[next_i]
+        next_i += 1
+        pending[asyncio.ensure_future(_attempt(name, ticker, interval))] = name
+        return True
+
+    try:
+        while True:
+            if not pending and not launch():
+                raise ProviderChainError(provider, errors)
+            hedge = hedge_after is not None and next_i < len(chain)
+            done, _ = await asyncio.wait(
+                pending, timeout=hedge_after if hedge else None, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                launch()
+                hedged.add(chain[next_i - 1])
+                HEDGES.inc(provider=provider, outcome="launched")
+                continue
+            for task in done:
+                name = pending.pop(task)
+                exc = task.exception()
+                if exc is None:
+                    if name != provider:
+                        FALLBACKS.inc(requested=provider, served=name)
+                    if name in hedged:
+                        HEDGES.inc(provider=provider, outcome="won")
+                    return task.result(), name
+                errors[name] = exc
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,319 @@
+"""
+On-disk cache for raw provider responses, shared by every refresh in the
+process (and by processes pointing at the same directory).
+
+Payloads are zlib-compressed and stored once per content hash under
+blobs/; index/ maps a request key (provider, ticker, interval, window, ...)
+to the blob it last returned, with the time it was stored. Entries expire
+per interval; blobs are evicted least-recently-used once the directory
+outgrows its size budget.
+
+CHRONOS_PROVIDER_CACHE selects the mode: "on" (default), "off", or
+"offline", which serves whatever is cached regardless of age and never
+touches the network, so tests and backfills can replay recorded payloads.
+
+Inside revalidate() (used by user-initiated refreshes) cached entries are
+not served: every lookup goes to the provider and the response replaces
+the stored one. Offline mode ignores it.
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Sequence
+
+from ohlcv import OHLCVRow
+from services.metrics import Counter, Gauge
+
+
+CACHE_LOOKUPS = Counter(
+    "chronos_provider_cache_lookups_total", "Response cache lookups by outcome.", ("provider", "outcome")
+)
+CACHE_BYTES = Gauge("chronos_provider_cache_bytes", "Compressed bytes held in the response cache.")
+CACHE_EVICTIONS = Counter("chronos_provider_cache_evictions_total", "Blobs evicted to stay under the size budget.")
+
+# Seconds a response stays fresh. Daily bars carry a live bar that moves
+# during the session; coarser bars barely change within an hour.
+DEFAULT_TTLS: Dict[str, float] = {
+    "1d": 10 * 60,
+    "5d": 30 * 60,
+    "1wk": 60 * 60,
+    "1mo": 6 * 60 * 60,
+    "3mo": 6 * 60 * 60,
+}
+DEFAULT_TTL = 10 * 60
+
+CacheKey = Sequence[str]
+
+_revalidating: ContextVar[bool] = ContextVar("response_cache_revalidate", default=False)
+
+
+@contextmanager
+def revalidate() -> Iterator[None]:
+    """
+    Skip cached reads for everything fetched in this context (tasks and
+    worker threads started from it included); fresh responses are still stored.
+    """
+    token = _revalidating.set(True)
+    try:
+        yield
+    finally:
+        _revalidating.reset(token)
+
+
+class OfflineCacheMiss(RuntimeError):
+    pass
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        root: str,
+        *,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttls: Optional[Dict[str, float]] = None,
+        offline: bool = False,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.offline = offline
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._total: Optional[int] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+        os.makedirs(os.path.join(root, "index"), exist_ok=True)
+
+    @staticmethod
+    def _key_hash(key: CacheKey) -> str:
+        return hashlib.sha256("\x1f".join(key).encode()).hexdigest()
+
+    def _index_path(self, key_hash: str) -> str:
+        return os.path.join(self.root, "index", f"{key_hash}.json")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], f"{digest}.z")
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def get(self, key: CacheKey, interval: str) -> Optional[bytes]:
+        """
+        The cached payload for `key`, or None if absent, expired (unless
+        offline), unreadable, or bypassed by revalidate().
+        """
+        provider = key[0]
+        if _revalidating.get() and not self.offline:
+            CACHE_LOOKUPS.inc(provider=provider, outcome="revalidate")
+            return None
+        try:
+            with open(self._index_path(self._key_hash(key)), "rb") as fh:
+                entry = json.load(fh)
+        except (OSError, ValueError):
+            CACHE_LOOKUPS.inc(provider=provider, outcome="miss")
+            return None
+        if not self.offline and self._clock() - entry["stored_at"] > self.ttls.get(interval, DEFAULT_TTL):
+            CACHE_LOOKUPS.inc(provider=provider, outcome="stale")
+            return None
+        blob = self._blob_path(entry["digest"])
+        try:
+            with open(blob, "rb") as fh:
+                payload = zlib.decompress(fh.read())
+            os.utime(blob)  # recency for eviction
+        except (OSError, zlib.error):
+            CACHE_LOOKUPS.inc(provider=provider, outcome="miss")
+            return None
+        if hashlib.sha256(payload).hexdigest() != entry["digest"]:
+            CACHE_LOOKUPS.inc(provider=provider, outcome="miss")
+            return None
+        CACHE_LOOKUPS.inc(provider=provider, outcome="hit")
+        return payload
+
+    def put(self, key: CacheKey, payload: bytes) -> str:
+        """
+        Store `payload` for `key`; returns its content digest.
+        """
+        digest = hashlib.sha256(payload).hexdigest()
+        blob = self._blob_path(digest)
+        added = 0
+        if not os.path.exists(blob):
+            data = zlib.compress(payload, 6)
+            self._write_atomic(blob, data)
+            added = len(data)
+        entry = {"key": list(key), "digest": digest, "stored_at": self._clock()}
+        self._write_atomic(self._index_path(self._key_hash(key)), json.dumps(entry).encode())
+        with self._lock:
+            if self._total is None:
+                self._total = self._scan_total()
+            else:
+                self._total += added
+            over = self._total > self.max_bytes
+            CACHE_BYTES.set(self._total)
+        if over:
+            self.evict()
+        return digest
+
+    def _blobs(self) -> List[tuple[float, int, str]]:
+        found = []
+        for dirpath, _, files in os.walk(os.path.join(self.root, "blobs")):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                found.append((st.st_mtime, st.st_size, path))
+        return found
+
+    def _scan_total(self) -> int:
+        return sum(size for _, size, _ in self._blobs())
+
+    def evict(self) -> int:
+        """
+        Drop least-recently-used blobs until the cache is at 90% of its
+        budget, and the index entries that pointed at them.
+        """
+        target = int(self.max_bytes * 0.9)
+        with self._lock:
+            blobs = sorted(self._blobs())
+            total = sum(size for _, size, _ in blobs)
+            removed: set[str] = set()
+            for _, size, path in blobs:
+                if total <= target:
+                    break
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                total -= size
+                removed.add(os.path.basename(path)[: -len(".z")])
+            self._total = total
+            CACHE_BYTES.set(total)
+        if removed:
+            self._prune_index(removed)
+        CACHE_EVICTIONS.inc(len(removed))
+        return len(removed)
+
+    def _prune_index(self, digests: set[str]) -> int:
+        """
+        Delete index entries whose blob is in `digests` (or unreadable).
+        """
+        pruned = 0
+        index = os.path.join(self.root, "index")
+        for name in os.listdir(index):
+            if not name.endswith(".json"):
+                continue  # an in-progress atomic write
+            path = os.path.join(index, name)
+            try:
+                with open(path, "rb") as fh:
+                    digest = json.load(fh)["digest"]
+            except (OSError, ValueError, KeyError):
+                digest = None
+            if digest is None or digest in digests:
+                try:
+                    os.unlink(path)
+                    pruned += 1
+                except OSError:
+                    pass
+        return pruned
+
+    def fetch(self, key: CacheKey, interval: str, loader: Callable[[], bytes]) -> bytes:
+        """
+        Cached payload, else loader()'s result (stored). Offline, a miss raises.
+        """
+        payload = self.get(key, interval)
+        if payload is not None:
+            return payload
+        if self.offline:
+            CACHE_LOOKUPS.inc(provider=key[0], outcome="offline_miss")
+            raise OfflineCacheMiss(f"no cached response for {'/'.join(key)}")
+        payload = loader()
+        self.put(key, payload)
+        return payload
+
+    async def afetch(self, key: CacheKey, interval: str, loader: Callable[[], Awaitable[bytes]]) -> bytes:
+        """
+        Async fetch(): disk I/O runs in a worker thread, and concurrent misses
+        for the same key share one loader call.
+        """
+        key_hash = self._key_hash(key)
+        while (pending := self._inflight.get(key_hash)) is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The owning fetch was cancelled (e.g. a losing hedge); take over.
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key_hash] = fut
+        try:
+            payload = await asyncio.to_thread(self.get, key, interval)
+            if payload is None:
+                if self.offline:
+                    CACHE_LOOKUPS.inc(provider=key[0], outcome="offline_miss")
+                    raise OfflineCacheMiss(f"no cached response for {'/'.join(key)}")
+                payload = await loader()
+                await asyncio.to_thread(self.put, key, payload)
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except BaseException as exc:
+            fut.set_exception(exc)
+            fut.exception()  # retrieved; nobody may be waiting
+            raise
+        else:
+            fut.set_result(payload)
+            return payload
+        finally:
+            del self._inflight[key_hash]
+
+
+def encode_rows(rows: List[OHLCVRow]) -> bytes:
+    """
+    Rows as compact JSON, for providers whose raw response stays inside a client library.
+    """
+    return json.dumps([[d.isoformat(), *rest] for d, *rest in rows], separators=(",", ":")).encode()
+
+
+def decode_rows(payload: bytes) -> List[OHLCVRow]:
+    return [(date.fromisoformat(d), o, h, l, c, v) for d, o, h, l, c, v in json.loads(payload)]
+
+
+CACHE_MODE = os.environ.get("CHRONOS_PROVIDER_CACHE", "on")
+CACHE_DIR = os.environ.get(
+    "CHRONOS_PROVIDER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "chronos-provider-cache")
+)
+CACHE_MAX_MB = int(os.environ.get("CHRONOS_PROVIDER_CACHE_MB", "256"))
+
+_default: Optional[ResponseCache] = None
+
+
+def default_cache() -> Optional[ResponseCache]:
+    """
+    The process-wide cache configured from the environment; None when off.
+    """
+    global _default
+    if CACHE_MODE == "off":
+        return None
+    if _default is None:
+        _default = ResponseCache(CACHE_DIR, max_bytes=CACHE_MAX_MB * 1024 * 1024, offline=CACHE_MODE == "offline")
+    return _default
@@ -0,0 +1,106 @@
+"""
+Tiered retention for stored bars.
+
+Bars older than their interval's hot window move out of stock_ohlcv into
+the compressed per-year chunks of stock_ohlcv_archive (services.archive).
+load_bar_series and list_ohlcv_rows merge the archive back in, so readers
+still see one series, while the hot table and its primary-key index stay
+bounded by the window instead of growing with history.
+
+Windows come from CHRONOS_RETENTION_DAYS ("1d=730,1wk=3650"); intervals
+not listed are kept hot indefinitely. RetentionWorker runs the pass from the
+app lifespan every CHRONOS_RETENTION_EVERY_H hours (CHRONOS_RETENTION=0
+disables it).
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from db import AsyncSessionLocal
+from models import StockOHLCV
+from services.metrics import Counter
+
+
+logger = logging.getLogger("chronos.retention")
+
+
+def _parse_hot_days(raw: str) -> Dict[str, int]:
+    out: Dict[str, int] = {}
+    for item in filter(None, (part.strip() for part in raw.split(","))):
+        interval, _, days = item.partition("=")
+        out[interval.strip()] = int(days)
+    return out
+
+
+RETENTION_ENABLED = os.environ.get("CHRONOS_RETENTION", "1") == "1"
+HOT_DAYS: Dict[str, int] = _parse_hot_days(os.environ.get("CHRONOS_RETENTION_DAYS", "1d=730"))
+RETENTION_EVERY = timedelta(hours=float(os.environ.get("CHRONOS_RETENTION_EVERY_H", "6")))
+
+RETENTION_ARCHIVED = Counter(
+    "chronos_retention_archived_total", "Bars moved from stock_ohlcv to the archive.", ("interval",)
+)
+
+
+async def run_retention(
+    today: Optional[date] = None,
+    *,
+    hot_days: Optional[Dict[str, int]] = None,
+    sessions: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+) -> int:
+    """
+    One pass over every series with bars outside its hot window; each
+    series is archived and committed in its own transaction. Returns the
+    number of bars moved.
+    """
+    from services.archive import archive_series
+
+    today = today or datetime.now(timezone.utc).date()
+    moved = 0
+    for interval, days in (HOT_DAYS if hot_days is None else hot_days).items():
+        before = today - timedelta(days=days)
+        async with sessions() as session:
+            res = await session.execute(
+                select(StockOHLCV.stock_id, StockOHLCV.provider)
+                .where(StockOHLCV.interval == interval, StockOHLCV.as_of < before)
+                .group_by(StockOHLCV.stock_id, StockOHLCV.provider)
+            )
+            series = res.all()
+        for stock_id, provider in series:
+            async with sessions() as session:
+                n = await archive_series(
+                    session, stock_id=stock_id, provider=provider, interval=interval, before=before
+                )
+                await session.commit()
+            moved += n
+            RETENTION_ARCHIVED.inc(n, interval=interval)
+    return moved
+
+
+class RetentionWorker:
+    def __init__(self, *, every: timedelta = RETENTION_EVERY) -> None:
+        self.every = every
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="retention")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                moved = await run_retention()
+                if moved:
+                    logger.info("retention archived %d bars", moved)
+            except Exception:
+                logger.exception("retention pass failed")
+            await asyncio.sleep(self.every.total_seconds())
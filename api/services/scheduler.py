@@ -0,0 +1,180 @@
+"""
+In-process refresh scheduler, started from the app lifespan.
+
+Every tracked series (a stock_price_cache row) has checkpoints derived from
+the NYSE calendar: daily-or-finer bars every CHRONOS_SCHEDULER_INTRADAY_MIN
+minutes while the market is open, and every interval once the close has
+settled. A series is due when its last_fetched_at predates the latest
+checkpoint, so fresh series (including ones a client just refreshed) cost
+nothing, and weekends and holidays schedule no work.
+
+Due series are started in batches of at most `batch_size` per tick, spread
+over `spread` seconds with jitter, and at most `concurrency` run at once,
+so the open does not turn into one burst against the provider.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import select
+
+from db import AsyncSessionLocal
+from models import CacheStatus, Stock, StockPriceCache
+from services.market_calendar import NY, previous_trading_day, session_bounds
+from services.metrics import Counter, Gauge
+from services.refresh_prices import refresh_stock_prices_background
+
+
+logger = logging.getLogger("chronos.scheduler")
+
+SCHEDULER_ENABLED = os.environ.get("CHRONOS_SCHEDULER", "1") == "1"
+INTRADAY_EVERY = timedelta(minutes=int(os.environ.get("CHRONOS_SCHEDULER_INTRADAY_MIN", "15")))
+# Give the provider time to publish the final bar after the bell.
+CLOSE_SETTLE = timedelta(minutes=20)
+# A 'fetching' row older than this is assumed abandoned (e.g. a restart).
+STUCK_AFTER = timedelta(minutes=10)
+
+# Intervals whose latest bar moves during the session; coarser bars are
+# refreshed once per day after the close.
+INTRADAY_INTERVALS = frozenset({"1m", "5m", "15m", "30m", "1h", "1d", "5d"})
+
+SCHEDULER_TICKS = Counter("chronos_scheduler_ticks_total", "Scheduler passes over the tracked series.")
+SCHEDULER_DUE = Gauge("chronos_scheduler_due_series", "Series due for a refresh at the last tick.")
+SCHEDULER_STARTED = Counter(
+    "chronos_scheduler_refreshes_total", "Refreshes started by the scheduler.", ("interval",)
+)
+
+
+def last_checkpoint(interval: str, now: datetime) -> datetime:
+    """
+    The most recent time at or before `now` by which a series of `interval`
+    should have been refreshed.
+    """
+    local = now.astimezone(NY)
+    day = local.date()
+    bounds = session_bounds(day)
+    if bounds is not None:
+        open_, close = bounds
+        if interval in INTRADAY_INTERVALS and open_ < local < close + CLOSE_SETTLE:
+            # No checkpoint at the bell itself: the opening prints add little
+            # over last night's close and would make every series due at once.
+            steps = (min(local, close) - open_) // INTRADAY_EVERY
+            if steps:
+                return open_ + steps * INTRADAY_EVERY
+        elif local >= close + CLOSE_SETTLE:
+            return close + CLOSE_SETTLE
+    _, close = session_bounds(previous_trading_day(day))
+    return close + CLOSE_SETTLE
+
+
+@dataclass(frozen=True, slots=True)
+class TrackedSeries:
+    ticker: str
+    provider: str
+    interval: str
+    last_fetched_at: Optional[datetime]
+    status: CacheStatus
+
+
+def is_due(series: TrackedSeries, now: datetime) -> bool:
+    if series.last_fetched_at is None:
+        return True
+    if series.status == CacheStatus.fetching and now - series.last_fetched_at < STUCK_AFTER:
+        return False
+    return series.last_fetched_at < last_checkpoint(series.interval, now)
+
+
+async def load_tracked_series() -> List[TrackedSeries]:
+    async with AsyncSessionLocal() as session:
+        res = await session.execute(
+            select(
+                Stock.ticker,
+                StockPriceCache.provider,
+                StockPriceCache.interval,
+                StockPriceCache.last_fetched_at,
+                StockPriceCache.status,
+            ).join(Stock, Stock.id == StockPriceCache.stock_id)
+        )
+        return [TrackedSeries(*row) for row in res.all()]
+
+
+class RefreshScheduler:
+    def __init__(
+        self,
+        *,
+        tick: float = 60.0,
+        batch_size: int = 50,
+        spread: float = 30.0,
+        concurrency: int = 4,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.tick = tick
+        self.batch_size = batch_size
+        self.spread = spread
+        self._sem = asyncio.Semaphore(concurrency)
+        self._rng = rng or random.Random()
+        self._inflight: set[tuple[str, str, str]] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._loop_task = asyncio.create_task(self._run(), name="refresh-scheduler")
+
+    async def stop(self) -> None:
+        tasks = [t for t in (self._loop_task, *self._tasks) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("scheduler tick failed")
+            await asyncio.sleep(self.tick)
+
+    async def run_once(self, now: Optional[datetime] = None) -> List[TrackedSeries]:
+        """
+        Start refreshes for the series due now; returns the ones started.
+        """
+        now = now or datetime.now(timezone.utc)
+        SCHEDULER_TICKS.inc()
+        due = [
+            s for s in await load_tracked_series()
+            if (s.ticker, s.provider, s.interval) not in self._inflight and is_due(s, now)
+        ]
+        SCHEDULER_DUE.set(len(due))
+        # Never-fetched and most overdue first.
+        epoch = datetime.min.replace(tzinfo=timezone.utc)
+        due.sort(key=lambda s: s.last_fetched_at or epoch)
+        batch = due[: self.batch_size]
+        slot = self.spread / max(len(batch), 1)
+        for i, series in enumerate(batch):
+            delay = i * slot + self._rng.uniform(0, slot)
+            self._start(series, delay)
+        return batch
+
+    def _start(self, series: TrackedSeries, delay: float) -> None:
+        key = (series.ticker, series.provider, series.interval)
+        self._inflight.add(key)
+        SCHEDULER_STARTED.inc(interval=series.interval)
+
+        async def job() -> None:
+            try:
+                await asyncio.sleep(delay)
+                async with self._sem:
+                    await refresh_stock_prices_background(
+                        ticker=series.ticker, provider=series.provider, interval=series.interval
+                    )
+            finally:
+                self._inflight.discard(key)
+
+        task = asyncio.create_task(job())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -1,10 +1,44 @@
 from __future__ import annotations
+from datetime import date
+from typing import TYPE_CHECKING, Iterable, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ohlcv import list_ohlcv_rows
-from services.ta.signals import upsert_signals
-from services.ta.registry import get_ta_provider
+from ohlcv import bar_day_before, load_bar_series
+from services.metrics import stage
+from services.ta.signals import SignalRow, upsert_signals
+from services.ta.registry import ColumnarTAProvider, get_ta_provider
+
+if TYPE_CHECKING:
+    from series import BarSeries
+    from services.ta.graph import IndicatorSpec
+
+
+async def _load_window(
+        session: AsyncSession,
+        *,
+        stock_id: int,
+        provider: str,
+        interval: str,
+        since: Optional[date],
+        warmup: Optional[int],
+) -> BarSeries:
+    """
+    Stored bars starting `warmup` bars before `since`; the whole series
+    when either is None or the history is shorter than that.
+    """
+    from series import to_epoch_days
+
+    first_day = None
+    if since is not None and warmup is not None:
+        start = await bar_day_before(
+            session, stock_id=stock_id, provider=provider, interval=interval, day=since, bars=warmup
+        )
+        if start is not None:
+            first_day = int(to_epoch_days([start])[0])
+    return await load_bar_series(
+        session, stock_id=stock_id, provider=provider, interval=interval, first_day=first_day
+    )
 
 
 async def compute_and_upsert_signals(
@@ -14,16 +48,36 @@ async def compute_and_upsert_signals(
         provider: str,
         interval: str,
         ta_provider: str = "pandas_ta",
+        since: Optional[date] = None,
+        changed: Optional[list[SignalRow]] = None,
 ) -> int:
-    rows = await list_ohlcv_rows(
-        session, stock_id=stock_id, provider=provider, interval=interval
+    """
+    Recompute signals and upsert the ones that changed. With `since`, only
+    signals dated on or after it are recomputed, from a window that starts
+    the provider's `warmup` bars earlier (the whole series if it declares none).
+    """
+    impl = get_ta_provider(ta_provider)
+    bars = await _load_window(
+        session,
+        stock_id=stock_id,
+        provider=provider,
+        interval=interval,
+        since=since,
+        warmup=getattr(impl, "warmup", None),
     )
-    if not rows:
+    if not len(bars):
         return 0
 
-    impl = get_ta_provider(ta_provider)
-    signal_rows = impl.compute_signals(rows)
-    if not signal_rows:
+    with stage("compute_signals"):
+        if isinstance(impl, ColumnarTAProvider):
+            signals = impl.compute_signal_series(bars)
+            if since is not None:
+                signals = signals.take(signals.days >= _epoch_day(since))
+        else:
+            signals = impl.compute_signals(bars.to_rows())
+            if since is not None:
+                signals = [row for row in signals if row[0] >= since]
+    if not len(signals):
         return 0
 
     return await upsert_signals(
@@ -31,5 +85,47 @@ async def compute_and_upsert_signals(
         stock_id=stock_id,
         provider=provider,
         interval=interval,
-        rows=signal_rows,
+        rows=signals,
+        changed=changed,
     )
+
+
+async def compute_and_store_indicators(
+        session: AsyncSession,
+        *,
+        stock_id: int,
+        provider: str,
+        interval: str,
+        specs: Iterable[IndicatorSpec],
+) -> int:
+    """
+    Compute arbitrary indicator specs from stored bars and write them to the
+    long-format store (stock_indicator_series), keyed by IndicatorSpec.key.
+    """
+    from series import to_dates
+    from services.ta.graph import compute_indicators
+    from services.ta.store import write_indicator_arrays
+
+    bars = await load_bar_series(
+        session, stock_id=stock_id, provider=provider, interval=interval
+    )
+    if not len(bars):
+        return 0
+
+    dates = to_dates(bars.days)
+    values = compute_indicators({"close": bars.close}, list(specs))
+
+    return await write_indicator_arrays(
+        session,
+        stock_id=stock_id,
+        provider=provider,
+        interval=interval,
+        dates=dates,
+        values={spec.key: arr for spec, arr in values.items()},
+    )
+
+
+def _epoch_day(d: date) -> int:
+    from series import to_epoch_days
+
+    return int(to_epoch_days([d])[0])
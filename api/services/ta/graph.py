@@ -0,0 +1,340 @@
+from __future__ import annotations
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Iterable, Mapping, Union
+
+import numpy as np
+
+
+Input = Union["IndicatorSpec", str]
+
+
+@dataclass(frozen=True, slots=True)
+class IndicatorSpec:
+    """
+    One indicator at concrete parameters, e.g. ema(length=20).
+    Params are stored in the definition's declared order so equal specs hash equally.
+    """
+    name: str
+    params: tuple[tuple[str, Any], ...] = ()
+
+    @classmethod
+    def of(cls, name: str, **params: Any) -> "IndicatorSpec":
+        definition = get_indicator(name)
+        unknown = set(params) - set(definition.defaults)
+        if unknown:
+            raise ValueError(f"unknown params for {name!r}: {sorted(unknown)}")
+        merged = {**definition.defaults, **params}
+        return cls(name, tuple((k, merged[k]) for k in definition.defaults))
+
+    @property
+    def kwargs(self) -> dict[str, Any]:
+        return dict(self.params)
+
+    @property
+    def key(self) -> str:
+        """
+        Stable column-style id, e.g. "ema_20", "macd_12_26_9", "bb_upper_20_2.0".
+        """
+        return "_".join([self.name, *(str(v) for _, v in self.params)])
+
+
+@dataclass(frozen=True, slots=True)
+class IndicatorDef:
+    name: str
+    defaults: dict[str, Any]
+    inputs: Callable[..., list[Input]]
+    compute: Callable[..., np.ndarray]
+    warmup: Callable[..., int]
+
+
+_REGISTRY: dict[str, IndicatorDef] = {}
+
+
+def register_indicator(
+    name: str,
+    *,
+    defaults: dict[str, Any],
+    inputs: Callable[..., list[Input]],
+    compute: Callable[..., np.ndarray],
+    warmup: Callable[..., int],
+) -> None:
+    """
+    Register an indicator node.
+
+    `inputs(**params)` names the base columns ("close", ...) or other specs it
+    consumes; `compute(*input_arrays, **params)` receives them in that order.
+    `warmup(**params)` is the number of leading bars needed before values settle.
+    """
+    _REGISTRY[name] = IndicatorDef(name, defaults, inputs, compute, warmup)
+
+
+def get_indicator(name: str) -> IndicatorDef:
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"unknown indicator: {name!r}. Registered: {sorted(_REGISTRY)}")
+
+
+class IndicatorCache:
+    """
+    LRU of computed arrays keyed by (series version, indicator spec).
+    Thread-safe: batch feature stages compute from worker threads.
+    """
+
+    def __init__(self, maxsize: int = 512) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[tuple[Hashable, IndicatorSpec], np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, version: Hashable, spec: IndicatorSpec) -> np.ndarray | None:
+        key = (version, spec)
+        with self._lock:
+            arr = self._data.get(key)
+            if arr is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return arr
+
+    def put(self, version: Hashable, spec: IndicatorSpec, arr: np.ndarray) -> None:
+        arr.flags.writeable = False
+        with self._lock:
+            self._data[(version, spec)] = arr
+            self._data.move_to_end((version, spec))
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+INDICATOR_CACHE = IndicatorCache()
+
+
+def series_version(columns: Mapping[str, np.ndarray]) -> str:
+    """
+    Content digest of the base columns; used as the series version when the
+    caller has no stored version counter to offer.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for name in sorted(columns):
+        h.update(name.encode())
+        h.update(np.ascontiguousarray(columns[name], dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def compute_indicators(
+    columns: Mapping[str, np.ndarray],
+    specs: Iterable[IndicatorSpec],
+    *,
+    version: Hashable | None = None,
+    cache: IndicatorCache | None = INDICATOR_CACHE,
+) -> dict[IndicatorSpec, np.ndarray]:
+    """
+    Evaluate the requested specs over one series of 1-D base columns.
+
+    Dependencies are resolved depth-first and every node is computed at most
+    once per call, so macd and ema(12) share the same EMA, and bb_upper,
+    bb_lower and sma(20) share one rolling mean. With a cache, nodes are
+    also reused across calls for the same series version.
+    """
+    if cache is not None and version is None:
+        version = series_version(columns)
+
+    memo: dict[IndicatorSpec, np.ndarray] = {}
+    visiting: set[IndicatorSpec] = set()
+
+    def resolve(node: Input) -> np.ndarray:
+        if isinstance(node, str):
+            try:
+                return np.asarray(columns[node], dtype=np.float64)
+            except KeyError:
+                raise ValueError(f"missing base column: {node!r}")
+        if node in memo:
+            return memo[node]
+        if cache is not None:
+            hit = cache.get(version, node)
+            if hit is not None:
+                memo[node] = hit
+                return hit
+        if node in visiting:
+            raise ValueError(f"indicator cycle at {node.key}")
+        visiting.add(node)
+
+        definition = get_indicator(node.name)
+        kwargs = node.kwargs
+        args = [resolve(dep) for dep in definition.inputs(**kwargs)]
+        out = np.asarray(definition.compute(*args, **kwargs), dtype=np.float64)
+
+        visiting.discard(node)
+        memo[node] = out
+        if cache is not None:
+            cache.put(version, node, out)
+        return out
+
+    return {spec: resolve(spec) for spec in specs}
+
+
+def warmup_bars(specs: Iterable[IndicatorSpec]) -> int:
+    """
+    Longest warm-up over the specs and everything they depend on.
+    """
+    best = 0
+    stack: list[Input] = list(specs)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            continue
+        definition = get_indicator(node.name)
+        best = max(best, definition.warmup(**node.kwargs))
+        stack.extend(definition.inputs(**node.kwargs))
+    return best
+
+
+def parse_indicator_requests(raw: object) -> dict[str, IndicatorSpec]:
+    """
+    Read a template's "indicators" block: {field: {"name": ..., **params}}.
+    The indicator name defaults to the field name.
+    """
+    if raw is None:
+        return {}
+    if not isinstance(raw, dict):
+        raise ValueError("indicators must be an object")
+    out: dict[str, IndicatorSpec] = {}
+    for field, body in raw.items():
+        if not isinstance(body, dict):
+            raise ValueError(f"indicators.{field} must be an object")
+        params = dict(body)
+        name = params.pop("name", field)
+        out[field] = IndicatorSpec.of(name, **params)
+    return out
+
+
+# -- built-in nodes ----
+# pandas is imported inside the nodes: it is only needed once something is computed.
+
+
+def _sma(x: np.ndarray, *, length: int) -> np.ndarray:
+    import pandas as pd
+    return pd.Series(x).rolling(length, min_periods=length).mean().to_numpy()
+
+
+def _stdev(x: np.ndarray, *, length: int, ddof: int) -> np.ndarray:
+    import pandas as pd
+    return pd.Series(x).rolling(length, min_periods=length).std(ddof=ddof).to_numpy()
+
+
+def _ema(x: np.ndarray, *, length: int) -> np.ndarray:
+    """
+    EMA seeded with the SMA of the first `length` valid values (TA-Lib style),
+    matching pandas_ta.ema defaults.
+    """
+    import pandas as pd
+    out = np.full(x.shape, np.nan)
+    valid = np.flatnonzero(~np.isnan(x))
+    if valid.size < length:
+        return out
+    start = valid[0]
+    seeded = x[start:].copy()
+    seeded[length - 1] = seeded[:length].mean()
+    seeded[: length - 1] = np.nan
+    out[start:] = pd.Series(seeded).ewm(span=length, adjust=False).mean().to_numpy()
+    return out
+
+
+def _rsi(x: np.ndarray, *, length: int) -> np.ndarray:
+    import pandas as pd
+    if x.size < length + 1:
+        return np.full(x.shape, np.nan)
+    delta = np.diff(x, prepend=np.nan)
+    gain = pd.Series(np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0)))
+    loss = pd.Series(np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0)))
+    alpha = 1.0 / length
+    avg_gain = gain.ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    avg_loss = loss.ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 100.0 * avg_gain / (avg_gain + avg_loss)
+
+
+register_indicator(
+    "sma",
+    defaults={"length": 20},
+    inputs=lambda length: ["close"],
+    compute=lambda close, length: _sma(close, length=length),
+    warmup=lambda length: length - 1,
+)
+register_indicator(
+    "stdev",
+    defaults={"length": 20, "ddof": 1},
+    inputs=lambda length, ddof: ["close"],
+    compute=lambda close, length, ddof: _stdev(close, length=length, ddof=ddof),
+    warmup=lambda length, ddof: length - 1,
+)
+# Recursive smoothers never fully forget their seed; 20x length puts the
+# residual below ~1e-8 for EMA and ~2e-9 for Wilder smoothing.
+register_indicator(
+    "ema",
+    defaults={"length": 20},
+    inputs=lambda length: ["close"],
+    compute=lambda close, length: _ema(close, length=length),
+    warmup=lambda length: 20 * length,
+)
+register_indicator(
+    "rsi",
+    defaults={"length": 14},
+    inputs=lambda length: ["close"],
+    compute=lambda close, length: _rsi(close, length=length),
+    warmup=lambda length: 20 * length,
+)
+register_indicator(
+    "macd",
+    defaults={"fast": 12, "slow": 26, "signal": 9},
+    inputs=lambda fast, slow, signal: [IndicatorSpec.of("ema", length=fast), IndicatorSpec.of("ema", length=slow)],
+    compute=lambda fast_ema, slow_ema, fast, slow, signal: fast_ema - slow_ema,
+    warmup=lambda fast, slow, signal: 20 * slow,
+)
+register_indicator(
+    "macd_signal",
+    defaults={"fast": 12, "slow": 26, "signal": 9},
+    inputs=lambda fast, slow, signal: [IndicatorSpec.of("macd", fast=fast, slow=slow, signal=signal)],
+    compute=lambda line, fast, slow, signal: _ema(line, length=signal),
+    warmup=lambda fast, slow, signal: 20 * (slow + signal),
+)
+register_indicator(
+    "macd_hist",
+    defaults={"fast": 12, "slow": 26, "signal": 9},
+    inputs=lambda fast, slow, signal: [
+        IndicatorSpec.of("macd", fast=fast, slow=slow, signal=signal),
+        IndicatorSpec.of("macd_signal", fast=fast, slow=slow, signal=signal),
+    ],
+    compute=lambda line, sig, fast, slow, signal: line - sig,
+    warmup=lambda fast, slow, signal: 20 * (slow + signal),
+)
+register_indicator(
+    "bb_mid",
+    defaults={"length": 20},
+    inputs=lambda length: [IndicatorSpec.of("sma", length=length)],
+    compute=lambda mid, length: mid,
+    warmup=lambda length: length - 1,
+)
+register_indicator(
+    "bb_upper",
+    defaults={"length": 20, "std": 2.0},
+    inputs=lambda length, std: [IndicatorSpec.of("sma", length=length), IndicatorSpec.of("stdev", length=length)],
+    compute=lambda mid, dev, length, std: mid + std * dev,
+    warmup=lambda length, std: length - 1,
+)
+register_indicator(
+    "bb_lower",
+    defaults={"length": 20, "std": 2.0},
+    inputs=lambda length, std: [IndicatorSpec.of("sma", length=length), IndicatorSpec.of("stdev", length=length)],
+    compute=lambda mid, dev, length, std: mid - std * dev,
+    warmup=lambda length, std: length - 1,
+)
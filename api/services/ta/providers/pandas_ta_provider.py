@@ -1,87 +1,62 @@
 from __future__ import annotations
 
-from datetime import date, datetime
-from typing import Optional
-
-import pandas as pd
-import pandas_ta as ta
+import numpy as np
 
 from ohlcv import OHLCVRow
+from series import BarSeries, SignalSeries
+from services.ta.graph import IndicatorSpec, compute_indicators, warmup_bars
 from services.ta.signals import SignalRow
 from services.ta.registry import register_ta_provider
 
 
-def _to_float(value: Optional[float]) -> Optional[float]:
-    if value is None or pd.isna(value):
-        return None
-    return float(value)
-
-
-def _to_date(value: object) -> date:
-    if isinstance(value, pd.Timestamp):
-        return value.date()
-    if isinstance(value, datetime):
-        return value.date()
-    if isinstance(value, date):
-        return value
-    return date.fromisoformat(str(value))
+# Order matches the StockSignal columns / SignalRow layout.
+SIGNAL_SPECS: tuple[IndicatorSpec, ...] = (
+    IndicatorSpec.of("rsi", length=14),
+    IndicatorSpec.of("macd", fast=12, slow=26, signal=9),
+    IndicatorSpec.of("macd_signal", fast=12, slow=26, signal=9),
+    IndicatorSpec.of("ema", length=20),
+    IndicatorSpec.of("ema", length=50),
+    IndicatorSpec.of("bb_upper", length=20, std=2.0),
+    IndicatorSpec.of("bb_lower", length=20, std=2.0),
+)
 
 
 class PandasTAProvider:
+    """
+    Computes the fixed StockSignal column set through the indicator graph,
+    so MACD shares its EMAs and both Bollinger bands share one SMA/stdev.
+    Values match pandas_ta defaults.
+    """
     name = "pandas_ta"
+    warmup = warmup_bars(SIGNAL_SPECS)
+
+    def compute_signal_series(self, bars: BarSeries) -> SignalSeries:
+        if not len(bars):
+            return SignalSeries.empty()
+        matrix, keep = _signal_matrix(bars.close)
+        return SignalSeries(bars.days[keep], matrix[keep])
 
     def compute_signals(self, rows: list[OHLCVRow]) -> list[SignalRow]:
         if not rows:
             return []
 
-        df = pd.DataFrame(
-            rows, columns=["date", "open", "high", "low", "close", "volume"]
-        ).set_index("date").sort_index()
-
-        close = df["close"]
-
-        df["rsi"] = ta.rsi(close, length=14)
-
-        macd = ta.macd(close)
-        if macd is not None and not macd.empty:
-            df["macd"] = macd.iloc[:, 0]
-            df["macd_signal"] = macd.iloc[:, 1]
-        else:
-            df["macd"] = None
-            df["macd_signal"] = None
-
-        df["ema_20"] = ta.ema(close, length=20)
-        df["ema_50"] = ta.ema(close, length=50)
-
-        bb = ta.bbands(close, length=20, std=2.0)  # type: ignore[arg-type]
-        if bb is not None and not bb.empty:
-            df["bb_lower"] = bb.iloc[:, 0]
-            df["bb_upper"] = bb.iloc[:, 2]
-        else:
-            df["bb_lower"] = None
-            df["bb_upper"] = None
+        ordered = sorted(rows, key=lambda r: r[0])
+        close = np.fromiter((r[4] for r in ordered), dtype=np.float64, count=len(ordered))
+        matrix, keep = _signal_matrix(close)
 
-        required = ["rsi", "macd", "macd_signal", "ema_20", "ema_50", "bb_upper", "bb_lower"]
-        signal_rows: list[SignalRow] = []
+        return [
+            (ordered[i][0], *row)
+            for i, row in zip(keep.tolist(), matrix[keep].tolist())
+        ]
 
-        for idx, row in df.iterrows():
-            if any(pd.isna(row[col]) for col in required):
-                continue
-            as_of: date = _to_date(idx)
-            signal_rows.append(
-                (
-                    as_of,
-                    _to_float(row["rsi"]),
-                    _to_float(row["macd"]),
-                    _to_float(row["macd_signal"]),
-                    _to_float(row["ema_20"]),
-                    _to_float(row["ema_50"]),
-                    _to_float(row["bb_upper"]),
-                    _to_float(row["bb_lower"]),
-                )
-            )
 
-        return signal_rows
+def _signal_matrix(close: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (n, len(SIGNAL_SPECS)) values and the indices of rows with every value defined.
+    """
+    values = compute_indicators({"close": close}, SIGNAL_SPECS)
+    matrix = np.column_stack([values[spec] for spec in SIGNAL_SPECS])
+    return matrix, np.flatnonzero(~np.isnan(matrix).any(axis=1))
 
 
 register_ta_provider(PandasTAProvider())
@@ -1,18 +1,31 @@
 from __future__ import annotations
-from typing import Protocol, Dict, runtime_checkable
+import importlib
+from typing import TYPE_CHECKING, Protocol, Dict, runtime_checkable
 
 from ohlcv import OHLCVRow
 from services.ta.signals import SignalRow
 
+if TYPE_CHECKING:
+    from series import BarSeries, SignalSeries
+
 
 _BUILTINS_LOADED = False
 _REGISTRY: Dict[str, "TAProvider"] = {}
 
+# Built-in provider name -> module that registers it, imported on first use.
+_BUILTIN_MODULES: Dict[str, str] = {
+    "pandas_ta": "services.ta.providers.pandas_ta_provider",
+}
+
 
 @runtime_checkable
 class TAProvider(Protocol):
     name: str
 
+    # Providers may also set `warmup: int`, the bars needed before their
+    # values settle; incremental recomputes (compute_and_upsert_signals with
+    # `since`) then start that far back instead of at the first bar.
+
     def compute_signals(self, rows: list[OHLCVRow]) -> list[SignalRow]:
         """
         Return signal rows computed from OHLCV input.
@@ -20,6 +33,18 @@ class TAProvider(Protocol):
         ...
 
 
+@runtime_checkable
+class ColumnarTAProvider(Protocol):
+    """
+    Optional extension: compute straight from a BarSeries. The refresh path
+    uses it when present and never builds row tuples.
+    """
+    name: str
+
+    def compute_signal_series(self, bars: BarSeries) -> SignalSeries:
+        ...
+
+
 def register_ta_provider(provider: TAProvider) -> None:
     _REGISTRY[provider.name] = provider
 
@@ -30,14 +55,17 @@ def _ensure_builtins_loaded() -> None:
         return
 
     # Import default providers for side effects (register_ta_provider)
-    from services.ta.providers import pandas_ta_provider  # noqa: F401
+    for module in _BUILTIN_MODULES.values():
+        importlib.import_module(module)
 
     _BUILTINS_LOADED = True
 
 
 def get_ta_provider(name: str) -> TAProvider:
-    _ensure_builtins_loaded()
+    if name not in _REGISTRY and name in _BUILTIN_MODULES:
+        importlib.import_module(_BUILTIN_MODULES[name])
     try:
         return _REGISTRY[name]
     except KeyError:
+        _ensure_builtins_loaded()
         raise ValueError(f"unknown TA provider: {name!r}. Registered: {list(_REGISTRY)}")
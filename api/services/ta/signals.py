@@ -1,10 +1,15 @@
 from __future__ import annotations
 from datetime import date
-from typing import Iterable, Optional
+from typing import TYPE_CHECKING, Iterable, Optional
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from db import upsert_statement
 from models import StockSignal
+from services.metrics import timed
+
+if TYPE_CHECKING:
+    from series import SignalSeries
 
 
 SignalRow = tuple[
@@ -18,66 +23,81 @@ SignalRow = tuple[
     Optional[float],
 ]
 
+@timed("upsert_signals")
 async def upsert_signals(
     session: AsyncSession,
     *,
     stock_id: int,
     provider: str,
     interval: str,
-    rows: Iterable[SignalRow],
+    rows: Iterable[SignalRow] | SignalSeries,
+    changed: list[SignalRow] | None = None,
 ) -> int:
     """
     Insert or update signal rows for one (stock, provider, interval).
-    Returns the number of rows written or updated.
+    Returns the number of rows given; only rows that are new or differ from
+    what is stored are written, and those are appended to `changed` when given.
     """
+    import numpy as np
+
+    from series import SIGNAL_COLUMNS, SignalSeries
+
+    signals = rows if isinstance(rows, SignalSeries) else SignalSeries.from_rows(list(rows))
+    if not len(signals):
+        return 0
+
+    stored = await load_signal_series(
+        session,
+        stock_id=stock_id,
+        provider=provider,
+        interval=interval,
+        first_day=int(signals.days[0]),
+        last_day=int(signals.days[-1]),
+    )
+    dirty = np.ones(len(signals), dtype=bool)
+    if len(stored):
+        pos = np.minimum(np.searchsorted(stored.days, signals.days), len(stored) - 1)
+        old = stored.values[pos]
+        same = (old == signals.values) | (np.isnan(old) & np.isnan(signals.values))
+        dirty = ~((stored.days[pos] == signals.days) & same.all(axis=1))
 
-    written = 0
-    for (
-        as_of,
-        rsi,
-        macd,
-        macd_signal,
-        ema_20,
-        ema_50,
-        bb_upper,
-        bb_lower, 
-    ) in rows:
-        stmt = select(StockSignal).where(
-            StockSignal.stock_id == stock_id,
-            StockSignal.provider == provider,
-            StockSignal.interval == interval,
-            StockSignal.as_of == as_of,
+    index = np.flatnonzero(dirty)
+    if index.size:
+        written = signals.take(index).to_rows()
+        await session.execute(
+            upsert_statement(session, StockSignal.__table__, update=SIGNAL_COLUMNS),
+            [
+                {
+                    "stock_id": stock_id,
+                    "provider": provider,
+                    "interval": interval,
+                    "as_of": row[0],
+                    **dict(zip(SIGNAL_COLUMNS, row[1:])),
+                }
+                for row in written
+            ],
         )
-        result = await session.execute(stmt)
-        existing = result.scalar_one_or_none()
-
-        if existing is None:
-            rec = StockSignal(
-                stock_id=stock_id,
-                as_of=as_of,
-                provider=provider,
-                interval=interval,
-                rsi=rsi,
-                macd=macd,
-                macd_signal=macd_signal,
-                ema_20=ema_20,
-                ema_50=ema_50,
-                bb_upper=bb_upper,
-                bb_lower=bb_lower,
-            )
-            session.add(rec)
-        else:
-            existing.rsi = rsi
-            existing.macd = macd
-            existing.macd_signal = macd_signal
-            existing.ema_20 = ema_20
-            existing.ema_50 = ema_50
-            existing.bb_upper = bb_upper
-            existing.bb_lower = bb_lower
-
-        written += 1
-
-    return written
+        if changed is not None:
+            changed.extend(written)
+
+    return len(signals)
+
+
+def _signal_select(stock_id: int, provider: str, interval: str):
+    return select(
+        StockSignal.as_of,
+        StockSignal.rsi,
+        StockSignal.macd,
+        StockSignal.macd_signal,
+        StockSignal.ema_20,
+        StockSignal.ema_50,
+        StockSignal.bb_upper,
+        StockSignal.bb_lower,
+    ).where(
+        StockSignal.stock_id == stock_id,
+        StockSignal.provider == provider,
+        StockSignal.interval == interval,
+    )
 
 
 async def list_signal_rows(
@@ -92,11 +112,7 @@ async def list_signal_rows(
     """
     Read signal rows for one (stock, provider, interval).
     """
-    stmt = select(StockSignal).where(
-        StockSignal.stock_id == stock_id,
-        StockSignal.provider == provider,
-        StockSignal.interval == interval,
-    )
+    stmt = _signal_select(stock_id, provider, interval)
 
     if order_desc:
         stmt = stmt.order_by(StockSignal.as_of.desc())
@@ -107,22 +123,42 @@ async def list_signal_rows(
         stmt = stmt.limit(limit)
 
     result = await session.execute(stmt)
-    rows: list[SignalRow] = []
-    for rec in result.scalars().all():
-        rows.append(
-            (
-                rec.as_of,
-                rec.rsi,
-                rec.macd,
-                rec.macd_signal,
-                rec.ema_20,
-                rec.ema_50,
-                rec.bb_upper,
-                rec.bb_lower,
-            )
-        )
+    rows: list[SignalRow] = [tuple(r) for r in result.all()]
 
     if order_desc and limit is not None:
         rows.reverse()
 
     return rows
+
+
+async def load_signal_series(
+    session: AsyncSession,
+    *,
+    stock_id: int,
+    provider: str,
+    interval: str,
+    first_day: int | None = None,
+    last_day: int | None = None,
+) -> SignalSeries:
+    """
+    Stored signals for one (stock, provider, interval) as a SignalSeries,
+    optionally limited to an inclusive epoch-day range.
+    """
+    import numpy as np
+
+    from series import SignalSeries, to_dates, to_epoch_days
+
+    stmt = _signal_select(stock_id, provider, interval)
+    if first_day is not None:
+        stmt = stmt.where(StockSignal.as_of >= to_dates(np.array([first_day]))[0])
+    if last_day is not None:
+        stmt = stmt.where(StockSignal.as_of <= to_dates(np.array([last_day]))[0])
+
+    result = await session.execute(stmt.order_by(StockSignal.as_of))
+    rows = result.all()
+    if not rows:
+        return SignalSeries.empty()
+    return SignalSeries(
+        to_epoch_days(r[0] for r in rows),
+        np.array([r[1:] for r in rows], dtype=np.float64),  # NULL -> NaN
+    )
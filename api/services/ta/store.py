@@ -0,0 +1,136 @@
+from __future__ import annotations
+import zlib
+from datetime import date, datetime, timezone
+from typing import Iterable, Mapping
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import StockIndicatorSeries
+from series import EPOCH, to_epoch_days
+
+
+def pack_dates(days: np.ndarray) -> bytes:
+    # Bars are mostly 1 (or 3 over weekends) apart, so deltas compress to a few bytes.
+    deltas = np.diff(days.astype(np.int32), prepend=np.int32(0))
+    return zlib.compress(deltas.astype("<i4").tobytes(), 1)
+
+
+def unpack_dates(blob: bytes) -> np.ndarray:
+    deltas = np.frombuffer(zlib.decompress(blob), dtype="<i4")
+    return np.cumsum(deltas, dtype=np.int32)
+
+
+def pack_values(values: np.ndarray) -> bytes:
+    return np.ascontiguousarray(values, dtype="<f8").tobytes()
+
+
+def unpack_values(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype="<f8")
+
+
+async def write_indicator_arrays(
+    session: AsyncSession,
+    *,
+    stock_id: int,
+    provider: str,
+    interval: str,
+    dates: np.ndarray | Iterable[date],
+    values: Mapping[str, np.ndarray],
+) -> int:
+    """
+    Insert or replace packed indicator series for one (stock, provider, interval).
+    `values` maps indicator_spec_id (IndicatorSpec.key) to an array aligned with `dates`.
+    Returns the number of series written. Does not commit.
+    """
+    if not values:
+        return 0
+    days = to_epoch_days(dates)
+    dates_blob = pack_dates(days)
+    first = (EPOCH + int(days[0])).item() if days.size else None
+    last = (EPOCH + int(days[-1])).item() if days.size else None
+    now = datetime.now(timezone.utc)
+
+    res = await session.execute(
+        select(StockIndicatorSeries).where(
+            StockIndicatorSeries.stock_id == stock_id,
+            StockIndicatorSeries.provider == provider,
+            StockIndicatorSeries.interval == interval,
+            StockIndicatorSeries.indicator_spec_id.in_(list(values)),
+        )
+    )
+    existing = {row.indicator_spec_id: row for row in res.scalars().all()}
+
+    for spec_id, arr in values.items():
+        arr = np.asarray(arr, dtype=np.float64)
+        if arr.shape != days.shape:
+            raise ValueError(f"{spec_id}: {arr.shape[0]} values for {days.shape[0]} dates")
+        row = existing.get(spec_id)
+        if row is None:
+            row = StockIndicatorSeries(
+                stock_id=stock_id,
+                provider=provider,
+                interval=interval,
+                indicator_spec_id=spec_id,
+            )
+            session.add(row)
+        row.length = int(days.size)
+        row.first_as_of = first
+        row.last_as_of = last
+        row.dates = dates_blob
+        row.values = pack_values(arr)
+        row.updated_at = now
+
+    return len(values)
+
+
+async def read_indicator_arrays(
+    session: AsyncSession,
+    *,
+    stock_id: int,
+    provider: str,
+    interval: str,
+    spec_ids: Iterable[str],
+    start: date | None = None,
+    end: date | None = None,
+) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """
+    Fetch only the requested indicators as columnar arrays.
+
+    Returns (dates as datetime64[D], {spec_id: float64 array}) aligned on the
+    union of the stored dates; specs that are not stored are omitted.
+    """
+    wanted = list(dict.fromkeys(spec_ids))
+    res = await session.execute(
+        select(
+            StockIndicatorSeries.indicator_spec_id,
+            StockIndicatorSeries.dates,
+            StockIndicatorSeries.values,
+        ).where(
+            StockIndicatorSeries.stock_id == stock_id,
+            StockIndicatorSeries.provider == provider,
+            StockIndicatorSeries.interval == interval,
+            StockIndicatorSeries.indicator_spec_id.in_(wanted),
+        )
+    )
+    decoded = [(spec_id, unpack_dates(d), unpack_values(v)) for spec_id, d, v in res.all()]
+    if not decoded:
+        return np.empty(0, dtype="datetime64[D]"), {}
+
+    first_days = decoded[0][1]
+    if all(np.array_equal(days, first_days) for _, days, _ in decoded):
+        days = first_days
+        out = {spec_id: vals for spec_id, _, vals in decoded}
+    else:
+        days = np.unique(np.concatenate([d for _, d, _ in decoded]))
+        out = {}
+        for spec_id, d, vals in decoded:
+            aligned = np.full(days.shape, np.nan)
+            aligned[np.searchsorted(days, d)] = vals
+            out[spec_id] = aligned
+
+    lo = 0 if start is None else int(np.searchsorted(days, to_epoch_days([start])[0], side="left"))
+    hi = days.size if end is None else int(np.searchsorted(days, to_epoch_days([end])[0], side="right"))
+    dates = EPOCH + days[lo:hi].astype("timedelta64[D]")
+    return dates, {spec_id: out[spec_id][lo:hi] for spec_id in wanted if spec_id in out}
@@ -0,0 +1,97 @@
+"""
+Lightweight tracing spans exported as Chrome trace-event JSON
+(chrome://tracing, Perfetto, speedscope).
+
+Off by default: span() is a flag check until start_tracing() is called or
+CHRONOS_TRACE=1. Each asyncio task gets its own track (tid) so concurrent
+refreshes don't interleave; work in worker threads is tracked per thread.
+"""
+from __future__ import annotations
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator
+
+
+MAX_EVENTS = 200_000
+
+_enabled = os.environ.get("CHRONOS_TRACE", "0") == "1"
+_events: deque[dict] = deque(maxlen=MAX_EVENTS)
+_tracks: dict[object, int] = {}
+_lock = threading.Lock()
+_PID = os.getpid()
+
+
+def tracing_enabled() -> bool:
+    return _enabled
+
+
+def start_tracing() -> None:
+    global _enabled
+    with _lock:
+        _events.clear()
+        _tracks.clear()
+    _enabled = True
+
+
+def stop_tracing() -> list[dict]:
+    """
+    Stop recording and return the collected events.
+    """
+    global _enabled
+    _enabled = False
+    with _lock:
+        events = list(_events)
+        _events.clear()
+    return events
+
+
+def _track() -> tuple[int, str]:
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    key = task if task is not None else threading.get_ident()
+    with _lock:
+        tid = _tracks.get(key)
+        if tid is None:
+            tid = _tracks[key] = len(_tracks) + 1
+    label = task.get_name() if task is not None else threading.current_thread().name
+    return tid, label
+
+
+@contextmanager
+def span(name: str, **args: object) -> Iterator[None]:
+    """
+    Record a complete ("X") event around the block when tracing is on.
+    """
+    if not _enabled:
+        yield
+        return
+    tid, label = _track()
+    t0 = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": t0 / 1e3,
+            "dur": (time.perf_counter_ns() - t0) / 1e3,
+            "pid": _PID,
+            "tid": tid,
+            "args": {"track": label, **{k: str(v) for k, v in args.items()}},
+        }
+        with _lock:
+            _events.append(event)
+
+
+def write_trace(path: str, events: list[dict]) -> str:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as fh:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fh)
+    return path
@@ -0,0 +1,154 @@
+"""
+Ingest-time data-quality checks on a whole BarSeries at once, run between
+fetch and upsert.
+
+Rows that fail a rule are quarantined rather than stored:
+- bad_value: non-finite or non-positive prices, negative volume
+- ohlc: high < low, or open/close outside [low, high]
+- duplicate: a bar superseded by a later one on the same date (dropped by
+  BarSeries.from_columns, see BarSeries.superseded), or a date not after the
+  previous bar's in a series built without it
+- spike: a close whose return in and return out are both extreme (robust
+  z-score over the batch) and opposite in sign, i.e. a print that reverts.
+  Persistent jumps such as earnings gaps or unadjusted splits are kept.
+
+Daily batches are also checked against the NYSE calendar; missing sessions
+and bars on non-trading days are reported but not quarantined, as are rows
+the provider sent out of date order.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict
+
+import numpy as np
+
+from series import EPOCH, BarSeries
+from services.market_calendar import holidays
+from services.metrics import Counter
+
+
+VALIDATION_REJECTED = Counter(
+    "chronos_validation_rejected_total", "Bars quarantined by ingest validation.", ("rule",)
+)
+
+BAD_VALUE, OHLC, DUPLICATE, SPIKE = 1, 2, 4, 8
+RULES: Dict[int, str] = {BAD_VALUE: "bad_value", OHLC: "ohlc", DUPLICATE: "duplicate", SPIKE: "spike"}
+
+SPIKE_Z = 8.0
+MIN_SPIKE_WINDOW = 20  # too few returns for a stable median/MAD below this
+_REL_TOL = 1e-9
+
+
+@dataclass(slots=True)
+class ValidationReport:
+    rows: int
+    by_rule: Dict[str, int] = field(default_factory=dict)
+    quarantined: int = 0
+    gaps: int = 0
+    off_calendar: int = 0
+    unordered: int = 0
+
+    def summary(self) -> str:
+        parts = []
+        if self.quarantined:
+            rules = ", ".join(f"{name}={n}" for name, n in self.by_rule.items())
+            parts.append(f"quarantined {self.quarantined} ({rules})")
+        if self.gaps:
+            parts.append(f"{self.gaps} missing sessions")
+        if self.off_calendar:
+            parts.append(f"{self.off_calendar} bars on non-trading days")
+        if self.unordered:
+            parts.append(f"{self.unordered} bars out of date order")
+        return "; ".join(parts)
+
+
+@dataclass(slots=True)
+class Validated:
+    clean: BarSeries
+    rejected: BarSeries
+    reasons: np.ndarray  # RULES bitmask per rejected bar
+    report: ValidationReport
+
+
+def reason_names(mask: int) -> str:
+    return ",".join(name for bit, name in RULES.items() if mask & bit)
+
+
+def _spikes(close: np.ndarray) -> np.ndarray:
+    flagged = np.zeros(close.size, dtype=bool)
+    if close.size <= MIN_SPIKE_WINDOW:
+        return flagged
+    lr = np.diff(np.log(close))
+    med = np.median(lr)
+    mad = np.median(np.abs(lr - med)) * 1.4826
+    if mad == 0:
+        return flagged
+    z = (lr - med) / mad
+    z_in, z_out = z[:-1], z[1:]
+    # Bar i (1..n-2) sits between return i-1 (in) and return i (out); the
+    # newest bar has no confirming return and is never flagged.
+    flagged[1:-1] = (np.abs(z_in) > SPIKE_Z) & (np.abs(z_out) > SPIKE_Z) & (np.sign(z_in) != np.sign(z_out))
+    return flagged
+
+
+def _calendar_gaps(days: np.ndarray) -> tuple[int, int]:
+    """
+    (missing NYSE sessions between the first and last bar, bars on non-trading days).
+    """
+    dates = EPOCH + days.astype("timedelta64[D]")
+    first, last = dates[0], dates[-1]
+    years = range(first.astype("datetime64[Y]").astype(int) + 1970, last.astype("datetime64[Y]").astype(int) + 1971)
+    hol = np.array(sorted(d for y in years for d in holidays(y)), dtype="datetime64[D]")
+    on_calendar = np.is_busday(dates, holidays=hol)
+    expected = int(np.busday_count(first, last + np.timedelta64(1, "D"), holidays=hol))
+    return expected - int(on_calendar.sum()), int((~on_calendar).sum())
+
+
+def _stack(a: BarSeries, b: BarSeries) -> BarSeries:
+    """
+    Both series' bars, dates kept as they are (repeats included).
+    """
+    names = ("days", "open", "high", "low", "close", "volume", "volume_mask")
+    return BarSeries(*(np.concatenate([getattr(a, n), getattr(b, n)]) for n in names))
+
+
+def validate_bars(bars: BarSeries, interval: str) -> Validated:
+    superseded = bars.superseded if bars.superseded is not None else BarSeries.empty()
+    report = ValidationReport(rows=len(bars) + len(superseded), unordered=bars.unordered)
+    n = len(bars)
+    reasons = np.zeros(n, dtype=np.int8)
+    if n == 0:
+        return Validated(bars, bars, reasons, report)
+
+    o, h, l, c = bars.open, bars.high, bars.low, bars.close
+    prices = np.stack([o, h, l, c])
+    bad = ~np.isfinite(prices).all(axis=0) | (prices <= 0).any(axis=0)
+    bad |= bars.volume_mask & ((bars.volume < 0) | ~np.isfinite(bars.volume))
+    reasons[bad] |= BAD_VALUE
+
+    with np.errstate(invalid="ignore"):
+        tol = _REL_TOL * np.abs(h)
+        ohlc = (h < l - tol) | (np.maximum(o, c) > h + tol) | (np.minimum(o, c) < l - tol)
+    reasons[ohlc & ~bad] |= OHLC
+
+    reasons[1:][np.diff(bars.days) <= 0] |= DUPLICATE
+
+    ok = reasons == 0
+    idx = np.flatnonzero(ok)
+    reasons[idx[_spikes(c[idx])]] |= SPIKE
+
+    rejected = np.flatnonzero(reasons)
+    clean = bars if rejected.size == 0 else bars.take(np.flatnonzero(reasons == 0))
+    rejected_bars = _stack(bars.take(rejected), superseded)
+    rejected_reasons = np.r_[reasons[rejected], np.full(len(superseded), DUPLICATE, dtype=np.int8)]
+    for bit, name in RULES.items():
+        hits = int(np.count_nonzero(rejected_reasons & bit))
+        if hits:
+            report.by_rule[name] = hits
+            VALIDATION_REJECTED.inc(hits, rule=name)
+    report.quarantined = len(rejected_bars)
+
+    if interval == "1d" and len(clean):
+        report.gaps, report.off_calendar = _calendar_gaps(clean.days)
+
+    return Validated(clean, rejected_bars, rejected_reasons, report)
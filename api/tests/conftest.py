@@ -0,0 +1,59 @@
+from contextlib import contextmanager
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from db import Base, get_session
+from services.querylog import REPEAT_THRESHOLD, instrument_engine, track_queries
+
+
+@contextmanager
+def _query_budget(max_queries: int, *, max_repeats: int = REPEAT_THRESHOLD - 1):
+    """
+    Fail if the block runs more than `max_queries` statements, or any one
+    statement shape more than `max_repeats` times (a per-row query loop).
+    """
+    with track_queries() as log:
+        yield log
+    assert log.count <= max_queries, f"query budget {max_queries} exceeded:\n{log.summary()}"
+    repeated = log.repeated(max_repeats + 1)
+    assert not repeated, f"statement repeated {repeated[0][1]} times:\n{log.summary()}"
+
+
+@pytest.fixture
+def query_budget():
+    return _query_budget
+
+
+@pytest.fixture
+async def db_sessions():
+    """
+    Session factory over a fresh in-memory SQLite database with every table,
+    instrumented so query_budget sees its statements.
+    """
+    engine = create_async_engine("sqlite+aiosqlite://")
+    instrument_engine(engine.sync_engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def api_client(db_sessions):
+    """
+    HTTP client for the app with get_session served from db_sessions.
+    """
+    from main import app  # not at module level: test_import_budget measures a cold import
+
+    async def override_session():
+        async with db_sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override_session
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+    finally:
+        app.dependency_overrides.pop(get_session, None)
@@ -0,0 +1,67 @@
+from datetime import date
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from models import ActionKind, Stock
+from series import to_epoch_days
+from services.adjustments import ADJUSTED_CACHE, cumulative_factors
+from services.provider_registry import register_provider
+from services.providers.synthetic_adapter import SyntheticProvider
+from services.refresh_prices import refresh_stock_prices
+
+
+def _action(kind, ex_date, ratio=None, amount=None):
+    return SimpleNamespace(kind=kind, ex_date=ex_date, ratio=ratio, amount=amount)
+
+
+def test_factors_compound_over_later_actions():
+    days = to_epoch_days(np.arange("2024-03-01", "2024-03-11", dtype="datetime64[D]"))
+    close = np.array([100.0] * 5 + [50.0] * 5)  # raw: 2-for-1 on 03-06
+    actions = [
+        _action(ActionKind.dividend, date(2024, 3, 9), amount=1.0),
+        _action(ActionKind.split, date(2024, 3, 6), ratio=2.0),
+        _action(ActionKind.split, date(2023, 1, 3), ratio=3.0),  # before the series: no effect
+    ]
+    price, volume = cumulative_factors(days, close, actions)
+    np.testing.assert_allclose(price, [0.5 * 0.98] * 5 + [0.98] * 3 + [1.0] * 2)
+    np.testing.assert_allclose(volume, [2.0] * 5 + [1.0] * 5)
+
+    split_only, _ = cumulative_factors(days, close, actions, dividends=False)
+    np.testing.assert_allclose(split_only, [0.5] * 5 + [1.0] * 5)
+    adjusted = close * price
+    assert np.ptp(adjusted[:8]) < 1e-9  # continuous across the split
+
+
+@pytest.mark.anyio
+async def test_split_is_one_insert_and_invalidates_cached_reads(db_sessions, api_client):
+    register_provider(SyntheticProvider(name="adj-test", bars=40, gap_rate=0.0, split_rate=0.0))
+
+    async with db_sessions() as session:
+        stock = Stock(ticker="ADJ")
+        session.add(stock)
+        await session.commit()
+        await refresh_stock_prices(session, stock=stock, provider="adj-test", interval="1d")
+
+    ADJUSTED_CACHE.clear()
+    params = {"provider": "adj-test", "interval": "1d"}
+    client = api_client
+    raw = (await client.get("/stocks/ADJ/ohlcv", params=params)).json()
+    ex_date = raw[20]["date"]
+    res = await client.post("/stocks/ADJ/actions", json={"kind": "split", "ex_date": ex_date, "ratio": 4})
+    assert res.status_code == 201
+    dup = await client.post("/stocks/ADJ/actions", json={"kind": "split", "ex_date": ex_date, "ratio": 4})
+    assert dup.status_code == 409
+
+    adjusted = (await client.get("/stocks/ADJ/ohlcv", params={**params, "adjust": "split"})).json()
+    again = (await client.get("/stocks/ADJ/ohlcv", params={**params, "adjust": "split", "limit": 5})).json()
+    assert ADJUSTED_CACHE.hits == 1 and again == adjusted[-5:]
+
+    await client.delete(f"/stocks/ADJ/actions/{res.json()['id']}")
+    undone = (await client.get("/stocks/ADJ/ohlcv", params={**params, "adjust": "split"})).json()
+
+    assert adjusted[0]["close"] == pytest.approx(raw[0]["close"] / 4)
+    assert adjusted[0]["volume"] == pytest.approx(raw[0]["volume"] * 4)
+    assert adjusted[20:] == raw[20:]
+    assert undone == raw
@@ -0,0 +1,128 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import func, select
+from models import Stock, StockOHLCV, StockSignal
+from services.backtest.engine import run_backtest
+from services.backtest.panel import Panel, load_panel
+
+
+def _panel(close: list[float], rsi: list[float]) -> Panel:
+    c = np.array([close])
+    return Panel(
+        tickers=("AAA",),
+        dates=np.arange(len(close)).astype("datetime64[D]"),
+        fields={"open": c.copy(), "high": c.copy(), "low": c.copy(), "close": c, "rsi": np.array([rsi])},
+    )
+
+
+def test_entry_fills_next_open_and_exit_rule_closes():
+    panel = _panel(
+        close=[10, 10, 11, 12, 12, 12],
+        rsi=[50, 20, 40, 80, 50, 50],
+    )
+    config = {
+        "entry_rules": [{"field": "rsi", "op": "<", "value": 30}],
+        "exit_rules": [{"field": "rsi", "op": ">", "value": 70}],
+    }
+    res = run_backtest(panel, config)
+
+    assert res.positions.tolist() == [[0, 0, 1, 1, 0, 0]]
+    assert len(res.trades) == 1
+    ticker, entry_d, exit_d, entry_px, exit_px, net, is_open = res.trades[0]
+    assert (ticker, entry_px, exit_px, is_open) == ("AAA", 11.0, 12.0, False)
+    assert net == pytest.approx(12 / 11 - 1)
+    assert res.portfolio_equity[-1] == pytest.approx(12 / 11)
+
+
+def test_costs_are_charged_per_side():
+    panel = _panel(close=[10, 10, 10, 10], rsi=[20, 80, 80, 80])
+    config = {"entry_rules": [{"field": "rsi", "op": "<", "value": 30}]}
+    res = run_backtest(panel, config, commission_bps=5, slippage_bps=5)
+
+    assert res.metrics["trades"] == 1
+    assert res.portfolio_equity[-1] == pytest.approx((1 - 0.001) ** 2)
+
+
+def test_nan_signals_never_trigger():
+    panel = _panel(close=[10, 10, 10], rsi=[np.nan, np.nan, np.nan])
+    config = {"entry_rules": [{"field": "rsi", "op": "!=", "value": 0}]}
+    res = run_backtest(panel, config)
+    assert res.trades == []
+    assert not res.positions.any()
+
+
+@pytest.mark.anyio
+async def test_load_panel_aligns_tickers_and_joins_signals(db_sessions):
+    d0 = date(2024, 1, 1)
+    async with db_sessions() as session:
+        session.add_all([Stock(id=1, ticker="AAA"), Stock(id=2, ticker="BBB")])
+        for i in range(3):
+            session.add(StockOHLCV(stock_id=1, as_of=d0 + timedelta(days=i), provider="p", interval="1d",
+                                   open=1, high=1, low=1, close=1 + i, volume=100))
+        session.add(StockOHLCV(stock_id=2, as_of=d0 + timedelta(days=2), provider="p", interval="1d",
+                               open=5, high=5, low=5, close=5, volume=None))
+        session.add(StockSignal(stock_id=1, as_of=d0 + timedelta(days=1), provider="p", interval="1d", rsi=42.0))
+        await session.commit()
+
+        panel = await load_panel(session, tickers=["bbb", "aaa", "zzz"], provider="p", interval="1d")
+
+    assert panel.tickers == ("BBB", "AAA")
+    assert panel.shape == (2, 3)
+    assert np.isnan(panel.fields["close"][0, :2]).all()
+    assert panel.fields["close"][1].tolist() == [1, 2, 3]
+    assert np.isnan(panel.fields["rsi"][1, 0]) and panel.fields["rsi"][1, 1] == 42.0
+
+
+def test_sweep_matches_serial_and_stops_early():
+    from services.backtest.sweep import run_sweep
+
+    rng = np.random.default_rng(7)
+    n = 300
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    panel = _panel(close=close.tolist(), rsi=rng.uniform(0, 100, n).tolist())
+    base = {"entry_rules": [{"field": "rsi", "op": "<", "value": 30}]}
+    grid = {"entry_rules.0.value": [10, 20, 30, 40]}
+
+    serial = run_sweep(panel, base, grid, max_workers=0)
+    pooled = run_sweep(panel, base, grid, max_workers=2)
+    assert serial.total == pooled.total == 4
+    assert [r.params for r in serial.results] == [r.params for r in pooled.results]
+    assert serial.best.metrics == pytest.approx(pooled.best.metrics)
+
+    stopped = run_sweep(panel, base, grid, max_workers=0, target=-np.inf)
+    assert stopped.stopped_early and len(stopped.results) == 1
+
+
+@pytest.mark.anyio
+async def test_backtest_over_archived_bars_matches_unarchived(db_sessions):
+    from ohlcv import upsert_ohlcv
+    from series import BarSeries
+    from services.providers.synthetic_adapter import SyntheticProvider
+    from services.retention import run_retention
+    from services.ta.compute import compute_and_upsert_signals
+
+    key = dict(provider="p", interval="1d")
+    async with db_sessions() as session:
+        for ticker in ("OLD", "NEW"):
+            stock = Stock(ticker=ticker)
+            session.add(stock)
+            await session.commit()
+            bars = BarSeries.from_columns(*SyntheticProvider().generate(ticker, "1d", 1000))
+            await upsert_ohlcv(session, stock_id=stock.id, rows=bars, **key)
+            await compute_and_upsert_signals(session, stock_id=stock.id, **key)
+            await session.commit()
+        before = await load_panel(session, tickers=["old", "new"], **key)
+
+    assert await run_retention(date(2025, 12, 31), hot_days={"1d": 365}, sessions=db_sessions) > 0
+    async with db_sessions() as session:
+        after = await load_panel(session, tickers=["old", "new"], **key)
+        hot = await session.scalar(select(func.count()).select_from(StockOHLCV))
+
+    assert hot < 2 * 1000 and after.shape == before.shape == (2, before.dates.size)
+    assert np.array_equal(after.dates, before.dates)
+    for name, arr in before.fields.items():
+        assert np.array_equal(after.fields[name], arr, equal_nan=True), name
+    config = {"entry_rules": [{"field": "rsi", "op": "<", "value": 40}], "exit_rules": [{"field": "rsi", "op": ">", "value": 60}]}
+    assert run_backtest(after, config).metrics == run_backtest(before, config).metrics
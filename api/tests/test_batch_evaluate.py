@@ -0,0 +1,95 @@
+import json
+from datetime import date
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+from models import ScanRun, Stock, StrategyTemplate, TradeCandidate, Universe
+from ohlcv import upsert_ohlcv
+from series import BarSeries
+from services.backtest.panel import load_panel, with_indicators
+from services.providers.synthetic_adapter import SyntheticProvider
+from services.ta.compute import compute_and_upsert_signals
+
+KEY = dict(provider="p", interval="1d")
+TICKERS = [f"S{i:02d}" for i in range(12)]
+# EMA-30 declares 600 bars of warm-up, far more than the 30-day lookback.
+INDICATORS = {"trend": {"name": "ema", "length": 30}}
+CONFIG = {
+    "indicators": INDICATORS,
+    "entry_rules": [{"field": "close", "op": ">", "value": 0}, {"field": "rsi", "op": ">", "value": 50}],
+    "score_field": "trend",
+}
+
+
+@pytest.mark.anyio
+async def test_batch_evaluation_matches_per_ticker_rules(db_sessions, api_client):
+    gen = SyntheticProvider(gap_rate=0.0)
+    lagging = SyntheticProvider(gap_rate=0.0, end=date(2025, 11, 28))
+    async with db_sessions() as session:
+        for ticker in [*TICKERS, "LATE"]:
+            stock = Stock(ticker=ticker)
+            session.add(stock)
+            await session.flush()
+            bars = BarSeries.from_columns(*(lagging if ticker == "LATE" else gen).generate(ticker, "1d", 1500))
+            await upsert_ohlcv(session, stock_id=stock.id, rows=bars, **KEY)
+            await compute_and_upsert_signals(session, stock_id=stock.id, **KEY)
+        universe = Universe(name="sweep")
+        template = StrategyTemplate(name="rsi-fast", config_json=json.dumps(CONFIG))
+        session.add_all([universe, template])
+        await session.commit()
+        panel = with_indicators(await load_panel(session, tickers=TICKERS, **KEY), INDICATORS)
+    end = panel.dates[-1].astype(object)
+    last = zip(panel.tickers, panel.fields["rsi"][:, -1].tolist(), panel.fields["trend"][:, -1].tolist())
+    expected = {t: trend for t, rsi, trend in last if rsi > 50}
+    assert 0 < len(expected) < len(TICKERS)
+
+    body = {"universe_id": universe.id, "template_id": template.id, "tickers": [*TICKERS, "late", "nope"], "end": end.isoformat(), "lookback_days": 30, **KEY}
+    res = await api_client.post("/candidates/evaluate", json=body)
+    gone = await api_client.post("/candidates/evaluate", json={**body, "template_id": 999})
+
+    async with db_sessions() as session:
+        rows = (await session.execute(select(TradeCandidate))).scalars().all()
+        run = (await session.execute(select(ScanRun))).scalar_one()
+
+    data = res.json()
+    assert res.status_code == 200 and gone.status_code == 404
+    assert data["evaluated"] == len(TICKERS) and data["missing"] == ["NOPE"] and data["stale"] == ["LATE"] and data["errors"] == 0
+    assert data["created_count"] == len(expected) == run.candidates_created
+    assert data["as_of"] == end.isoformat() and data["run_id"] == run.id
+    assert {r.ticker: r.score for r in rows} == pytest.approx(expected)
+    payload = json.loads(rows[0].payload_json)
+    assert payload["run_id"] == run.id and np.isclose(payload["values"]["trend"], rows[0].score)
+
+
+@pytest.mark.anyio
+async def test_batch_features_survive_indicator_cache_eviction(db_sessions):
+    from services.backtest.batch import evaluate_template_batch
+    from services.ta.graph import INDICATOR_CACHE
+
+    tickers = [f"E{i:03d}" for i in range(120)]
+    indicators = {f"sma{n}": {"name": "sma", "length": n} for n in (2, 3, 4, 5, 6)}
+    config = {"indicators": indicators, "entry_rules": [{"field": "sma2", "op": ">", "value": 0}]}
+    gen = SyntheticProvider(gap_rate=0.0)
+    async with db_sessions() as session:
+        for ticker in tickers:
+            stock = Stock(ticker=ticker)
+            session.add(stock)
+            await session.flush()
+            bars = BarSeries.from_columns(*gen.generate(ticker, "1d", 60))
+            await upsert_ohlcv(session, stock_id=stock.id, rows=bars, **KEY)
+        universe = Universe(name="wide")
+        template = StrategyTemplate(name="smas", config_json=json.dumps(config))
+        session.add_all([universe, template])
+        await session.commit()
+
+        INDICATOR_CACHE.clear()
+        # 120 tickers x 5 specs is past the cache's 512 entries, so the
+        # worker threads evict while others read.
+        res = await evaluate_template_batch(
+            session, template=template, universe_id=universe.id, tickers=tickers,
+            end=bars.dates()[-1].astype(object), lookback_days=120, **KEY
+        )
+
+    assert res.errors == 0 and res.evaluated == res.created == len(tickers)
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from models import Stock
+from services.broadcast import BROADCASTER, Broadcaster
+from services.provider_registry import register_provider
+from services.providers.synthetic_adapter import SyntheticProvider
+from services.refresh_prices import refresh_stock_prices
+
+
+def _events(sub) -> list[tuple[str, object]]:
+    out = []
+    while not sub.queue.empty():
+        lines = sub.queue.get_nowait().decode().strip().split("\n")
+        fields = dict(line.split(": ", 1) for line in lines)
+        out.append((fields["event"], json.loads(fields["data"])))
+    return out
+
+
+def test_publish_encodes_once_and_cuts_off_laggards():
+    b = Broadcaster(max_pending=2)
+    fast, slow = b.subscribe((1, "p", "1d")), b.subscribe((1, "p", "1d"))
+    assert b.publish((2, "p", "1d"), "status", {}) == 0
+    assert b.publish((1, "p", "1d"), "status", {"n": 1}) == 2
+    assert fast.queue.get_nowait() is slow.queue.get_nowait()  # one frame, shared
+
+    b.publish((1, "p", "1d"), "status", {"n": 2})
+    fast.queue.get_nowait()
+    b.publish((1, "p", "1d"), "status", {"n": 3})
+    assert b.publish((1, "p", "1d"), "status", {"n": 4}) == 1  # slow is 3 behind
+    assert _events(slow) == [("resync", {})]
+    assert b.subscribers((1, "p", "1d")) == 1
+
+
+@pytest.mark.anyio
+async def test_refresh_pushes_only_changed_rows(db_sessions):
+    register_provider(SyntheticProvider(name="sse-test", bars=120, gap_rate=0.0))
+
+    async with db_sessions() as session:
+        stock = Stock(ticker="SSE")
+        session.add(stock)
+        await session.commit()
+        sub = BROADCASTER.subscribe((stock.id, "sse-test", "1d"))
+        try:
+            await refresh_stock_prices(session, stock=stock, provider="sse-test", interval="1d")
+            first = _events(sub)
+            await refresh_stock_prices(session, stock=stock, provider="sse-test", interval="1d")
+            second = _events(sub)
+        finally:
+            BROADCASTER.unsubscribe(sub)
+
+    assert [name for name, _ in first] == ["bars", "signals", "status"]
+    assert len(first[0][1]) == 120 and first[2][1]["status"] == "fresh"
+    # Same bars again: nothing changed, so only the status transition goes out.
+    assert [name for name, _ in second] == ["status"]
@@ -0,0 +1,33 @@
+import pytest
+
+from models import Stock
+from repositories.stocks import get_or_create_stocks, get_stock_ids
+
+
+@pytest.mark.anyio
+async def test_bulk_get_or_create_is_a_few_statements(db_sessions, query_budget):
+    watch_list = [f"t{i:04d}" for i in range(1500)]
+    async with db_sessions() as session:
+        session.add(Stock(ticker="T0007"))
+        await session.commit()
+        with query_budget(6):
+            ids = await get_or_create_stocks(session, [" aapl", *watch_list, "AAPL", ""])
+        again = await get_or_create_stocks(session, ["T0007", "aapl"])
+        known = await get_stock_ids(session, ["aapl", "missing"])
+
+    assert list(ids)[:3] == ["AAPL", "T0000", "T0001"] and len(ids) == 1501
+    assert len(set(ids.values())) == 1501
+    assert again == {"T0007": ids["T0007"], "AAPL": ids["AAPL"]}
+    assert known == {"AAPL": ids["AAPL"]}
+
+
+@pytest.mark.anyio
+async def test_bulk_endpoint_registers_and_resolves(api_client):
+    first = await api_client.post("/stocks/bulk", json={"tickers": ["msft", "spy"]})
+    second = await api_client.post("/stocks/bulk", json={"tickers": ["SPY", "qqq"]})
+    empty = await api_client.post("/stocks/bulk", json={"tickers": []})
+
+    assert first.status_code == 200 and list(first.json()["stocks"]) == ["MSFT", "SPY"]
+    assert second.json()["stocks"]["SPY"] == first.json()["stocks"]["SPY"]
+    assert second.json()["count"] == 2
+    assert empty.status_code == 422
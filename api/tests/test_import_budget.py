@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+
+# Cold `import main` must not pull in the compute/fetch backends.
+HEAVY = ("pandas", "pandas_ta", "yahooquery", "numpy")
+BUDGET_S = float(os.environ.get("CHRONOS_IMPORT_BUDGET_S", "3.0"))
+
+
+def _run(code: str) -> list[str]:
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return out.stdout.split()
+
+
+def test_import_main_stays_light():
+    elapsed, *loaded = _run(
+        "import sys, time; t = time.perf_counter(); import main; "
+        f"print(time.perf_counter() - t, *[m for m in {HEAVY!r} if m in sys.modules])"
+    )
+    assert loaded == []
+    assert float(elapsed) < BUDGET_S
+
+
+def test_registries_import_only_the_requested_backend():
+    loaded = _run(
+        "import sys; from services.provider_registry import get_provider; get_provider('synthetic'); "
+        "print(*[m for m in ('yahooquery', 'pandas') if m in sys.modules])"
+    )
+    assert loaded == []
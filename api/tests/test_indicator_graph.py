@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+import pytest
+
+from services.ta import graph
+from services.ta.graph import IndicatorCache, IndicatorSpec, compute_indicators, parse_indicator_requests
+
+
+@pytest.fixture
+def close() -> np.ndarray:
+    rng = np.random.default_rng(3)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 400)))
+
+
+def test_matches_pandas_ta(close):
+    s = pd.Series(close)
+    macd = ta.macd(s)
+    bb = ta.bbands(s, length=20)
+    expected = {
+        IndicatorSpec.of("rsi", length=14): ta.rsi(s, length=14),
+        IndicatorSpec.of("ema", length=50): ta.ema(s, length=50),
+        IndicatorSpec.of("macd"): macd["MACD_12_26_9"],
+        IndicatorSpec.of("macd_signal"): macd["MACDs_12_26_9"],
+        IndicatorSpec.of("bb_upper", length=20): bb["BBU_20_2.0_2.0"],
+        IndicatorSpec.of("bb_lower", length=20): bb["BBL_20_2.0_2.0"],
+    }
+    out = compute_indicators({"close": close}, expected, cache=None)
+    for spec, ref in expected.items():
+        np.testing.assert_allclose(out[spec], ref.to_numpy(), rtol=1e-10, equal_nan=True)
+
+
+def test_shared_intermediates_computed_once(close, monkeypatch):
+    calls: list[str] = []
+    for name in ("ema", "sma", "stdev"):
+        original = graph._REGISTRY[name]
+
+        def counted(*args, _orig=original, _name=name, **kwargs):
+            calls.append(_name)
+            return _orig.compute(*args, **kwargs)
+
+        monkeypatch.setitem(graph._REGISTRY, name, original.__class__(
+            original.name, original.defaults, original.inputs, counted, original.warmup,
+        ))
+
+    specs = [
+        IndicatorSpec.of("macd"),
+        IndicatorSpec.of("ema", length=12),
+        IndicatorSpec.of("bb_upper", length=20),
+        IndicatorSpec.of("bb_lower", length=20),
+        IndicatorSpec.of("sma", length=20),
+    ]
+    compute_indicators({"close": close}, specs, cache=None)
+    assert sorted(calls) == ["ema", "ema", "sma", "stdev"]
+
+
+def test_cache_reuses_by_version(close):
+    cache = IndicatorCache()
+    spec = IndicatorSpec.of("rsi", length=7)
+    first = compute_indicators({"close": close}, [spec], version="v1", cache=cache)
+    again = compute_indicators({"close": close}, [spec], version="v1", cache=cache)
+    assert again[spec] is first[spec]
+    assert cache.hits == 1
+
+    compute_indicators({"close": close}, [spec], version="v2", cache=cache)
+    assert cache.misses == 2
+
+
+def test_cache_survives_concurrent_eviction():
+    import sys
+    import threading
+
+    cache = IndicatorCache(maxsize=8)
+    specs = [IndicatorSpec.of("sma", length=n) for n in range(2, 18)]
+    errors = []
+
+    def work(seed):
+        rng = np.random.default_rng(seed)
+        try:
+            for i in rng.integers(len(specs), size=5000).tolist():
+                if cache.get("v", specs[i]) is None:
+                    cache.put("v", specs[i], np.zeros(1))
+        except Exception as exc:
+            errors.append(exc)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads between a lookup and its move_to_end
+    try:
+        threads = [threading.Thread(target=work, args=(seed,)) for seed in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert errors == []
+
+
+def test_template_requests_and_keys():
+    req = parse_indicator_requests({"fast": {"name": "ema", "length": 9}, "rsi": {}})
+    assert req["fast"].key == "ema_9"
+    assert req["rsi"].key == "rsi_14"
+    with pytest.raises(ValueError):
+        IndicatorSpec.of("ema", span=3)
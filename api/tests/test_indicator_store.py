@@ -0,0 +1,33 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from models import Stock
+from services.ta.store import read_indicator_arrays, write_indicator_arrays
+
+
+@pytest.mark.anyio
+async def test_roundtrip_reads_only_requested_specs(db_sessions):
+    dates = [date(2024, 1, 1) + timedelta(days=i) for i in (0, 1, 4, 5, 6)]
+    rsi = np.array([np.nan, 40.0, 50.0, 60.0, 70.0])
+    ema = np.arange(5, dtype=np.float64)
+
+    async with db_sessions() as session:
+        session.add(Stock(id=1, ticker="AAA"))
+        await write_indicator_arrays(session, stock_id=1, provider="p", interval="1d",
+                                     dates=dates, values={"rsi_14": rsi, "ema_20": ema})
+        await session.commit()
+        # rewriting replaces the packed arrays in place
+        await write_indicator_arrays(session, stock_id=1, provider="p", interval="1d",
+                                     dates=dates, values={"ema_20": ema * 2})
+        await session.commit()
+
+        out_dates, out = await read_indicator_arrays(
+            session, stock_id=1, provider="p", interval="1d",
+            spec_ids=["ema_20", "missing"], start=date(2024, 1, 2),
+        )
+
+    assert list(out) == ["ema_20"]
+    assert out_dates.astype(object).tolist() == dates[1:]
+    np.testing.assert_array_equal(out["ema_20"], ema[1:] * 2)
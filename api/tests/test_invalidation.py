@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from models import Stock
+from ohlcv import load_bar_series
+from repositories.cache import get_cache_status
+from series import BarSeries, SignalSeries
+from services.provider_registry import register_provider
+from services.providers.synthetic_adapter import SyntheticProvider
+from services.refresh_prices import refresh_stock_prices
+from services.ta.providers.pandas_ta_provider import PandasTAProvider
+from services.ta.signals import load_signal_series
+
+
+class _RevisingProvider(SyntheticProvider):
+    revise_at: int | None = None
+
+    async def fetch_bars_async(self, ticker, interval):
+        bars = await super().fetch_bars_async(ticker, interval)
+        if self.revise_at is None:
+            return bars
+        scale = np.ones(len(bars))
+        scale[self.revise_at] = 1.003
+        return BarSeries(
+            bars.days, bars.open * scale, bars.high * scale, bars.low * scale, bars.close * scale,
+            bars.volume, bars.volume_mask,
+        )
+
+
+@pytest.mark.anyio
+async def test_revision_recomputes_only_from_the_changed_bar(db_sessions):
+    source = _RevisingProvider(name="revising", bars=1500, gap_rate=0.0)
+    register_provider(source)
+    key = dict(provider="revising", interval="1d")
+
+    async with db_sessions() as session:
+        stock = Stock(ticker="REV")
+        session.add(stock)
+        await session.commit()
+        await refresh_stock_prices(session, stock=stock, **key)
+        before = await load_signal_series(session, stock_id=stock.id, **key)
+
+        source.revise_at = 1450
+        await refresh_stock_prices(session, stock=stock, **key)
+        after = await load_signal_series(session, stock_id=stock.id, **key)
+        cache = await get_cache_status(session, stock_id=stock.id, **key)
+        bars = await load_bar_series(session, stock_id=stock.id, **key)
+
+        await refresh_stock_prices(session, stock=stock, **key)
+        again = await get_cache_status(session, stock_id=stock.id, **key)
+
+    assert (cache.version, cache.stale_from) == (2, None)
+    assert again.version == 2  # nothing changed on the third fetch
+
+    revised = int(bars.days[1450])
+    moved = after.days[(after.values != before.values).any(axis=1)]
+    assert moved.min() == revised and moved.size == after.days[after.days >= revised].size
+
+    # The windowed recompute matches a full one to well within display precision.
+    full: SignalSeries = PandasTAProvider().compute_signal_series(bars)
+    assert np.array_equal(full.days, after.days)
+    np.testing.assert_allclose(after.values, full.values, rtol=1e-7)
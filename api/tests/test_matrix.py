@@ -0,0 +1,102 @@
+import io
+from datetime import date
+
+import numpy as np
+import pytest
+
+from models import Stock
+from ohlcv import list_ohlcv_rows, upsert_ohlcv
+from repositories.stocks import get_stock_ids
+from series import BarSeries
+from services.matrix import load_matrix
+from services.providers.synthetic_adapter import SyntheticProvider
+from services.retention import run_retention
+from services.ta.compute import compute_and_upsert_signals
+from services.ta.signals import list_signal_rows
+
+KEY = dict(provider="p", interval="1d")
+
+
+async def _seed(Session):
+    gen = SyntheticProvider(gap_rate=0.05)
+    async with Session() as session:
+        for ticker, n in (("AAA", 400), ("BBB", 300), ("CCC", 120)):
+            stock = Stock(ticker=ticker)
+            session.add(stock)
+            await session.commit()
+            bars = BarSeries.from_columns(*gen.generate(ticker, "1d", n))
+            await upsert_ohlcv(session, stock_id=stock.id, rows=bars, **KEY)
+            await compute_and_upsert_signals(session, stock_id=stock.id, **KEY)
+            await session.commit()
+    # AAA's first year moves to the archive; reads must not notice.
+    await run_retention(date(2025, 12, 31), hot_days={"1d": 365}, sessions=Session)
+
+
+@pytest.mark.anyio
+async def test_pages_cover_every_stored_value(db_sessions, query_budget):
+    await _seed(db_sessions)
+
+    async with db_sessions() as session:
+        ids = await get_stock_ids(session, ["aaa", "bbb", "ccc"])
+        pages, after = [], None
+        while True:
+            with query_budget(5, max_repeats=1):
+                page = await load_matrix(session, stock_ids=ids, fields=["close", "rsi"], after=after, limit=70, **KEY)
+            pages.append(page)
+            after = page.next_after
+            if after is None:
+                break
+        expected = {t: await list_ohlcv_rows(session, stock_id=i, **KEY) for t, i in ids.items()}
+        rsi = {t: await list_signal_rows(session, stock_id=i, **KEY) for t, i in ids.items()}
+
+    dates = np.concatenate([p.panel.dates for p in pages])
+    close = np.concatenate([p.panel.fields["close"] for p in pages], axis=1)
+    assert all(p.panel.dates.size == 70 for p in pages[:-1])
+    every_day = sorted({row[0] for rows in expected.values() for row in rows})
+    assert dates.astype(object).tolist() == every_day
+    for i, ticker in enumerate(("AAA", "BBB", "CCC")):
+        got = {d: c for d, c in zip(dates.astype(object).tolist(), close[i].tolist()) if c == c}
+        assert got == {row[0]: row[4] for row in expected[ticker]}
+    rsi_matrix = np.concatenate([p.panel.fields["rsi"] for p in pages], axis=1)
+    assert np.count_nonzero(~np.isnan(rsi_matrix[2])) == sum(r[1] is not None for r in rsi["CCC"])
+
+
+@pytest.mark.anyio
+async def test_first_page_decodes_only_the_archive_it_shows(db_sessions, monkeypatch):
+    from services import archive
+
+    async with db_sessions() as session:
+        stock = Stock(ticker="DEEP")
+        session.add(stock)
+        await session.commit()
+        bars = BarSeries.from_columns(*SyntheticProvider(gap_rate=0.0).generate("DEEP", "1d", 1000))
+        await upsert_ohlcv(session, stock_id=stock.id, rows=bars, **KEY)
+        await session.commit()
+    await run_retention(date(2025, 12, 31), hot_days={"1d": 365}, sessions=db_sessions)  # 2022..2024 chunks
+
+    decoded, decode = [], archive.decode_chunk
+    monkeypatch.setattr(archive, "decode_chunk", lambda d, c: decoded.append(d) or decode(d, c))
+    async with db_sessions() as session:
+        page = await load_matrix(session, stock_ids={"DEEP": stock.id}, fields=["close"], limit=20, **KEY)
+
+    assert len(decoded) == 1
+    assert page.panel.dates.astype(object).tolist() == bars.dates()[:20].astype(object).tolist()
+    assert page.panel.fields["close"][0].tolist() == bars.close[:20].tolist()
+
+
+@pytest.mark.anyio
+async def test_matrix_endpoint_json_and_npz(db_sessions, api_client):
+    await _seed(db_sessions)
+
+    body = {"tickers": ["bbb", "ccc", "zzz"], "fields": ["close", "volume"], "limit": 10, **KEY}
+    js = (await api_client.post("/stocks/matrix", json=body)).json()
+    raw = await api_client.post("/stocks/matrix", json={**body, "format": "npz"})
+    bad = await api_client.post("/stocks/matrix", json={**body, "fields": ["nope"]})
+
+    assert js["tickers"] == ["BBB", "CCC"] and js["missing"] == ["ZZZ"]
+    assert len(js["dates"]) == 10 and len(js["fields"]["close"][0]) == 2
+    npz = np.load(io.BytesIO(raw.content))
+    assert raw.headers["x-next-after"] == js["next_after"]
+    assert npz["close"].shape == (10, 2)
+    assert np.array_equal(npz["close"], np.array(js["fields"]["close"], dtype=float), equal_nan=True)
+    assert bad.status_code == 422
@@ -0,0 +1,40 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from main import app
+from services.metrics import PROVIDER_CALLS, Histogram
+from services.provider_registry import fetch_rows
+from services.providers.synthetic_adapter import SyntheticFetchError, SyntheticProvider
+
+
+def test_histogram_exposition_is_cumulative():
+    h = Histogram("test_latency_seconds", "test", ("stage",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 0.5, 3.0):
+        h.observe(v, stage="x")
+    lines = h.render()
+    assert 'test_latency_seconds_bucket{stage="x",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{stage="x",le="1"} 3' in lines
+    assert 'test_latency_seconds_bucket{stage="x",le="+Inf"} 4' in lines
+    assert 'test_latency_seconds_count{stage="x"} 4' in lines
+
+
+@pytest.mark.anyio
+async def test_metrics_endpoint_reports_route_templates_and_provider_calls():
+    provider = SyntheticProvider(name="metrics-test", fail_tickers=frozenset({"BAD"}))
+    await fetch_rows(provider, "GOOD", "1d")
+    with pytest.raises(SyntheticFetchError):
+        await fetch_rows(provider, "BAD", "1d")
+    assert PROVIDER_CALLS.value(provider="metrics-test", outcome="ok") == 1
+    assert PROVIDER_CALLS.value(provider="metrics-test", outcome="error") == 1
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        await ac.get("/healthz")
+        await ac.get("/no/such/path")
+        res = await ac.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    body = res.text
+    assert 'chronos_http_requests_total{method="GET",route="/healthz",status="200"}' in body
+    assert 'chronos_http_requests_total{method="GET",route="unmatched",status="404"}' in body
+    assert 'chronos_http_request_duration_seconds_bucket{method="GET",route="/healthz",le="+Inf"}' in body
+    assert 'chronos_provider_requests_total{provider="metrics-test",outcome="error"} 1' in body
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+from main import app
+from services.metrics import stage
+from services.tracing import span, start_tracing, stop_tracing
+
+
+def test_spans_nest_per_track_when_tracing():
+    with span("ignored"):
+        pass
+    start_tracing()
+    with stage("refresh"):
+        with stage("upsert_ohlcv"):
+            pass
+    events = stop_tracing()
+    assert [e["name"] for e in events] == ["upsert_ohlcv", "refresh"]
+    inner, outer = events
+    assert inner["ph"] == outer["ph"] == "X" and inner["tid"] == outer["tid"]
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+
+
+@pytest.mark.anyio
+async def test_admin_surface_is_opt_in(monkeypatch, tmp_path):
+    monkeypatch.setattr("services.profiling.PROFILE_DIR", str(tmp_path))
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        assert (await ac.post("/admin/trace/start")).status_code == 404
+
+        monkeypatch.setenv("CHRONOS_ADMIN", "1")
+        assert (await ac.post("/admin/trace/start")).status_code == 200
+        with stage("compute_signals"):
+            pass
+        res = await ac.post("/admin/trace/stop")
+        assert res.status_code == 200
+        with open(res.json()["path"]) as fh:
+            trace = json.load(fh)
+        assert any(e["name"] == "compute_signals" for e in trace["traceEvents"])
+
+        res = await ac.post("/admin/profile", params={"seconds": 0.05, "limit": 5})
+        assert res.status_code in (200, 409)  # 409 when a coverage/profiling tool owns the hook
+        if res.status_code == 200:
+            assert res.json()["path"].endswith(".prof")
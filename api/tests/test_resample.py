@@ -0,0 +1,55 @@
+from datetime import date, timedelta
+
+import pytest
+
+from models import Stock
+from ohlcv import list_ohlcv_rows, upsert_ohlcv
+from services.provider_registry import register_provider
+from services.providers.resample_adapter import ResampleProvider
+from services.refresh_prices import refresh_stock_prices
+from services.resample import resample_rows
+
+
+def _daily(start: date, n: int):
+    rows = []
+    d = start
+    while len(rows) < n:
+        if d.weekday() < 5:
+            i = len(rows)
+            rows.append((d, 10.0 + i, 12.0 + i, 9.0 + i, 11.0 + i, None if i == 1 else 100.0))
+        d += timedelta(days=1)
+    return rows
+
+
+def test_weekly_and_monthly_aggregation():
+    rows = _daily(date(2024, 1, 1), 10)  # Mon 1 Jan .. Fri 12 Jan
+
+    weekly = resample_rows(rows, "1wk")
+    assert [w[0] for w in weekly] == [date(2024, 1, 1), date(2024, 1, 8)]
+    assert weekly[0] == (date(2024, 1, 1), 10.0, 16.0, 9.0, 15.0, 400.0)
+    assert weekly[1][1:5] == (15.0, 21.0, 14.0, 20.0)
+
+    monthly = resample_rows(list(reversed(rows)), "1mo")
+    assert monthly == [(date(2024, 1, 1), 10.0, 21.0, 9.0, 20.0, 900.0)]
+
+    with pytest.raises(ValueError):
+        resample_rows(rows, "4h")
+
+
+@pytest.mark.anyio
+async def test_refresh_through_resample_provider_uses_stored_bars_only(db_sessions):
+    register_provider(ResampleProvider(source="base", name="resample_test", session_factory=db_sessions))
+
+    async with db_sessions() as session:
+        stock = Stock(ticker="AAA")
+        session.add(stock)
+        await session.commit()
+        await upsert_ohlcv(session, stock_id=stock.id, provider="base", interval="1d",
+                           rows=_daily(date(2024, 1, 1), 15))
+        await session.commit()
+
+        written = await refresh_stock_prices(session, stock=stock, provider="resample_test", interval="1wk")
+        stored = await list_ohlcv_rows(session, stock_id=stock.id, provider="resample_test", interval="1wk")
+
+    assert written == 3
+    assert [r[0] for r in stored] == [date(2024, 1, 1), date(2024, 1, 8), date(2024, 1, 15)]
@@ -0,0 +1,86 @@
+import pytest
+
+from services.provider_registry import register_provider
+from services.providers.synthetic_adapter import SyntheticProvider
+from services.resilience import (
+    HEDGES,
+    CircuitBreaker,
+    CircuitOpenError,
+    ProviderChainError,
+    ProviderPolicy,
+    TokenBucket,
+    breaker,
+    configure_provider,
+    fetch_resilient,
+    set_fallback_chain,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_then_probes_once_and_recloses():
+    clock = FakeClock()
+    b = CircuitBreaker(failure_threshold=2, reset_timeout=10.0, clock=clock)
+    b.record_failure()
+    assert b.state == b.CLOSED and b.allow()
+    b.record_failure()
+    assert b.state == b.OPEN and not b.allow()
+
+    clock.now = 10.0
+    assert b.allow() and b.state == b.HALF_OPEN
+    assert not b.allow()  # one probe at a time
+    b.record_failure()
+    assert b.state == b.OPEN
+
+    clock.now = 20.0
+    assert b.allow()
+    b.record_success()
+    assert b.state == b.CLOSED and b.failures == 0
+
+
+def test_token_bucket_charges_debt_in_arrival_order():
+    clock = FakeClock()
+    tb = TokenBucket(rate=2.0, burst=2, clock=clock)
+    assert [tb.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    clock.now = 1.5  # refills the debt plus one token
+    assert tb.reserve() == 0.0
+
+
+@pytest.mark.anyio
+async def test_falls_back_and_skips_open_circuit():
+    register_provider(SyntheticProvider(name="res-primary", fail_tickers=frozenset({"DOWN"})))
+    register_provider(SyntheticProvider(name="res-backup", seed=1))
+    configure_provider("res-primary", ProviderPolicy(failure_threshold=1, reset_timeout=60.0))
+    set_fallback_chain("res-primary", ["res-backup"])
+
+    rows, source = await fetch_resilient("res-primary", "DOWN", "1d")
+    assert source == "res-backup" and rows
+    assert breaker("res-primary").state == CircuitBreaker.OPEN
+
+    # The open circuit skips the primary even for a ticker it could serve.
+    rows, source = await fetch_resilient("res-primary", "UP", "1d")
+    assert source == "res-backup"
+
+    set_fallback_chain("res-primary", [])
+    with pytest.raises(ProviderChainError) as info:
+        await fetch_resilient("res-primary", "UP", "1d")
+    assert isinstance(info.value.errors["res-primary"], CircuitOpenError)
+
+
+@pytest.mark.anyio
+async def test_hedge_serves_from_faster_provider():
+    register_provider(SyntheticProvider(name="res-slow", latency_s=2.0))
+    register_provider(SyntheticProvider(name="res-fast"))
+    set_fallback_chain("res-slow", ["res-fast"])
+
+    rows, source = await fetch_resilient("res-slow", "AAPL", "1d", hedge_after=0.05)
+    assert source == "res-fast" and rows
+    assert HEDGES.value(provider="res-slow", outcome="won") == 1
+    # The cancelled primary neither counts as a failure nor holds a probe slot.
+    assert breaker("res-slow").failures == 0
@@ -0,0 +1,80 @@
+import asyncio
+import os
+
+import pytest
+
+from services.response_cache import OfflineCacheMiss, ResponseCache, revalidate
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_per_interval_offline_replay_and_dedup(tmp_path):
+    clock = FakeClock()
+    cache = ResponseCache(str(tmp_path), ttls={"1d": 60, "1wk": 3600}, clock=clock)
+    body = b'{"chart": "payload"}' * 50
+    assert cache.fetch(("p", "AAPL", "1d"), "1d", lambda: body) == body
+    cache.put(("p", "AAPL", "1wk"), body)
+    assert len(list((tmp_path / "blobs").rglob("*.z"))) == 1  # same content, one blob
+
+    clock.now += 120
+    assert cache.get(("p", "AAPL", "1d"), "1d") is None  # expired
+    assert cache.get(("p", "AAPL", "1wk"), "1wk") == body
+
+    offline = ResponseCache(str(tmp_path), offline=True, clock=clock)
+    assert offline.fetch(("p", "AAPL", "1d"), "1d", lambda: pytest.fail("network")) == body
+    with pytest.raises(OfflineCacheMiss):
+        offline.fetch(("p", "MSFT", "1d"), "1d", lambda: b"")
+
+
+def test_evicts_least_recently_used_blobs(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=3000)
+    keys = [("p", f"T{i}", "1d") for i in range(4)]
+    for key in keys[:3]:
+        cache.put(key, os.urandom(900))  # incompressible: ~900 bytes per blob
+    for blob in (tmp_path / "blobs").rglob("*.z"):
+        os.utime(blob, (0, 0))
+    assert cache.get(keys[0], "1d") is not None  # T0 becomes the most recent
+    cache.put(keys[3], os.urandom(900))
+
+    assert [cache.get(k, "1d") is not None for k in keys] == [True, False, False, True]
+    assert sum(b.stat().st_size for b in (tmp_path / "blobs").rglob("*.z")) <= 2700
+    assert len(list((tmp_path / "index").iterdir())) == 2  # entries of evicted blobs pruned
+
+
+@pytest.mark.anyio
+async def test_revalidate_skips_cached_reads_but_stores(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    key = ("p", "NVDA", "1d")
+    cache.put(key, b"old")
+
+    async def download() -> bytes:
+        return b"new"
+
+    assert await cache.afetch(key, "1d", download) == b"old"
+    with revalidate():
+        assert await asyncio.create_task(cache.afetch(key, "1d", download)) == b"new"
+    assert cache.get(key, "1d") == b"new"
+    with revalidate():
+        assert ResponseCache(str(tmp_path), offline=True).get(key, "1d") == b"new"
+
+
+@pytest.mark.anyio
+async def test_concurrent_misses_share_one_download(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    calls = 0
+
+    async def download() -> bytes:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return b"bars"
+
+    results = await asyncio.gather(*(cache.afetch(("p", "TSLA", "1d"), "1d", download) for _ in range(5)))
+    assert results == [b"bars"] * 5
+    assert calls == 1
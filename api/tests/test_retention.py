@@ -0,0 +1,51 @@
+from datetime import date
+
+import numpy as np
+import pytest
+from sqlalchemy import func, select
+
+from models import Stock, StockOHLCV, StockOHLCVArchive
+from ohlcv import list_ohlcv_rows, load_bar_series, upsert_ohlcv
+from series import BarSeries
+from services.archive import decode_chunk, encode_columns
+from services.providers.synthetic_adapter import SyntheticProvider
+from services.retention import run_retention
+from services.ta.store import pack_dates
+
+
+def test_chunk_round_trips_bit_exact():
+    bars = BarSeries.from_columns(*SyntheticProvider(missing_volume_rate=0.1).generate("RT", "1d", 500))
+    back = decode_chunk(pack_dates(bars.days), encode_columns(bars))
+    for name in ("days", "open", "high", "low", "close", "volume", "volume_mask"):
+        assert np.array_equal(getattr(back, name), getattr(bars, name)), name
+
+
+@pytest.mark.anyio
+async def test_retention_moves_old_bars_and_reads_stay_whole(db_sessions):
+    bars = BarSeries.from_columns(*SyntheticProvider(gap_rate=0.0).generate("RET", "1d", 1000))
+    key = dict(provider="p", interval="1d")
+
+    async with db_sessions() as session:
+        stock = Stock(ticker="RET")
+        session.add(stock)
+        await session.commit()
+        await upsert_ohlcv(session, stock_id=stock.id, rows=bars, **key)
+        await session.commit()
+        before = await list_ohlcv_rows(session, stock_id=stock.id, **key)
+
+    today = date(2025, 12, 31)
+    moved = await run_retention(today, hot_days={"1d": 365}, sessions=db_sessions)
+    assert await run_retention(today, hot_days={"1d": 365}, sessions=db_sessions) == 0
+
+    async with db_sessions() as session:
+        hot = await session.scalar(select(func.count()).select_from(StockOHLCV))
+        chunks = await session.scalar(select(func.count()).select_from(StockOHLCVArchive))
+        after = await list_ohlcv_rows(session, stock_id=stock.id, **key)
+        newest = await list_ohlcv_rows(session, stock_id=stock.id, limit=300, order_desc=True, **key)
+        series = await load_bar_series(session, stock_id=stock.id, first_day=int(bars.days[10]), **key)
+
+    assert moved + hot == 1000 and hot <= 262
+    assert chunks == 3  # one per year, 2022..2024
+    assert after == before
+    assert newest == before[-300:]
+    assert np.array_equal(series.close, bars.close[10:])
@@ -0,0 +1,65 @@
+import asyncio
+import random
+from datetime import datetime, timezone
+
+import pytest
+
+import services.scheduler as scheduler
+from models import CacheStatus
+from services.market_calendar import NY
+from services.scheduler import RefreshScheduler, TrackedSeries, is_due, last_checkpoint
+
+
+def ny(*args) -> datetime:
+    return datetime(*args, tzinfo=NY)
+
+
+def test_checkpoints_follow_the_nyse_session():
+    # Intraday cadence inside the session, none at the bell itself.
+    assert last_checkpoint("1d", ny(2025, 3, 12, 10, 7)) == ny(2025, 3, 12, 10, 0)
+    assert last_checkpoint("1d", ny(2025, 3, 12, 9, 40)) == ny(2025, 3, 11, 16, 20)
+    assert last_checkpoint("1d", ny(2025, 3, 12, 16, 10)) == ny(2025, 3, 12, 16, 0)
+    assert last_checkpoint("1d", ny(2025, 3, 12, 18, 0)) == ny(2025, 3, 12, 16, 20)
+    # Coarse bars only after the close; weekends and holidays add nothing.
+    assert last_checkpoint("1wk", ny(2025, 3, 12, 12, 0)) == ny(2025, 3, 11, 16, 20)
+    assert last_checkpoint("1d", ny(2025, 3, 16, 12, 0)) == ny(2025, 3, 14, 16, 20)
+    assert last_checkpoint("1d", ny(2025, 7, 4, 12, 0)) == ny(2025, 7, 3, 13, 20)  # early close
+
+
+def test_fresh_and_in_flight_series_are_not_due():
+    now = ny(2025, 3, 12, 12, 5)
+    series = lambda fetched, status=CacheStatus.fresh: TrackedSeries("AAPL", "p", "1d", fetched, status)
+    assert is_due(series(None), now)
+    assert is_due(series(ny(2025, 3, 12, 11, 50)), now)
+    assert not is_due(series(ny(2025, 3, 12, 12, 1)), now)
+    assert not is_due(series(ny(2025, 3, 12, 11, 58), CacheStatus.fetching), now)
+    assert is_due(series(ny(2025, 3, 12, 11, 40), CacheStatus.fetching), now)  # abandoned
+
+
+@pytest.mark.anyio
+async def test_run_once_batches_and_staggers(monkeypatch):
+    tracked = [TrackedSeries(f"T{i}", "p", "1d", None, CacheStatus.unknown) for i in range(5)]
+    started: list[tuple[str, float]] = []
+    loop = asyncio.get_running_loop()
+    t0 = loop.time()
+
+    async def load():
+        return tracked
+
+    async def refresh(*, ticker, provider, interval):
+        started.append((ticker, loop.time() - t0))
+
+    monkeypatch.setattr(scheduler, "load_tracked_series", load)
+    monkeypatch.setattr(scheduler, "refresh_stock_prices_background", refresh)
+
+    sched = RefreshScheduler(batch_size=3, spread=0.3, rng=random.Random(0))
+    now = datetime(2025, 3, 12, 16, 0, tzinfo=timezone.utc)
+    assert [s.ticker for s in await sched.run_once(now)] == ["T0", "T1", "T2"]
+    # Queued series are not picked again while their refresh is pending.
+    assert [s.ticker for s in await sched.run_once(now)] == ["T3", "T4"]
+    await asyncio.sleep(0.4)
+    await sched.stop()
+
+    first = sorted(t for name, t in started if name in ("T0", "T1", "T2"))
+    assert len(started) == 5
+    assert first[0] < 0.1 and 0.1 <= first[1] < 0.2 and 0.2 <= first[2] < 0.35
@@ -0,0 +1,67 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from models import Stock
+from ohlcv import list_ohlcv_rows, load_bar_series, upsert_ohlcv
+from series import BarSeries, SignalSeries
+from services.ta.providers.pandas_ta_provider import PandasTAProvider
+from services.ta.signals import list_signal_rows, upsert_signals
+
+ROWS = [
+    (date(2024, 1, 3), 2.0, 2.5, 1.5, 2.2, None),
+    (date(2024, 1, 2), 1.0, 1.5, 0.5, 1.2, 100.0),
+    (date(2024, 1, 4), 3.0, 3.5, 2.5, 3.2, 300.0),
+]
+
+
+def test_row_adapters_round_trip():
+    bars = BarSeries.from_rows(ROWS)
+    assert bars.days.dtype == np.int32 and bars.close.dtype == np.float64
+    assert bars.volume_mask.tolist() == [True, False, True]
+    assert bars.to_rows() == sorted(ROWS)
+
+    dup = BarSeries.from_columns(
+        np.array(["2024-01-02", "2024-01-02"], dtype="datetime64[D]"),
+        np.array([1.0, 9.0]), np.array([1.0, 9.0]), np.array([1.0, 9.0]), np.array([1.0, 9.0]),
+        np.array([np.nan, 5.0]),
+    )
+    assert dup.to_rows() == [(date(2024, 1, 2), 9.0, 9.0, 9.0, 9.0, 5.0)]
+
+    signals = SignalSeries.from_rows([(date(2024, 1, 2), 50.0, None, 1.0, 2.0, 3.0, 4.0, 5.0)])
+    assert signals.to_rows() == [(date(2024, 1, 2), 50.0, None, 1.0, 2.0, 3.0, 4.0, 5.0)]
+
+    many = BarSeries.from_rows([(date.fromordinal(738000 + i), 1.0, 1.0, 1.0, 100.0 + i, 1.0) for i in range(80)])
+    assert PandasTAProvider().compute_signal_series(many).to_rows() == PandasTAProvider().compute_signals(many.to_rows())
+
+
+@pytest.mark.anyio
+async def test_upsert_writes_only_changed_bars_in_constant_statements(db_sessions, query_budget):
+    async with db_sessions() as session:
+        stock = Stock(ticker="SER")
+        session.add(stock)
+        await session.commit()
+        kw = dict(stock_id=stock.id, provider="p", interval="1d")
+
+        changed: list = []
+        with query_budget(2):
+            assert await upsert_ohlcv(session, rows=BarSeries.from_rows(ROWS), changed=changed, **kw) == 3
+        assert sorted(changed) == sorted(ROWS)
+
+        revised = [ROWS[0], ROWS[1], (date(2024, 1, 4), 3.0, 3.6, 2.5, 3.3, 310.0)]
+        changed = []
+        with query_budget(2):
+            await upsert_ohlcv(session, rows=revised, changed=changed, **kw)
+        await session.commit()
+        assert changed == [revised[2]]
+        assert await list_ohlcv_rows(session, **kw) == sorted(revised)
+        assert (await load_bar_series(session, **kw)).to_rows() == sorted(revised)
+
+        signal_rows = [(date(2024, 1, 2), 50.0, 0.1, 0.2, 1.0, 1.1, 2.0, 0.5)]
+        changed = []
+        await upsert_signals(session, rows=signal_rows, changed=changed, **kw)
+        await upsert_signals(session, rows=signal_rows, changed=changed, **kw)
+        await session.commit()
+        assert changed == signal_rows
+        assert await list_signal_rows(session, **kw) == signal_rows
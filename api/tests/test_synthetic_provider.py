@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from services.providers.synthetic_adapter import SyntheticFetchError, SyntheticProvider
+
+
+def test_series_are_reproducible_and_well_formed():
+    a = SyntheticProvider(seed=1, bars=500, gap_rate=0.05, missing_volume_rate=0.1)
+    b = SyntheticProvider(seed=1, bars=500, gap_rate=0.05, missing_volume_rate=0.1)
+    assert a.fetch_ohlcv_rows("AAA", "1d") == b.fetch_ohlcv_rows("aaa", "1d")
+    assert a.fetch_ohlcv_rows("AAA", "1d") != SyntheticProvider(seed=2, bars=500).fetch_ohlcv_rows("AAA", "1d")
+
+    dates, o, h, l, c, v = a.generate("AAA", "1d")
+    assert 400 < dates.size < 500
+    assert np.all(np.diff(dates.astype(np.int64)) > 0)
+    assert np.all(np.is_busday(dates))
+    assert np.all(h >= np.maximum(o, c)) and np.all(l <= np.minimum(o, c))
+    assert np.isnan(v).any()
+
+
+@pytest.mark.anyio
+async def test_failure_injection():
+    p = SyntheticProvider(fail_tickers=frozenset({"bad"}))
+    with pytest.raises(SyntheticFetchError):
+        await p.fetch_ohlcv_rows_async("BAD", "1d")
+    assert await p.fetch_ohlcv_rows_async("GOOD", "1d")
+
+    always = SyntheticProvider(failure_rate=1.0)
+    with pytest.raises(SyntheticFetchError):
+        always.fetch_ohlcv_rows("GOOD", "1d")
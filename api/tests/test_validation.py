@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from models import Stock
+from ohlcv import list_ohlcv_rows
+from repositories.cache import get_cache_status
+from repositories.quarantine import list_quarantined
+from series import BarSeries, to_epoch_days
+from services.provider_registry import register_provider
+from services.providers.synthetic_adapter import SyntheticProvider
+from services.refresh_prices import refresh_stock_prices
+from services.validation import BAD_VALUE, DUPLICATE, OHLC, SPIKE, validate_bars
+
+
+def _walk(n: int = 200, seed: int = 3) -> BarSeries:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * 1.002
+    low = np.minimum(open_, close) * 0.998
+    days = to_epoch_days(np.busday_offset("2024-01-02", np.arange(n)))
+    return BarSeries.from_columns(days, open_, high, low, close, np.full(n, 1e6))
+
+
+def test_rules_flag_only_the_bad_rows():
+    bars = _walk()
+    assert validate_bars(bars, "5m").report.quarantined == 0
+
+    close, high, low, volume = bars.close.copy(), bars.high.copy(), bars.low.copy(), bars.volume.copy()
+    close[50] = np.nan
+    high[60] = low[60] * 0.99
+    close[100] *= 1.5
+    high[100] = close[100]
+    volume[120] = -1
+    days = bars.days.copy()
+    days[150] = days[149]
+    # Build directly: from_columns would sort and dedupe the repeated date away.
+    bad = BarSeries(days, bars.open, high, low, close, volume, bars.volume_mask)
+
+    checked = validate_bars(bad, "5m")
+    flagged = dict(zip(checked.rejected.days.tolist(), checked.reasons.tolist()))
+    assert flagged == {
+        days[50]: BAD_VALUE,
+        days[60]: OHLC,
+        days[100]: SPIKE,
+        days[120]: BAD_VALUE,
+        days[150]: DUPLICATE,
+    }
+    assert len(checked.clean) == len(bars) - 5
+    assert checked.report.by_rule == {"bad_value": 2, "ohlc": 1, "duplicate": 1, "spike": 1}
+
+
+def test_provider_duplicates_and_disorder_are_reported():
+    bars = _walk(40)
+    # A provider resending bar 10 with a revised close, and two rows swapped.
+    order = np.r_[np.arange(20), 10, np.arange(20, 40)]
+    order[[25, 26]] = order[[26, 25]]
+    close = bars.close[order].copy()
+    close[20] *= 1.001
+    sent = BarSeries.from_columns(
+        bars.days[order], bars.open[order], bars.high[order], bars.low[order], close, bars.volume[order]
+    )
+    assert len(sent) == 40 and sent.unordered == 2 and len(sent.superseded) == 1
+
+    checked = validate_bars(sent, "5m")
+    assert len(checked.clean) == 40 and checked.clean.close[10] == close[20]
+    assert checked.rejected.days.tolist() == [bars.days[10]] and checked.rejected.close[0] == bars.close[10]
+    assert checked.reasons.tolist() == [DUPLICATE]
+    assert checked.report.summary() == "quarantined 1 (duplicate=1); 2 bars out of date order"
+
+
+def test_daily_bars_report_calendar_gaps():
+    bars = _walk(30)
+    # 2024-01-15 is MLK day: busday_offset put a bar there; drop two real sessions too.
+    keep = np.ones(len(bars), dtype=bool)
+    keep[[5, 6]] = False
+    report = validate_bars(bars.take(np.flatnonzero(keep)), "1d").report
+    assert (report.gaps, report.off_calendar, report.quarantined) == (2, 1, 0)
+    assert report.summary() == "2 missing sessions; 1 bars on non-trading days"
+
+
+class _SpikyProvider(SyntheticProvider):
+    async def fetch_bars_async(self, ticker, interval):
+        bars = await super().fetch_bars_async(ticker, interval)
+        close, high = bars.close.copy(), bars.high.copy()
+        close[40] *= 2
+        high[40] = close[40]
+        # Bar 80 is sent twice; the second copy wins and the first is held.
+        resend = np.r_[np.arange(len(bars)), 80]
+        close = close[resend]
+        close[-1] *= 0.999
+        return BarSeries.from_columns(
+            bars.days[resend], bars.open[resend], high[resend], bars.low[resend], close, bars.volume_or_nan()[resend]
+        )
+
+
+@pytest.mark.anyio
+async def test_refresh_quarantines_instead_of_storing(db_sessions):
+    register_provider(_SpikyProvider(name="spiky", bars=120, gap_rate=0.0))
+
+    async with db_sessions() as session:
+        stock = Stock(ticker="SPKY")
+        session.add(stock)
+        await session.commit()
+        await refresh_stock_prices(session, stock=stock, provider="spiky", interval="1d")
+        stored = await list_ohlcv_rows(session, stock_id=stock.id, provider="spiky", interval="1d")
+        held = await list_quarantined(session, stock_id=stock.id, provider="spiky", interval="1d")
+        cache = await get_cache_status(session, stock_id=stock.id, provider="spiky", interval="1d")
+
+    assert len(stored) == 119
+    assert sorted(q.reasons for q in held) == ["duplicate", "spike"]
+    spike = next(q for q in held if q.reasons == "spike")
+    dup = next(q for q in held if q.reasons == "duplicate")
+    assert spike.as_of not in {row[0] for row in stored}
+    assert dict((row[0], row[4]) for row in stored)[dup.as_of] == pytest.approx(dup.close * 0.999)
+    assert "quarantined 2 (duplicate=1, spike=1)" in cache.detail
@@ -0,0 +1,113 @@
+import asyncio
+import gzip
+import json
+import logging
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.providers.yahoo_http_adapter import YahooChartError, YahooHTTPProvider
+from services.response_cache import OfflineCacheMiss, ResponseCache
+
+# Two sessions at 09:30 New York (gmtoffset -4h) plus a trailing live bar that
+# repeats the second date, and one bar with no close.
+DAY = 86_400
+T0 = 1_717_000_000 - 1_717_000_000 % DAY + 13 * 3600 + 1800
+CHART = {
+    "chart": {
+        "result": [{
+            "meta": {"gmtoffset": -14400},
+            "timestamp": [T0, T0 + DAY, T0 + 2 * DAY, T0 + DAY + 3600],
+            "indicators": {"quote": [{
+                "open": [1.0, 2.0, 3.0, 2.5],
+                "high": [1.5, 2.5, 3.5, 2.9],
+                "low": [0.5, 1.5, 2.5, 2.1],
+                "close": [1.2, 2.2, None, 2.4],
+                "volume": [100, None, 300, 50],
+            }]},
+        }],
+        "error": None,
+    }
+}
+
+
+class _Stub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    peers: set = set()
+
+    def do_GET(self):
+        _Stub.peers.add(self.client_address)
+        if "/MISSING" in self.path:
+            body = json.dumps({"chart": {"result": None, "error": {"code": "Not Found", "description": "No data"}}})
+        else:
+            body = json.dumps(CHART)
+        data = gzip.compress(body.encode())
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _Stub.peers = set()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.anyio
+async def test_fetches_gzip_json_into_rows_over_one_pooled_connection(stub_server):
+    provider = YahooHTTPProvider(base_url=stub_server, http2=False, cache=None)
+    try:
+        rows = await provider.fetch_ohlcv_rows_async("aapl", "1d")
+        again = await provider.fetch_ohlcv_rows_async("AAPL", "1d")
+        with pytest.raises(YahooChartError, match="No data"):
+            await provider.fetch_ohlcv_rows_async("MISSING", "1d")
+    finally:
+        await provider.aclose()
+
+    d0 = (T0 - 14400) // DAY
+    assert [r[0].toordinal() - date(1970, 1, 1).toordinal() for r in rows] == [d0, d0 + 1]
+    assert rows[0] == (rows[0][0], 1.0, 1.5, 0.5, 1.2, 100.0)
+    assert rows[1][1:] == (2.5, 2.9, 2.1, 2.4, 50.0)  # live bar replaces the session bar
+    assert again == rows
+    assert len(_Stub.peers) == 1  # keep-alive: every request reused the connection
+
+    with pytest.raises(ValueError):
+        await YahooHTTPProvider(base_url=stub_server, cache=None).fetch_ohlcv_rows_async("AAPL", "1h")
+
+
+@pytest.mark.anyio
+async def test_replays_cached_chart_offline(stub_server, tmp_path):
+    recorder = YahooHTTPProvider(base_url=stub_server, http2=False, cache=ResponseCache(str(tmp_path)))
+    try:
+        rows = await recorder.fetch_ohlcv_rows_async("AAPL", "1d")
+    finally:
+        await recorder.aclose()
+
+    replay = YahooHTTPProvider(base_url=stub_server, cache=ResponseCache(str(tmp_path), offline=True))
+    _Stub.peers = set()
+    assert await replay.fetch_ohlcv_rows_async("AAPL", "1d") == rows
+    with pytest.raises(OfflineCacheMiss):
+        await replay.fetch_ohlcv_rows_async("MSFT", "1d")
+    assert not _Stub.peers
+
+
+def test_loop_change_replaces_and_reports_the_old_client(stub_server, caplog):
+    provider = YahooHTTPProvider(base_url=stub_server, http2=False, cache=None)
+    asyncio.run(provider.fetch_ohlcv_rows_async("AAPL", "1d"))
+    first = provider._client
+    with caplog.at_level(logging.WARNING, logger="chronos.yahoo"):
+        asyncio.run(provider.fetch_ohlcv_rows_async("AAPL", "1d"))
+    assert provider._client is not first and "abandoned" in caplog.text